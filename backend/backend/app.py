@@ -1,12 +1,28 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.datastructures import MutableHeaders
 
+from backend.auth.security import hashing_executor
 from backend.config.settings import Settings
-from backend.routers import auth, location, task, user
+from backend.database.database import async_engine, async_replica_engine
+from backend.database.statements import start_counting, statement_stats
+from backend.routers import auth, internal, location, task, user
 
 settings = Settings()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    hashing_executor.shutdown()
+    for engine in (async_engine, async_replica_engine):
+        if engine is not None:
+            await engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 origins = [settings.FRONTEND_URL]
 
@@ -20,10 +36,38 @@ app.add_middleware(
     ],  # ["Origin", "Content-Type", "Accept", "Authorization"]
 )
 
+
+class StatementCountingMiddleware:
+    # Plain ASGI, so with DATABASE_COUNT_STATEMENTS off a request pays one
+    # attribute check and responses do not reveal anything
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not settings.DATABASE_COUNT_STATEMENTS:
+            return await self.app(scope, receive, send)
+
+        counter = start_counting()
+
+        async def send_with_count(message):
+            if message['type'] == 'http.response.start':
+                statement_stats.record(counter)
+                MutableHeaders(scope=message).append(
+                    'X-DB-Statements', str(counter.count)
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_count)
+
+
+app.add_middleware(StatementCountingMiddleware)
+
+
 app.include_router(user.router)
 app.include_router(auth.router)
 app.include_router(task.router)
 app.include_router(location.router)
+app.include_router(internal.router)
 
 
 @app.get('/')
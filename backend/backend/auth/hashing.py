@@ -0,0 +1,68 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from pwdlib import PasswordHash
+
+from backend.utils.exceptions import ServiceBusyException
+
+# Only used inside the worker processes
+pwd_context = PasswordHash.recommended()
+
+
+def _hash(password: str):
+    return pwd_context.hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str):
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class HashingExecutor:
+    def __init__(self, max_workers: int | None, max_pending: int):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return self._executor
+
+    async def run(self, fn, *args):
+        # Runs on the event loop thread, so the counter needs no lock
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise ServiceBusyException
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str):
+        return await self.run(_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str):
+        return await self.run(_verify, plain_password, hashed_password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def stats(self):
+        return {
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'pending': self.pending,
+            'rejected': self.rejected,
+        }
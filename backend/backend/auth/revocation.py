@@ -0,0 +1,70 @@
+from datetime import timedelta
+from threading import Lock
+from time import monotonic
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from backend.database.models import TokenRevocation
+
+
+class RevocationTable:
+    def __init__(self, refresh_seconds: float, window_minutes: int):
+        self.refresh_seconds = refresh_seconds
+        self.window_minutes = window_minutes
+        self.refreshes = 0
+        self._versions = {}
+        self._refreshed_at = None
+        self._lock = Lock()
+
+    def is_stale(self):
+        return (
+            self._refreshed_at is None
+            or monotonic() - self._refreshed_at >= self.refresh_seconds
+        )
+
+    def is_revoked(self, user_id: int, token_version: int):
+        return token_version < self._versions.get(user_id, 0)
+
+    def revoke(self, user_id: int, token_version: int):
+        with self._lock:
+            current = self._versions.get(user_id, 0)
+            self._versions[user_id] = max(current, token_version)
+
+    def refresh(self, session: Session):
+        # One thread refreshes, the others keep using the current table
+        if not self._lock.acquire(blocking=False):
+            return
+
+        try:
+            # Revocations older than a token lifetime can no longer match
+            # a valid token, which keeps the table small
+            rows = session.execute(
+                select(
+                    TokenRevocation.user_id,
+                    func.max(TokenRevocation.token_version),
+                )
+                .where(
+                    TokenRevocation.created_at
+                    > func.now() - timedelta(minutes=self.window_minutes)
+                )
+                .group_by(TokenRevocation.user_id)
+            ).all()
+
+            self._versions = dict(rows)
+            self._refreshed_at = monotonic()
+            self.refreshes += 1
+        finally:
+            self._lock.release()
+
+    def clear(self):
+        with self._lock:
+            self._versions = {}
+            self._refreshed_at = None
+
+    def stats(self):
+        return {
+            'size': len(self._versions),
+            'refresh_seconds': self.refresh_seconds,
+            'refreshes': self.refreshes,
+        }
@@ -5,17 +5,37 @@ from zoneinfo import ZoneInfo
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jwt import DecodeError, ExpiredSignatureError, decode, encode
-from pwdlib import PasswordHash
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session, make_transient_to_detached
 
+from backend.auth.hashing import HashingExecutor
+from backend.auth.revocation import RevocationTable
+from backend.auth.throttle import LoginThrottle, load_backend
 from backend.config.settings import Settings
-from backend.database.database import get_session
-from backend.database.models import User
+from backend.database.database import get_session, run_with_session
+from backend.database.models import TokenRevocation, User
 from backend.schemas.auth import TokenData
+from backend.utils.cache import TTLCache
 
 settings = Settings()
-pwd_context = PasswordHash.recommended()
+hashing_executor = HashingExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+login_throttle = LoginThrottle(
+    backend=load_backend(settings.LOGIN_THROTTLE_BACKEND),
+    max_attempts_per_email=settings.LOGIN_THROTTLE_MAX_PER_EMAIL,
+    max_attempts_per_client=settings.LOGIN_THROTTLE_MAX_PER_CLIENT,
+    window_seconds=settings.LOGIN_THROTTLE_WINDOW_SECONDS,
+)
+revocation_table = RevocationTable(
+    refresh_seconds=settings.TOKEN_REVOCATION_REFRESH_SECONDS,
+    window_minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES,
+)
 
 
 def create_access_token(data: dict):
@@ -30,18 +50,115 @@ def create_access_token(data: dict):
     return encoded_jwt
 
 
-def get_password_hash(password: str):
-    return pwd_context.hash(password)
+async def get_password_hash(password: str):
+    return await hashing_executor.hash(password)
 
 
-def verify_password(plain_password: str, hashed_password: str):
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str):
+    return await hashing_executor.verify(plain_password, hashed_password)
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='auth/login')
 
 
-def get_current_user(
+def user_token_claims(user: User):
+    return {'sub': user.email, 'uid': user.id, 'ver': user.token_version}
+
+
+def revoke_tokens(session: Session, user_id: int, token_version: int):
+    session.execute(
+        insert(TokenRevocation).values(
+            user_id=user_id, token_version=token_version
+        )
+    )
+
+
+def invalidate_principal(user_id: int, token_version: int | None = None):
+    # Only this worker's cache and revocation table are updated. Other
+    # workers keep serving their cached principal for up to
+    # PRINCIPAL_CACHE_TTL_SECONDS, and accept revoked stateless tokens
+    # until their next TOKEN_REVOCATION_REFRESH_SECONDS refresh; keep both
+    # short where a change must take effect everywhere at once
+    principal_cache.discard_if(lambda user: user.id == user_id)
+
+    if token_version is not None:
+        revocation_table.revoke(user_id, token_version)
+
+
+def _detached_copy(user: User):
+    # A clean copy that never belongs to a session, so it can be shared
+    # between requests and merged into each one without a SELECT
+    copy = User(
+        username=user.username,
+        password=user.password,
+        email=user.email,
+    )
+    copy.id = user.id
+    copy.is_active = user.is_active
+    copy.token_version = user.token_version
+    copy.created_at = user.created_at
+    copy.update_at = user.update_at
+    make_transient_to_detached(copy)
+
+    return copy
+
+
+def _principal_from_claims(session: Session, token_data: TokenData):
+    # Trusts the signed user id; every other column is loaded lazily,
+    # only if a service actually reads it
+    stub = User(username='', password='', email='')
+    stub.id = token_data.user_id
+    make_transient_to_detached(stub)
+
+    user = session.merge(stub, load=False)
+    session.expire(
+        user,
+        [
+            'username',
+            'password',
+            'email',
+            'is_active',
+            'token_version',
+            'created_at',
+            'update_at',
+        ],
+    )
+
+    return user
+
+
+def _resolve_principal(token: str, token_data: TokenData, session: Session):
+    if settings.TOKEN_STATELESS_VERIFY and token_data.user_id:
+        if revocation_table.is_stale():
+            revocation_table.refresh(session)
+
+        if revocation_table.is_revoked(
+            token_data.user_id, token_data.token_version
+        ):
+            return None
+
+        return _principal_from_claims(session, token_data)
+
+    cached_user = principal_cache.get(token)
+    if cached_user:
+        return session.merge(cached_user, load=False)
+
+    if token_data.user_id:
+        query = select(User).where(User.id == token_data.user_id)
+    else:
+        query = select(User).where(User.email == token_data.username)
+
+    user = session.scalar(query.where(User.is_active))
+
+    if not user or user.token_version != token_data.token_version:
+        return None
+
+    principal_cache.set(token, _detached_copy(user))
+
+    return user
+
+
+async def get_current_user(
     session: Session = Depends(get_session),
     token: str = Depends(oauth2_scheme),
 ):
@@ -58,14 +175,18 @@ def get_current_user(
         username: str = payload.get('sub')
         if not username:
             raise credentials_exception
-        token_data = TokenData(username=username)
+        token_data = TokenData(
+            username=username,
+            user_id=payload.get('uid'),
+            token_version=payload.get('ver', 0),
+        )
     except DecodeError:
         raise credentials_exception
     except ExpiredSignatureError:
         raise credentials_exception
 
-    user = session.scalar(
-        select(User).where(User.email == token_data.username)
+    user = await run_with_session(
+        _resolve_principal, token, token_data, session=session
     )
 
     if not user:
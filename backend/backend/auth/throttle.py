@@ -0,0 +1,133 @@
+from collections import OrderedDict, deque
+from importlib import import_module
+from threading import Lock
+from time import monotonic
+from typing import NamedTuple
+
+from backend.utils.exceptions import TooManyLoginAttemptsException
+
+
+class InMemoryThrottleBackend:
+    # Counters live in this process only. A shared backend (e.g. Redis)
+    # exposes the same three methods so workers see the same windows;
+    # add must count and record the hit in one atomic step.
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._hits = OrderedDict()
+        self._lock = Lock()
+
+    def add(self, key: str, now: float, window_seconds: float):
+        with self._lock:
+            hits = self._hits.get(key)
+            if hits is None:
+                hits = self._hits[key] = deque()
+            self._hits.move_to_end(key)
+
+            hits.append(now)
+            self._prune(hits, now - window_seconds)
+
+            while len(self._hits) > self.max_keys:
+                self._hits.popitem(last=False)
+
+            return len(hits)
+
+    def discard(self, key: str, now: float):
+        with self._lock:
+            hits = self._hits.get(key)
+            if hits is None:
+                return
+
+            try:
+                hits.remove(now)
+            except ValueError:
+                pass
+
+            if not hits:
+                del self._hits[key]
+
+    def clear(self, key: str):
+        with self._lock:
+            self._hits.pop(key, None)
+
+    @staticmethod
+    def _prune(hits: deque, since: float):
+        while hits and hits[0] <= since:
+            hits.popleft()
+
+
+def load_backend(path: str):
+    module_name, class_name = path.rsplit('.', 1)
+    return getattr(import_module(module_name), class_name)()
+
+
+class LoginAttempt(NamedTuple):
+    email_key: str
+    client_key: str
+    started_at: float
+
+
+class LoginThrottle:
+    def __init__(
+        self,
+        backend,
+        max_attempts_per_email: int,
+        max_attempts_per_client: int,
+        window_seconds: float,
+    ):
+        self.backend = backend
+        self.max_attempts_per_email = max_attempts_per_email
+        self.max_attempts_per_client = max_attempts_per_client
+        self.window_seconds = window_seconds
+        self.allowed = 0
+        self.throttled = 0
+        self.failures = 0
+
+    @staticmethod
+    def _keys(email: str, client: str | None):
+        return f'login:email:{email.strip().lower()}', f'login:client:{client}'
+
+    def check(self, email: str, client: str | None):
+        # Reserves a slot in both windows before the password is verified,
+        # so a burst of concurrent attempts cannot all pass the check
+        # before any of their failures is recorded
+        email_key, client_key = self._keys(email, client)
+        now = monotonic()
+
+        email_attempts = self.backend.add(email_key, now, self.window_seconds)
+        client_attempts = self.backend.add(
+            client_key, now, self.window_seconds
+        )
+        attempt = LoginAttempt(email_key, client_key, now)
+
+        if (
+            email_attempts > self.max_attempts_per_email
+            or client_attempts > self.max_attempts_per_client
+        ):
+            self.release(attempt)
+            self.throttled += 1
+            raise TooManyLoginAttemptsException
+
+        self.allowed += 1
+
+        return attempt
+
+    def release(self, attempt: LoginAttempt):
+        # The attempt did not fail on the password, so it frees its slot
+        self.backend.discard(attempt.email_key, attempt.started_at)
+        self.backend.discard(attempt.client_key, attempt.started_at)
+
+    def record_failure(self, attempt: LoginAttempt):
+        # The reserved slots stay in the windows as the failure
+        self.failures += 1
+
+    def record_success(self, attempt: LoginAttempt):
+        self.backend.clear(attempt.email_key)
+        self.backend.discard(attempt.client_key, attempt.started_at)
+
+    def stats(self):
+        return {
+            'window_seconds': self.window_seconds,
+            'allowed': self.allowed,
+            'throttled': self.throttled,
+            'failures': self.failures,
+        }
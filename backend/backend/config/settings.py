@@ -11,3 +11,59 @@ class Settings(BaseSettings):
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     FRONTEND_URL: str
+
+    PRINCIPAL_CACHE_SIZE: int = 1024
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60
+
+    PASSWORD_HASH_WORKERS: int | None = None
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    TOKEN_STATELESS_VERIFY: bool = False
+    TOKEN_REVOCATION_REFRESH_SECONDS: float = 30
+
+    LOGIN_THROTTLE_BACKEND: str = (
+        'backend.auth.throttle.InMemoryThrottleBackend'
+    )
+    LOGIN_THROTTLE_WINDOW_SECONDS: float = 300
+    LOGIN_THROTTLE_MAX_PER_EMAIL: int = 5
+    LOGIN_THROTTLE_MAX_PER_CLIENT: int = 20
+    CLIENT_IP_HEADER: str | None = None
+
+    INTERNAL_STATS_TOKEN: str | None = None
+
+    DATABASE_ASYNC: bool = False
+
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30
+    DATABASE_POOL_RECYCLE: int = -1
+    DATABASE_POOL_PRE_PING: bool = False
+    DATABASE_PGBOUNCER: bool = False
+    # Diagnostics for tests and profiling: X-DB-Statements on responses
+    DATABASE_COUNT_STATEMENTS: bool = False
+
+    DATABASE_REPLICA_URL: str | None = None
+    REPLICA_MAX_LAG_SECONDS: float = 5
+    REPLICA_STICKY_SECONDS: float = 5
+    REPLICA_CHECK_SECONDS: float = 10
+
+    PAGINATION_COUNT_CAP: int = 1000
+    TASK_BULK_MAX_ITEMS: int = 500
+    TASK_ARCHIVE_INACTIVE_DAYS: int = 30
+    TASK_ARCHIVE_DONE_DAYS: int = 90
+    TASK_ARCHIVE_BATCH_SIZE: int = 500
+    TASK_ROUTE_MAX_STOPS: int = 300
+    TASK_ROUTE_TIME_BUDGET_MS: float = 25
+
+    LOCATION_CLUSTER_MAX_ZOOM: int = 12
+    LOCATION_CLUSTER_CELLS_PER_TILE: int = 4
+    LOCATION_VIEWPORT_MAX_FEATURES: int = 1000
+
+    TILE_CACHE_SIZE: int = 2048
+    TILE_CACHE_TTL_SECONDS: float = 300
+    TILE_CACHE_STORE: str = 'backend.utils.tile_cache.NullTileStore'
+    TILE_CACHE_DIR: str = '/tmp/todo-tiles'
+    TILE_CACHE_DISK_MAX_TILES: int = 100_000
+
+    GEOFENCE_CACHE_SIZE: int = 1024
+    GEOFENCE_CACHE_TTL_SECONDS: float = 60
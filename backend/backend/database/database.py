@@ -1,11 +1,129 @@
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import Session
 
 from backend.config.settings import Settings
+from backend.database.pool import instrument_engine
+from backend.database.replica import (
+    READ_METHODS,
+    ReplicaRouter,
+    set_read_only,
+    track_commits,
+)
 
-engine = create_engine(Settings().DATABASE_URL)
+settings = Settings()
 
 
-def get_session():
-    with Session(engine) as session:
+def engine_options():
+    options = {
+        'pool_size': settings.DATABASE_POOL_SIZE,
+        'max_overflow': settings.DATABASE_MAX_OVERFLOW,
+        'pool_timeout': settings.DATABASE_POOL_TIMEOUT,
+        'pool_recycle': settings.DATABASE_POOL_RECYCLE,
+        'pool_pre_ping': settings.DATABASE_POOL_PRE_PING,
+    }
+
+    # PgBouncer in transaction mode can hand each transaction a different
+    # server connection, so server-side prepared statements must be off
+    if settings.DATABASE_PGBOUNCER:
+        options['connect_args'] = {'prepare_threshold': None}
+
+    return options
+
+
+def _create_sync_engine(url: str):
+    return instrument_engine(create_engine(url, **engine_options()))
+
+
+def _create_async_engine(url: str):
+    async_engine = create_async_engine(url, **engine_options())
+    instrument_engine(async_engine.sync_engine)
+
+    return async_engine
+
+
+engine = _create_sync_engine(settings.DATABASE_URL)
+async_engine = (
+    _create_async_engine(settings.DATABASE_URL)
+    if settings.DATABASE_ASYNC
+    else None
+)
+
+replica_engine = None
+async_replica_engine = None
+if settings.DATABASE_REPLICA_URL:
+    if settings.DATABASE_ASYNC:
+        async_replica_engine = _create_async_engine(
+            settings.DATABASE_REPLICA_URL
+        )
+        set_read_only(async_replica_engine.sync_engine)
+    else:
+        replica_engine = _create_sync_engine(settings.DATABASE_REPLICA_URL)
+        set_read_only(replica_engine)
+
+replica_router = ReplicaRouter(
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    sticky_seconds=settings.REPLICA_STICKY_SECONDS,
+    check_seconds=settings.REPLICA_CHECK_SECONDS,
+)
+
+
+def get_sync_session(request: Request):
+    bind = engine
+    key = None
+
+    if replica_engine is not None:
+        key = replica_router.request_key(request)
+        if request.method in READ_METHODS and replica_router.use_replica(
+            key, replica_engine
+        ):
+            bind = replica_engine
+
+    with Session(bind, expire_on_commit=False) as session:
+        track_commits(session)
+        yield session
+
+    # Keep this user's reads on the primary until the replica catches up
+    if session.info['committed']:
+        replica_router.mark_write(key)
+
+
+async def get_async_session(request: Request):
+    bind = async_engine
+    key = None
+
+    if async_replica_engine is not None:
+        key = replica_router.request_key(request)
+        if (
+            request.method in READ_METHODS
+            and await replica_router.use_replica_async(
+                key, async_replica_engine
+            )
+        ):
+            bind = async_replica_engine
+
+    async with AsyncSession(bind, expire_on_commit=False) as session:
+        track_commits(session.sync_session)
         yield session
+
+    if session.sync_session.info['committed']:
+        replica_router.mark_write(key)
+
+
+get_session = (
+    get_async_session if settings.DATABASE_ASYNC else get_sync_session
+)
+
+
+async def run_with_session(fn, /, *args, session, **kwargs):
+    # Services are written once against the sync Session API. With an
+    # AsyncSession they run through run_sync, so IO goes through the async
+    # driver on the event loop; otherwise they run on the thread pool.
+    if isinstance(session, AsyncSession):
+        return await session.run_sync(
+            lambda sync_session: fn(*args, session=sync_session, **kwargs)
+        )
+
+    return await run_in_threadpool(fn, *args, session=session, **kwargs)
@@ -2,13 +2,19 @@ from datetime import datetime
 from typing import Optional
 
 from geoalchemy2 import Geometry
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import ForeignKey, Index, func, text
+from sqlalchemy.ext.associationproxy import AssociationProxy, association_proxy
 from sqlalchemy.orm import Mapped, mapped_column, registry, relationship
 
 from .enums import TaskPriority
 
 table_registry = registry()
 
+# Indexed as an expression rather than stored in a generated column, which
+# would rewrite the whole tasks table when added. Queries must spell it the
+# same way for the planner to match the index.
+TASK_SEARCH_VECTOR = "to_tsvector('simple', title || ' ' || description)"
+
 
 @table_registry.mapped_as_dataclass
 class User:
@@ -19,6 +25,9 @@ class User:
     password: Mapped[str]
     email: Mapped[str] = mapped_column(unique=True)
     is_active: Mapped[bool] = mapped_column(init=False, default=True)
+    token_version: Mapped[int] = mapped_column(
+        init=False, default=0, server_default=text('0')
+    )
     created_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now()
     )
@@ -39,6 +48,54 @@ class User:
 @table_registry.mapped_as_dataclass
 class Task:
     __tablename__ = 'tasks'
+    __table_args__ = (
+        Index('ix_tasks_user_id_title', 'user_id', 'title'),
+        Index(
+            'ix_tasks_active_user_id',
+            'user_id',
+            'id',
+            postgresql_where=text('is_active'),
+        ),
+        Index(
+            'ix_tasks_active_user_id_priority_id',
+            'user_id',
+            'priority',
+            'id',
+            postgresql_where=text('is_active'),
+        ),
+        Index(
+            'ix_tasks_active_user_id_created_at_id',
+            'user_id',
+            'created_at',
+            'id',
+            postgresql_where=text('is_active'),
+        ),
+        Index(
+            'ix_tasks_active_user_id_changed_at_id',
+            'user_id',
+            text('coalesce(update_at, created_at)'),
+            'id',
+            postgresql_where=text('is_active'),
+        ),
+        Index(
+            'ix_tasks_active_user_id_done_id',
+            'user_id',
+            'done',
+            'id',
+            postgresql_where=text('is_active'),
+        ),
+        Index(
+            'ix_tasks_search_vector',
+            text(TASK_SEARCH_VECTOR),
+            postgresql_using='gin',
+        ),
+        Index(
+            'ix_tasks_title_trgm',
+            'title',
+            postgresql_using='gin',
+            postgresql_ops={'title': 'gin_trgm_ops'},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey('users.id'))
@@ -63,13 +120,17 @@ class Task:
 
 
 @table_registry.mapped_as_dataclass
-class Location:
-    __tablename__ = 'locations'
+class Place:
+    __tablename__ = 'places'
+    __table_args__ = (
+        Index(
+            'ix_places_geography',
+            text('geography(geom)'),
+            postgresql_using='gist',
+        ),
+    )
 
-    id: Mapped[int] = mapped_column(init=False, primary_key=True)
-    user_id: Mapped[Optional[int]] = mapped_column(ForeignKey('users.id'))
-    task_id: Mapped[Optional[int]] = mapped_column(ForeignKey('tasks.id'))
-    place_id: Mapped[str]
+    place_id: Mapped[str] = mapped_column(primary_key=True)
     display_name: Mapped[str]
     name: Mapped[str]
     lat: Mapped[float]
@@ -77,6 +138,25 @@ class Location:
     geom: Mapped[Geometry] = mapped_column(
         Geometry(geometry_type='POINT', srid=4326, spatial_index=True)
     )
+
+
+@table_registry.mapped_as_dataclass
+class Location:
+    __tablename__ = 'locations'
+
+    id: Mapped[int] = mapped_column(init=False, primary_key=True)
+    user_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey('users.id'), index=True
+    )
+    task_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey('tasks.id'), index=True
+    )
+    place_id: Mapped[str] = mapped_column(
+        ForeignKey('places.place_id'), index=True
+    )
+    geofence_radius_m: Mapped[float] = mapped_column(
+        default=100, server_default=text('100')
+    )
     created_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now()
     )
@@ -89,3 +169,99 @@ class Location:
     task: Mapped[Optional['Task']] = relationship(
         init=False, back_populates='location'
     )
+    # Outer joined: an inner join would nest badly under queries that
+    # outer join locations, dropping tasks that have no location
+    place: Mapped['Place'] = relationship(init=False, lazy='joined')
+    # Read through to the shared place so attribute-based schemas keep
+    # their shape; queries filter on Place columns directly
+    display_name: AssociationProxy[str] = association_proxy(
+        'place', 'display_name', init=False
+    )
+    name: AssociationProxy[str] = association_proxy(
+        'place', 'name', init=False
+    )
+    lat: AssociationProxy[float] = association_proxy(
+        'place', 'lat', init=False
+    )
+    lon: AssociationProxy[float] = association_proxy(
+        'place', 'lon', init=False
+    )
+    geom: AssociationProxy[Geometry] = association_proxy(
+        'place', 'geom', init=False
+    )
+
+
+@table_registry.mapped_as_dataclass
+class TokenRevocation:
+    __tablename__ = 'token_revocations'
+
+    id: Mapped[int] = mapped_column(init=False, primary_key=True)
+    user_id: Mapped[int] = mapped_column(index=True)
+    token_version: Mapped[int]
+    created_at: Mapped[datetime] = mapped_column(
+        init=False, server_default=func.now(), index=True
+    )
+
+
+@table_registry.mapped_as_dataclass
+class TaskStats:
+    __tablename__ = 'task_stats'
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey('users.id'), primary_key=True
+    )
+    total: Mapped[int] = mapped_column(default=0)
+    active: Mapped[int] = mapped_column(default=0)
+    done: Mapped[int] = mapped_column(default=0)
+    high: Mapped[int] = mapped_column(default=0)
+    medium: Mapped[int] = mapped_column(default=0)
+    low: Mapped[int] = mapped_column(default=0)
+
+
+@table_registry.mapped_as_dataclass
+class TaskArchive:
+    __tablename__ = 'tasks_archive'
+    __table_args__ = (Index('ix_tasks_archive_user_id_id', 'user_id', 'id'),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.id'))
+    title: Mapped[str]
+    description: Mapped[str]
+    done: Mapped[bool]
+    priority: Mapped[TaskPriority]
+    is_active: Mapped[bool]
+    created_at: Mapped[datetime]
+    update_at: Mapped[Optional[datetime]]
+    archived_at: Mapped[datetime] = mapped_column(
+        init=False, server_default=func.now()
+    )
+
+
+@table_registry.mapped_as_dataclass
+class LocationArchive:
+    __tablename__ = 'locations_archive'
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    task_id: Mapped[int] = mapped_column(
+        ForeignKey('tasks_archive.id'), index=True
+    )
+    user_id: Mapped[Optional[int]]
+    place_id: Mapped[str] = mapped_column(ForeignKey('places.place_id'))
+    geofence_radius_m: Mapped[float] = mapped_column(
+        server_default=text('100')
+    )
+    created_at: Mapped[datetime]
+    update_at: Mapped[Optional[datetime]]
+    archived_at: Mapped[datetime] = mapped_column(
+        init=False, server_default=func.now()
+    )
+
+
+@table_registry.mapped_as_dataclass
+class LocationVersion:
+    __tablename__ = 'location_versions'
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey('users.id'), primary_key=True
+    )
+    version: Mapped[int] = mapped_column(default=0)
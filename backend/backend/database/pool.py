@@ -0,0 +1,92 @@
+from threading import Lock
+from time import perf_counter
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError
+
+
+class PoolStats:
+    def __init__(self):
+        self.checkouts = 0
+        self.checkins = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._lock = Lock()
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.waits += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def record_connect(self, *args):
+        with self._lock:
+            self.connects += 1
+
+    def record_checkout(self, *args):
+        with self._lock:
+            self.checkouts += 1
+
+    def record_checkin(self, *args):
+        with self._lock:
+            self.checkins += 1
+
+
+_engine_stats = WeakKeyDictionary()
+
+
+def instrument_engine(engine):
+    # Counts come from pool events. The pool has no event before a
+    # checkout starts, so the wait is timed around Engine.connect, which
+    # sessions (and AsyncConnection, on the sync engine) go through; it
+    # includes opening a new connection when the pool grows. Listeners
+    # move over to the new pool when the engine is disposed.
+    stats = _engine_stats[engine] = PoolStats()
+    event.listen(engine.pool, 'connect', stats.record_connect)
+    event.listen(engine.pool, 'checkout', stats.record_checkout)
+    event.listen(engine.pool, 'checkin', stats.record_checkin)
+
+    connect = engine.connect
+
+    def timed_connect():
+        start = perf_counter()
+        try:
+            connection = connect()
+        except TimeoutError:
+            stats.record_timeout()
+            raise
+
+        stats.record_wait(perf_counter() - start)
+        return connection
+
+    engine.connect = timed_connect
+
+    return engine
+
+
+def pool_snapshot(engine):
+    stats = _engine_stats[engine]
+    pool = engine.pool
+
+    return {
+        'size': pool.size(),
+        'in_use': pool.checkedout(),
+        'idle': pool.checkedin(),
+        'overflow': pool.overflow(),
+        'checkouts': stats.checkouts,
+        'checkins': stats.checkins,
+        'timeouts': stats.timeouts,
+        'connects': stats.connects,
+        'wait_avg_ms': (
+            stats.wait_total / stats.waits * 1000 if stats.waits else 0.0
+        ),
+        'wait_max_ms': stats.wait_max * 1000,
+    }
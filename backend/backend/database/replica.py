@@ -0,0 +1,143 @@
+from threading import Lock
+from time import monotonic
+
+from jwt import PyJWTError, decode
+from sqlalchemy import event, text
+
+from backend.utils.cache import TTLCache
+
+READ_METHODS = {'GET', 'HEAD'}
+
+# Zero when the replica has replayed everything it received, otherwise the
+# age of the last replayed transaction. NULL (not a standby) counts as 0.
+LAG_QUERY = text(
+    'SELECT COALESCE('
+    'CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+    'ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) '
+    'END, 0)'
+)
+
+
+def track_commits(session):
+    # Per session, so a request only pins its user to the primary when it
+    # actually committed; POSTs that only read, like location pings, don't
+    session.info['committed'] = False
+    event.listen(session, 'after_commit', _mark_committed)
+
+
+def _mark_committed(session):
+    session.info['committed'] = True
+
+
+def set_read_only(engine):
+    @event.listens_for(engine, 'begin')
+    def _begin_read_only(connection):
+        connection.exec_driver_sql('SET TRANSACTION READ ONLY')
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        max_lag_seconds: float,
+        sticky_seconds: float,
+        check_seconds: float,
+    ):
+        self.max_lag_seconds = max_lag_seconds
+        self.check_seconds = check_seconds
+        self.healthy = False
+        self.lag = None
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.failed_checks = 0
+        self._sticky = TTLCache(maxsize=100_000, ttl=sticky_seconds)
+        self._checked_at = None
+        self._lock = Lock()
+
+    @staticmethod
+    def request_key(request):
+        # Only used to pick an engine, so an unverified read is enough;
+        # the token is still fully validated by get_current_user
+        scheme, _, token = request.headers.get('authorization', '').partition(
+            ' '
+        )
+        if scheme.lower() != 'bearer' or not token:
+            return None
+
+        try:
+            payload = decode(token, options={'verify_signature': False})
+        except PyJWTError:
+            return None
+
+        return payload.get('uid') or payload.get('sub')
+
+    def mark_write(self, key):
+        if key is not None:
+            self._sticky.set(key, True)
+
+    def _check_due(self):
+        if (
+            self._checked_at is not None
+            and monotonic() - self._checked_at < self.check_seconds
+        ):
+            return False
+
+        # Only one request runs the check, the others use the last result
+        if not self._lock.acquire(blocking=False):
+            return False
+
+        self._checked_at = monotonic()
+        self._lock.release()
+        return True
+
+    def _record_check(self, lag):
+        if lag is None:
+            self.failed_checks += 1
+            self.healthy = False
+        else:
+            self.healthy = lag <= self.max_lag_seconds
+
+        self.lag = lag
+
+    def _choose(self, key):
+        use_replica = self.healthy and (
+            key is None or self._sticky.get(key) is None
+        )
+
+        if use_replica:
+            self.replica_reads += 1
+        else:
+            self.primary_reads += 1
+
+        return use_replica
+
+    def use_replica(self, key, engine):
+        if self._check_due():
+            try:
+                with engine.connect() as connection:
+                    lag = float(connection.scalar(LAG_QUERY))
+            except Exception:
+                lag = None
+            self._record_check(lag)
+
+        return self._choose(key)
+
+    async def use_replica_async(self, key, engine):
+        if self._check_due():
+            try:
+                async with engine.connect() as connection:
+                    lag = float(await connection.scalar(LAG_QUERY))
+            except Exception:
+                lag = None
+            self._record_check(lag)
+
+        return self._choose(key)
+
+    def stats(self):
+        return {
+            'healthy': self.healthy,
+            'lag_seconds': self.lag,
+            'max_lag_seconds': self.max_lag_seconds,
+            'replica_reads': self.replica_reads,
+            'primary_reads': self.primary_reads,
+            'failed_checks': self.failed_checks,
+        }
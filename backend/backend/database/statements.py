@@ -0,0 +1,51 @@
+from contextvars import ContextVar
+from threading import Lock
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_request_counter = ContextVar('request_statement_counter', default=None)
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+
+class StatementStats:
+    def __init__(self):
+        self.requests = 0
+        self.statements = 0
+        self._lock = Lock()
+
+    def record(self, counter: StatementCounter):
+        with self._lock:
+            self.requests += 1
+            self.statements += counter.count
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'statements': self.statements,
+            'statements_per_request': (
+                self.statements / self.requests if self.requests else 0.0
+            ),
+        }
+
+
+statement_stats = StatementStats()
+
+
+def start_counting():
+    # The counter object is shared by the thread pool and run_sync contexts
+    # the request fans out to, so their statements all land on it
+    counter = StatementCounter()
+    _request_counter.set(counter)
+    return counter
+
+
+@event.listens_for(Engine, 'before_cursor_execute', named=True)
+def _count_statement(**kw):
+    counter = _request_counter.get()
+    if counter is not None:
+        counter.count += 1
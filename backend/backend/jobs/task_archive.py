@@ -0,0 +1,81 @@
+import logging
+from datetime import timedelta
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from backend.config.settings import Settings
+from backend.database.database import engine
+from backend.database.models import Task
+from backend.services.task_archive import archive_tasks
+
+settings = Settings()
+
+logger = logging.getLogger(__name__)
+
+
+def archive_tasks_batch(session: Session, batch_size: int, after_id: int = 0):
+    # Only deactivated tasks and tasks completed long ago move to the
+    # archive; SKIP LOCKED leaves rows that requests are writing alone.
+    # Scanning resumes after the last id seen, so each batch walks the
+    # primary key forward instead of rereading the rows already passed.
+    last_change = func.coalesce(Task.update_at, Task.created_at)
+    task_ids = session.scalars(
+        select(Task.id)
+        .where(
+            Task.id > after_id,
+            or_(
+                and_(
+                    ~Task.is_active,
+                    last_change
+                    < func.now()
+                    - timedelta(days=settings.TASK_ARCHIVE_INACTIVE_DAYS),
+                ),
+                and_(
+                    Task.is_active,
+                    Task.done,
+                    last_change
+                    < func.now()
+                    - timedelta(days=settings.TASK_ARCHIVE_DONE_DAYS),
+                ),
+            ),
+        )
+        .order_by(Task.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+
+    archived = archive_tasks(session, task_ids) if task_ids else 0
+    session.commit()
+
+    return archived, max(task_ids, default=after_id)
+
+
+def archive_old_tasks(batch_size: int = settings.TASK_ARCHIVE_BATCH_SIZE):
+    report = {'tasks_archived': 0, 'batches': 0}
+
+    # Each batch commits on its own, so locks are only held briefly
+    last_id = 0
+    with Session(engine) as session:
+        while True:
+            archived, last_id = archive_tasks_batch(
+                session, batch_size, last_id
+            )
+            report['tasks_archived'] += archived
+            report['batches'] += 1
+
+            if archived < batch_size:
+                break
+
+    logger.info(
+        'Archived %d tasks in %d batches',
+        report['tasks_archived'],
+        report['batches'],
+    )
+
+    return report
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    archive_old_tasks()
@@ -0,0 +1,123 @@
+import logging
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from backend.database.database import engine
+from backend.database.enums import TaskPriority
+from backend.database.models import Task, TaskStats, User
+from backend.services.task_stats import COUNTERS
+
+BATCH_SIZE = 500
+
+logger = logging.getLogger(__name__)
+
+
+def _actual_counts(session: Session, user_ids: list[int]):
+    query = (
+        select(
+            Task.user_id,
+            func.count().label('total'),
+            func.count().filter(Task.is_active).label('active'),
+            func.count().filter(Task.is_active, Task.done).label('done'),
+            *(
+                func.count()
+                .filter(Task.is_active, Task.priority == priority)
+                .label(priority.value)
+                for priority in TaskPriority
+            ),
+        )
+        .where(Task.user_id.in_(user_ids))
+        .group_by(Task.user_id)
+    )
+
+    return {
+        row.user_id: {key: getattr(row, key) for key in COUNTERS}
+        for row in session.execute(query)
+    }
+
+
+def repair_task_stats_batch(session: Session, user_ids: list[int]):
+    # Locking the stats rows first makes concurrent task writes wait, so
+    # the recount cannot race with an in-flight delta. A user without a
+    # row would have nothing to lock, so missing rows are created first;
+    # a task write upserting one meanwhile waits for this transaction and
+    # then adds its delta on top of the recount.
+    empty = dict.fromkeys(COUNTERS, 0)
+    session.execute(
+        insert(TaskStats)
+        .values([{'user_id': user_id, **empty} for user_id in user_ids])
+        .on_conflict_do_nothing(index_elements=[TaskStats.user_id])
+    )
+    stored = {
+        row.user_id: {key: getattr(row, key) for key in COUNTERS}
+        for row in session.scalars(
+            select(TaskStats)
+            .where(TaskStats.user_id.in_(user_ids))
+            .with_for_update()
+        )
+    }
+    actual = _actual_counts(session, user_ids)
+
+    drifted = [
+        user_id
+        for user_id in user_ids
+        if stored[user_id] != actual.get(user_id, empty)
+    ]
+
+    if drifted:
+        query = insert(TaskStats).values(
+            [
+                {'user_id': user_id, **actual.get(user_id, empty)}
+                for user_id in drifted
+            ]
+        )
+        session.execute(
+            query.on_conflict_do_update(
+                index_elements=[TaskStats.user_id],
+                set_={key: query.excluded[key] for key in COUNTERS},
+            )
+        )
+
+    session.commit()
+
+    return drifted
+
+
+def repair_task_stats(batch_size: int = BATCH_SIZE):
+    report = {'users_checked': 0, 'users_drifted': 0, 'drifted_user_ids': []}
+    last_id = 0
+
+    with Session(engine) as session:
+        while True:
+            user_ids = session.scalars(
+                select(User.id)
+                .where(User.id > last_id)
+                .order_by(User.id)
+                .limit(batch_size)
+            ).all()
+
+            if not user_ids:
+                break
+
+            drifted = repair_task_stats_batch(session, user_ids)
+            report['users_checked'] += len(user_ids)
+            report['users_drifted'] += len(drifted)
+            report['drifted_user_ids'].extend(drifted)
+            last_id = user_ids[-1]
+
+    if report['users_drifted']:
+        logger.warning(
+            'Repaired task stats of %d users: %s',
+            report['users_drifted'],
+            report['drifted_user_ids'],
+        )
+    logger.info('Checked task stats of %d users', report['users_checked'])
+
+    return report
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    repair_task_stats()
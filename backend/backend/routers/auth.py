@@ -1,27 +1,46 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Request
 
-from backend.auth.security import (
-    create_access_token,
-    get_current_user,
-)
-from backend.database.models import User
+from backend.config.settings import Settings
+from backend.database.database import run_with_session
 from backend.schemas.auth import LoginInfo, Token
-from backend.services.auth import generate_access_token
-from backend.utils.dependencies import OAuth2Form, Session
+from backend.services.auth import (
+    generate_access_token,
+    refresh_access_token_service,
+)
+from backend.utils.dependencies import CurrentUser, OAuth2Form, Session
+
+settings = Settings()
 
 router = APIRouter(prefix='/auth', tags=['auth'])
 
 
+def client_address(request: Request):
+    # Behind a proxy every connection comes from the proxy itself; the real
+    # address is only trusted from the header that proxy sets
+    if settings.CLIENT_IP_HEADER:
+        address = request.headers.get(settings.CLIENT_IP_HEADER)
+        if address:
+            return address
+
+    return request.client.host if request.client else None
+
+
 @router.post('/login', response_model=LoginInfo)
-def login_for_access_token(form_data: OAuth2Form, session: Session):
-    user = generate_access_token(form_data, session)
+async def login_for_access_token(
+    request: Request, form_data: OAuth2Form, session: Session
+):
+    user = await generate_access_token(
+        form_data, session, client_address(request)
+    )
     return user
 
 
 @router.post('/refresh_token', response_model=Token)
-def refresh_access_token(
-    user: User = Depends(get_current_user),
-):
-    new_access_token = create_access_token(data={'sub': user.email})
+async def refresh_access_token(session: Session, current_user: CurrentUser):
+    token = await run_with_session(
+        refresh_access_token_service,
+        session=session,
+        current_user=current_user,
+    )
 
-    return {'access_token': new_access_token, 'token_type': 'bearer'}
+    return token
@@ -0,0 +1,71 @@
+from secrets import compare_digest
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header
+
+from backend.auth.security import (
+    hashing_executor,
+    login_throttle,
+    principal_cache,
+    revocation_table,
+)
+from backend.config.settings import Settings
+from backend.database.database import (
+    async_engine,
+    async_replica_engine,
+    engine,
+    replica_engine,
+    replica_router,
+)
+from backend.database.pool import pool_snapshot
+from backend.database.statements import statement_stats
+from backend.services.geofence import geofence_cache
+from backend.services.location_tiles import tile_cache
+from backend.utils.exceptions import NoPermissionException
+
+settings = Settings()
+
+
+def verify_internal_token(
+    x_internal_token: Annotated[str | None, Header()] = None,
+):
+    # Operators only: closed unless INTERNAL_STATS_TOKEN is configured
+    if not (
+        settings.INTERNAL_STATS_TOKEN
+        and x_internal_token
+        and compare_digest(x_internal_token, settings.INTERNAL_STATS_TOKEN)
+    ):
+        raise NoPermissionException
+
+
+router = APIRouter(
+    prefix='/internal',
+    tags=['internal'],
+    dependencies=[Depends(verify_internal_token)],
+    include_in_schema=False,
+)
+
+
+@router.get('/stats')
+def read_stats():
+    pools = {'sync': pool_snapshot(engine)}
+    if async_engine is not None:
+        pools['async'] = pool_snapshot(async_engine.sync_engine)
+    if replica_engine is not None:
+        pools['replica'] = pool_snapshot(replica_engine)
+    if async_replica_engine is not None:
+        pools['async_replica'] = pool_snapshot(
+            async_replica_engine.sync_engine
+        )
+
+    return {
+        'database_pool': pools,
+        'statements': statement_stats.stats(),
+        'replica': replica_router.stats(),
+        'principal_cache': principal_cache.stats(),
+        'hashing_executor': hashing_executor.stats(),
+        'revocation_table': revocation_table.stats(),
+        'login_throttle': login_throttle.stats(),
+        'tile_cache': tile_cache.stats(),
+        'geofence_cache': geofence_cache.stats(),
+    }
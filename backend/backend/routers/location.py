@@ -1,24 +1,32 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 
+from backend.database.database import run_with_session
 from backend.schemas.location import (
+    FeatureCollection,
+    GeofenceHitList,
+    LocationPing,
     TaskLocationPublic,
     TaskLocationSchema,
     UserLocationPublic,
     UserLocationSchema,
 )
 from backend.schemas.message import Message
+from backend.services.geofence import ping_location_service
 from backend.services.location import (
     create_task_location_service,
     create_user_location_service,
     delete_task_location_service,
     delete_user_location_service,
+    list_task_locations_service,
     read_task_location_service,
     read_user_location_service,
     update_task_location_service,
     update_user_location_service,
 )
+from backend.services.location_tiles import read_task_tile_service
 from backend.utils.dependencies import (
     CurrentUser,
+    FilterViewportQuery,
     Session,
 )
 
@@ -28,85 +36,162 @@ router = APIRouter(prefix='/locations', tags=['locations'])
 
 
 @router.post('/user', response_model=UserLocationPublic)
-def create_user_location(
+async def create_user_location(
     location: UserLocationSchema,
     session: Session,
     current_user: CurrentUser,
 ):
-    user_location = create_user_location_service(
-        location, session, current_user
+    user_location = await run_with_session(
+        create_user_location_service,
+        location,
+        session=session,
+        current_user=current_user,
     )
     return user_location
 
 
 @router.post('/task', response_model=TaskLocationPublic)
-def create_task_location(
+async def create_task_location(
     task_id: int,
     location: TaskLocationSchema,
     session: Session,
     current_user: CurrentUser,
 ):
-    task_location = create_task_location_service(
-        location, session, current_user, task_id
+    task_location = await run_with_session(
+        create_task_location_service,
+        location,
+        session=session,
+        current_user=current_user,
+        task_id=task_id,
     )
     return task_location
 
 
 @router.put('/user/{user_id}', response_model=UserLocationPublic)
-def update_user_location(
+async def update_user_location(
     location: UserLocationSchema,
     session: Session,
     current_user: CurrentUser,
 ):
-    user_location = update_user_location_service(
-        location, session, current_user
+    user_location = await run_with_session(
+        update_user_location_service,
+        location,
+        session=session,
+        current_user=current_user,
     )
     return user_location
 
 
 @router.put('/task/{task_id}', response_model=TaskLocationPublic)
-def update_task_location(
+async def update_task_location(
     task_id: int,
     location: TaskLocationSchema,
     session: Session,
     current_user: CurrentUser,
 ):
-    task_location = update_task_location_service(
-        task_id, location, session, current_user
+    task_location = await run_with_session(
+        update_task_location_service,
+        task_id,
+        location,
+        session=session,
+        current_user=current_user,
     )
     return task_location
 
 
+@router.get('/tasks', response_model=FeatureCollection)
+async def list_task_locations(
+    session: Session,
+    current_user: CurrentUser,
+    viewport: FilterViewportQuery,
+):
+    features = await run_with_session(
+        list_task_locations_service,
+        session=session,
+        current_user=current_user,
+        viewport=viewport,
+    )
+    return features
+
+
+@router.post('/ping', response_model=GeofenceHitList)
+async def ping_location(
+    ping: LocationPing,
+    session: Session,
+    current_user: CurrentUser,
+):
+    hits = await run_with_session(
+        ping_location_service,
+        ping,
+        session=session,
+        current_user=current_user,
+    )
+    return hits
+
+
+@router.get('/tiles/{z}/{x}/{y}.mvt')
+async def read_task_tile(
+    z: int,
+    x: int,
+    y: int,
+    session: Session,
+    current_user: CurrentUser,
+):
+    tile = await run_with_session(
+        read_task_tile_service,
+        z,
+        x,
+        y,
+        session=session,
+        current_user=current_user,
+    )
+    return Response(tile, media_type='application/vnd.mapbox-vector-tile')
+
+
 @router.get('/user/{user_id}', response_model=UserLocationPublic)
-def read_user_location(
+async def read_user_location(
     session: Session,
     current_user: CurrentUser,
 ):
-    user_location = read_user_location_service(session, current_user)
+    user_location = await run_with_session(
+        read_user_location_service, session=session, current_user=current_user
+    )
     return user_location
 
 
 @router.get('/task/{task_id}', response_model=TaskLocationPublic)
-def read_task_location(
+async def read_task_location(
     task_id: int,
     session: Session,
     current_user: CurrentUser,
 ):
-    task_location = read_task_location_service(task_id, session, current_user)
+    task_location = await run_with_session(
+        read_task_location_service,
+        task_id,
+        session=session,
+        current_user=current_user,
+    )
     return task_location
 
 
 @router.delete('/user/{user_id}', response_model=Message)
-def delete_user_location(session: Session, current_user: CurrentUser):
-    user_location = delete_user_location_service(session, current_user)
+async def delete_user_location(session: Session, current_user: CurrentUser):
+    user_location = await run_with_session(
+        delete_user_location_service,
+        session=session,
+        current_user=current_user,
+    )
     return user_location
 
 
 @router.delete('/task/{task_id}', response_model=Message)
-def delete_task_location(
+async def delete_task_location(
     task_id: int, session: Session, current_user: CurrentUser
 ):
-    task_location = delete_task_location_service(
-        task_id, session, current_user
+    task_location = await run_with_session(
+        delete_task_location_service,
+        task_id,
+        session=session,
+        current_user=current_user,
     )
     return task_location
@@ -1,20 +1,52 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
+from backend.database.database import run_with_session
 from backend.schemas.message import Message
-from backend.schemas.task import TaskList, TaskPatch, TaskPublic, TaskSchema
+from backend.schemas.task import (
+    TaskBulkCreate,
+    TaskBulkDelete,
+    TaskBulkPatch,
+    TaskBulkResult,
+    TaskFileFormat,
+    TaskImportResult,
+    TaskList,
+    TaskNearbyList,
+    TaskPatch,
+    TaskPublic,
+    TaskRoute,
+    TaskSchema,
+    TaskStatsPublic,
+)
 from backend.services.task import (
     activate_task_service,
     create_task_service,
+    create_tasks_bulk_service,
     deactivate_task_service,
     delete_task_service,
+    delete_tasks_bulk_service,
     done_task_service,
     list_tasks_service,
     patch_task_service,
+    patch_tasks_bulk_service,
     read_task_service,
 )
+from backend.services.task_nearby import nearby_tasks_service
+from backend.services.task_route import task_route_service
+from backend.services.task_search import search_tasks_service
+from backend.services.task_stats import read_task_stats_service
+from backend.services.task_transfer import (
+    MEDIA_TYPES,
+    export_tasks_service,
+    import_tasks_service,
+)
 from backend.utils.dependencies import (
     CurrentUser,
+    FilterTaskNearbyQuery,
     FilterTaskPage,
+    FilterTaskRouteQuery,
+    FilterTaskSearchPage,
     Session,
 )
 
@@ -24,70 +56,234 @@ router = APIRouter(prefix='/tasks', tags=['tasks'])
 
 
 @router.post('/', response_model=TaskPublic)
-def create_task(
+async def create_task(
     task: TaskSchema,
     session: Session,
     current_user: CurrentUser,
 ):
-    task = create_task_service(task, session, current_user)
+    task = await run_with_session(
+        create_task_service, task, session=session, current_user=current_user
+    )
     return task
 
 
+@router.post('/bulk', response_model=TaskBulkResult)
+async def create_tasks_bulk(
+    bulk: TaskBulkCreate,
+    session: Session,
+    current_user: CurrentUser,
+):
+    results = await run_with_session(
+        create_tasks_bulk_service,
+        bulk,
+        session=session,
+        current_user=current_user,
+    )
+    return results
+
+
+@router.patch('/bulk', response_model=TaskBulkResult)
+async def patch_tasks_bulk(
+    bulk: TaskBulkPatch,
+    session: Session,
+    current_user: CurrentUser,
+):
+    results = await run_with_session(
+        patch_tasks_bulk_service,
+        bulk,
+        session=session,
+        current_user=current_user,
+    )
+    return results
+
+
+@router.delete('/bulk', response_model=TaskBulkResult)
+async def delete_tasks_bulk(
+    bulk: TaskBulkDelete,
+    session: Session,
+    current_user: CurrentUser,
+):
+    results = await run_with_session(
+        delete_tasks_bulk_service,
+        bulk,
+        session=session,
+        current_user=current_user,
+    )
+    return results
+
+
 @router.get('/', response_model=TaskList)
-def list_tasks(
+async def list_tasks(
     session: Session,
     current_user: CurrentUser,
     task_filter: FilterTaskPage,
 ):
-    list = list_tasks_service(session, current_user, task_filter)
+    list = await run_with_session(
+        list_tasks_service,
+        session=session,
+        current_user=current_user,
+        task_filter=task_filter,
+    )
 
     return list
 
 
+@router.get('/export')
+async def export_tasks(
+    current_user: CurrentUser,
+    file_format: TaskFileFormat = Query(TaskFileFormat.ndjson, alias='format'),
+):
+    return StreamingResponse(
+        export_tasks_service(current_user.id, file_format),
+        media_type=MEDIA_TYPES[file_format],
+        headers={
+            'Content-Disposition': (
+                f'attachment; filename="tasks.{file_format.value}"'
+            )
+        },
+    )
+
+
+@router.post('/import', response_model=TaskImportResult)
+async def import_tasks(
+    file: UploadFile,
+    current_user: CurrentUser,
+    file_format: TaskFileFormat = Query(TaskFileFormat.ndjson, alias='format'),
+):
+    result = await run_in_threadpool(
+        import_tasks_service, file.file, file_format, current_user.id
+    )
+    return result
+
+
+@router.get('/search', response_model=TaskList)
+async def search_tasks(
+    session: Session,
+    current_user: CurrentUser,
+    search: FilterTaskSearchPage,
+):
+    page = await run_with_session(
+        search_tasks_service,
+        session=session,
+        current_user=current_user,
+        search=search,
+    )
+    return page
+
+
+@router.get('/nearby', response_model=TaskNearbyList)
+async def nearby_tasks(
+    session: Session,
+    current_user: CurrentUser,
+    nearby: FilterTaskNearbyQuery,
+):
+    tasks = await run_with_session(
+        nearby_tasks_service,
+        session=session,
+        current_user=current_user,
+        nearby=nearby,
+    )
+    return tasks
+
+
+@router.get('/route', response_model=TaskRoute)
+async def task_route(
+    session: Session,
+    current_user: CurrentUser,
+    route: FilterTaskRouteQuery,
+):
+    planned_route = await run_with_session(
+        task_route_service,
+        session=session,
+        current_user=current_user,
+        route=route,
+    )
+    return planned_route
+
+
+@router.get('/stats', response_model=TaskStatsPublic)
+async def read_task_stats(session: Session, current_user: CurrentUser):
+    stats = await run_with_session(
+        read_task_stats_service, session=session, current_user=current_user
+    )
+    return stats
+
+
 @router.get('/{task_id}', response_model=TaskPublic)
-def read_task(
+async def read_task(
     task_id: int,
     session: Session,
     current_user: CurrentUser,
 ):
-    task = read_task_service(task_id, session, current_user)
+    task = await run_with_session(
+        read_task_service, task_id, session=session, current_user=current_user
+    )
     return task
 
 
 @router.patch('/{task_id}', response_model=TaskPublic)
-def patch_task(
+async def patch_task(
     task_id: int,
     session: Session,
     current_user: CurrentUser,
     task: TaskPatch,
 ):
-    task = patch_task_service(task_id, session, current_user, task)
+    task = await run_with_session(
+        patch_task_service,
+        task_id,
+        session=session,
+        current_user=current_user,
+        task=task,
+    )
     return task
 
 
 @router.patch('/done/{task_id}', response_model=TaskPublic)
-def done_task(
+async def done_task(
     task_id: int,
     session: Session,
     current_user: CurrentUser,
 ):
-    task = done_task_service(task_id, session, current_user)
+    task = await run_with_session(
+        done_task_service, task_id, session=session, current_user=current_user
+    )
     return task
 
 
 @router.patch('/deactivate/{task_id}', response_model=TaskPublic)
-def deactivate_task(task_id: int, session: Session, current_user: CurrentUser):
-    task = deactivate_task_service(task_id, session, current_user)
+async def deactivate_task(
+    task_id: int, session: Session, current_user: CurrentUser
+):
+    task = await run_with_session(
+        deactivate_task_service,
+        task_id,
+        session=session,
+        current_user=current_user,
+    )
     return task
 
 
 @router.patch('/activate/{task_id}', response_model=TaskPublic)
-def activate_task(task_id: int, session: Session):
-    task = activate_task_service(task_id, session)
+async def activate_task(
+    task_id: int, session: Session, current_user: CurrentUser
+):
+    task = await run_with_session(
+        activate_task_service,
+        task_id,
+        session=session,
+        current_user=current_user,
+    )
     return task
 
 
 @router.delete('/{task_id}', response_model=Message)
-def delete_task(task_id: int, session: Session, current_user: CurrentUser):
-    task = delete_task_service(task_id, session, current_user)
+async def delete_task(
+    task_id: int, session: Session, current_user: CurrentUser
+):
+    task = await run_with_session(
+        delete_task_service,
+        task_id,
+        session=session,
+        current_user=current_user,
+    )
     return task
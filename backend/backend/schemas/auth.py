@@ -8,6 +8,8 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     username: str | None = None
+    user_id: int | None = None
+    token_version: int = 0
 
 
 class LoginInfo(BaseModel):
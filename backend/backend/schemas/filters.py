@@ -1,6 +1,21 @@
-from pydantic import BaseModel
+from enum import Enum
+
+from pydantic import BaseModel, Field
+
+
+class SortOrder(str, Enum):
+    asc = 'asc'
+    desc = 'desc'
 
 
 class FilterPage(BaseModel):
-    offset: int = 0
-    limit: int = 100
+    offset: int = Field(0, ge=0)
+    limit: int = Field(100, ge=1, le=100)
+    cursor: str | None = None
+    count: bool = False
+
+
+class PageInfo(BaseModel):
+    next_cursor: str | None = None
+    total: int | None = None
+    total_is_estimate: bool = False
@@ -1,4 +1,10 @@
-from pydantic import BaseModel, ConfigDict
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+MAX_LON = 180
+MAX_LAT = 90
+MAX_GEOFENCE_RADIUS_M = 10_000
 
 
 class UserLocationSchema(BaseModel):
@@ -16,6 +22,7 @@ class TaskLocationSchema(BaseModel):
     name: str
     lat: float
     lon: float
+    geofence_radius_m: float = Field(100, gt=0, le=MAX_GEOFENCE_RADIUS_M)
 
 
 class UserLocationPublic(BaseModel):
@@ -39,8 +46,72 @@ class TaskLocationPublic(BaseModel):
     lon: float
     geom: dict
     task_id: int
+    geofence_radius_m: float
+    model_config = ConfigDict(from_attributes=True)
+
+
+class LocationSummary(BaseModel):
+    id: int
+    place_id: int
+    display_name: str
+    name: str
+    lat: float
+    lon: float
     model_config = ConfigDict(from_attributes=True)
 
 
 class LocationList(BaseModel):
     locations: list[TaskLocationPublic]
+
+
+class FilterViewport(BaseModel):
+    bbox: str
+    zoom: int = Field(ge=0, le=22)
+
+    @field_validator('bbox')
+    @classmethod
+    def parse_bbox(cls, value: str):
+        try:
+            min_lon, min_lat, max_lon, max_lat = map(float, value.split(','))
+        except ValueError:
+            raise ValueError('bbox must be minlon,minlat,maxlon,maxlat')
+
+        if not (
+            -MAX_LON <= min_lon < max_lon <= MAX_LON
+            and -MAX_LAT <= min_lat < max_lat <= MAX_LAT
+        ):
+            raise ValueError('bbox is out of range')
+
+        return value
+
+    @property
+    def bounds(self):
+        return tuple(map(float, self.bbox.split(',')))
+
+
+class Feature(BaseModel):
+    type: Literal['Feature'] = 'Feature'
+    geometry: dict
+    properties: dict
+
+
+class FeatureCollection(BaseModel):
+    type: Literal['FeatureCollection'] = 'FeatureCollection'
+    features: list[Feature]
+    truncated: bool = False
+
+
+class LocationPing(BaseModel):
+    lat: float = Field(ge=-MAX_LAT, le=MAX_LAT)
+    lon: float = Field(ge=-MAX_LON, le=MAX_LON)
+
+
+class GeofenceHit(BaseModel):
+    task_id: int
+    title: str
+    distance_m: float
+    radius_m: float
+
+
+class GeofenceHitList(BaseModel):
+    tasks: list[GeofenceHit]
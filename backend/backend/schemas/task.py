@@ -1,7 +1,17 @@
-from pydantic import BaseModel, ConfigDict
+from enum import Enum
+
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    field_validator,
+    model_validator,
+)
+from sqlalchemy import inspect
 
 from backend.database.enums import TaskPriority
-from backend.schemas.filters import FilterPage
+from backend.schemas.filters import FilterPage, PageInfo, SortOrder
+from backend.schemas.location import MAX_LAT, MAX_LON, LocationSummary
 
 
 class TaskSchema(BaseModel):
@@ -19,8 +29,24 @@ class TaskPublic(BaseModel):
     done: bool
     priority: TaskPriority
     user_id: int
+    location: LocationSummary | None = None
     model_config = ConfigDict(from_attributes=True)
 
+    @model_validator(mode='before')
+    @classmethod
+    def skip_unloaded_location(cls, data):
+        # Only embed the location when the query eager loaded it; reading
+        # the attribute otherwise would lazy load it once per task
+        state = inspect(data, raiseerr=False)
+        if state is None or 'location' not in state.unloaded:
+            return data
+
+        return {
+            field: getattr(data, field)
+            for field in cls.model_fields
+            if field != 'location'
+        }
+
 
 class TaskPatch(BaseModel):
     title: str | None = None
@@ -28,11 +54,77 @@ class TaskPatch(BaseModel):
     done: bool | None = None
     priority: TaskPriority | None = None
 
+    @field_validator('title', 'description', 'done', 'priority')
+    @classmethod
+    def reject_null(cls, value):
+        # Omitted fields stay as they are; every task column is NOT NULL,
+        # so an explicit null cannot be written by any patch
+        if value is None:
+            raise ValueError('cannot be null')
+
+        return value
 
-class TaskList(BaseModel):
+
+class TaskList(PageInfo):
     tasks: list[TaskPublic]
 
 
+class TaskBulkCreate(BaseModel):
+    tasks: list[TaskSchema]
+
+
+class TaskBulkPatchItem(TaskPatch):
+    id: int
+
+
+class TaskBulkPatch(BaseModel):
+    tasks: list[TaskBulkPatchItem]
+
+
+class TaskBulkDelete(BaseModel):
+    ids: list[int]
+
+
+class TaskBulkItemResult(BaseModel):
+    index: int
+    id: int | None = None
+    status: str
+    task: TaskPublic | None = None
+
+
+class TaskBulkResult(BaseModel):
+    results: list[TaskBulkItemResult]
+
+
+class TaskFileFormat(str, Enum):
+    ndjson = 'ndjson'
+    csv = 'csv'
+
+
+class TaskImportRow(BaseModel):
+    title: str
+    description: str
+    done: bool
+    priority: TaskPriority
+
+
+class TaskImportResult(BaseModel):
+    received: int
+    imported: int
+    skipped: int
+    invalid: int
+
+
+class TaskStatsPublic(BaseModel):
+    total: int
+    active: int
+    done: int
+    high: int
+    medium: int
+    low: int
+    model_config = ConfigDict(from_attributes=True)
+
+
 class FilterTask(BaseModel):
     title: str | None = None
     description: str | None = None
@@ -40,6 +132,90 @@ class FilterTask(BaseModel):
     done: bool | None = None
 
 
+class TaskSortField(str, Enum):
+    priority = 'priority'
+    created_at = 'created_at'
+    update_at = 'update_at'
+    done = 'done'
+
+
+class TaskInclude(str, Enum):
+    location = 'location'
+
+
 class FilterTaskPagination(FilterPage):
     priority: TaskPriority | None = None
     done: bool | None = None
+    archived: bool = False
+    sort: TaskSortField | None = None
+    order: SortOrder = SortOrder.asc
+    include: TaskInclude | None = None
+
+
+class FilterTaskSearch(FilterPage):
+    q: str = Field(min_length=1)
+    priority: TaskPriority | None = None
+    done: bool | None = None
+
+
+class FilterTaskNearby(BaseModel):
+    radius_m: float = Field(1000.0, gt=0, le=100_000)
+    limit: int = Field(20, gt=0, le=100)
+    lat: float | None = Field(None, ge=-90, le=90)
+    lon: float | None = Field(None, ge=-180, le=180)
+
+    @model_validator(mode='after')
+    def lat_and_lon_together(self):
+        # Without both the user location is used, so half a point would
+        # otherwise be dropped without a word
+        if (self.lat is None) != (self.lon is None):
+            raise ValueError('lat and lon must be given together')
+
+        return self
+
+
+class TaskNearby(BaseModel):
+    task: TaskPublic
+    distance_m: float
+
+
+class TaskNearbyList(BaseModel):
+    tasks: list[TaskNearby]
+
+
+class FilterTaskRoute(BaseModel):
+    start: str = 'user'
+
+    @field_validator('start')
+    @classmethod
+    def parse_start(cls, value: str):
+        if value == 'user':
+            return value
+
+        try:
+            lat, lon = map(float, value.split(','))
+        except ValueError:
+            raise ValueError("start must be 'user' or lat,lon")
+
+        if not (-MAX_LAT <= lat <= MAX_LAT and -MAX_LON <= lon <= MAX_LON):
+            raise ValueError('start is out of range')
+
+        return value
+
+    @property
+    def point(self):
+        if self.start == 'user':
+            return None
+
+        return tuple(map(float, self.start.split(',')))
+
+
+class TaskRouteStop(BaseModel):
+    task: TaskPublic
+    leg_m: float
+
+
+class TaskRoute(BaseModel):
+    stops: list[TaskRouteStop]
+    total_m: float
+    truncated: bool = False
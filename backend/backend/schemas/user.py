@@ -1,5 +1,7 @@
 from pydantic import BaseModel, ConfigDict, EmailStr
 
+from backend.schemas.filters import PageInfo
+
 
 class UserSchema(BaseModel):
     username: str
@@ -20,7 +22,7 @@ class UserPatch(BaseModel):
     password: str | None = None
 
 
-class UserList(BaseModel):
+class UserList(PageInfo):
     users: list[UserPublic]
 
 
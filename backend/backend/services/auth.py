@@ -2,24 +2,46 @@ from sqlalchemy import select
 
 from backend.auth.security import (
     create_access_token,
+    login_throttle,
+    user_token_claims,
     verify_password,
 )
+from backend.database.database import run_with_session
 from backend.database.models import User
-from backend.utils.dependencies import OAuth2Form, Session
+from backend.utils.dependencies import CurrentUser, OAuth2Form, Session
 from backend.utils.exceptions import IncorrectLoginException
 
 
-def generate_access_token(form_data: OAuth2Form, session: Session):
-    user = session.scalar(
-        select(User).where(User.email == form_data.username, User.is_active)
-    )
+async def generate_access_token(
+    form_data: OAuth2Form, session: Session, client: str | None
+):
+    attempt = login_throttle.check(form_data.username, client)
 
-    if not user:
-        raise IncorrectLoginException
-    if not verify_password(form_data.password, user.password):
+    try:
+        user = await run_with_session(
+            lambda session: session.scalar(
+                select(User).where(
+                    User.email == form_data.username, User.is_active
+                )
+            ),
+            session=session,
+        )
+        valid = user is not None and await verify_password(
+            form_data.password, user.password
+        )
+    except Exception:
+        # A busy hashing pool or a database error is not a failed login;
+        # a cancelled request keeps its slot, since the hash may still run
+        login_throttle.release(attempt)
+        raise
+
+    if not valid:
+        login_throttle.record_failure(attempt)
         raise IncorrectLoginException
 
-    access_token = create_access_token(data={'sub': user.email})
+    login_throttle.record_success(attempt)
+
+    access_token = create_access_token(data=user_token_claims(user))
 
     return {
         'id': user.id,
@@ -27,3 +49,11 @@ def generate_access_token(form_data: OAuth2Form, session: Session):
         'email': user.email,
         'access_token': access_token,
     }
+
+
+def refresh_access_token_service(session: Session, current_user: CurrentUser):
+    new_access_token = create_access_token(
+        data=user_token_claims(current_user)
+    )
+
+    return {'access_token': new_access_token, 'token_type': 'bearer'}
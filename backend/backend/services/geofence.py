@@ -0,0 +1,51 @@
+from sqlalchemy import select
+
+from backend.config.settings import Settings
+from backend.database.models import Location, Place, Task
+from backend.schemas.location import LocationPing
+from backend.utils.cache import TTLCache
+from backend.utils.dependencies import CurrentUser, Session
+from backend.utils.geofence import GeofenceIndex
+
+settings = Settings()
+geofence_cache = TTLCache(
+    maxsize=settings.GEOFENCE_CACHE_SIZE,
+    ttl=settings.GEOFENCE_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_geofences(user_id: int):
+    # Called after commit; other workers pick the change up within the TTL
+    geofence_cache.pop(user_id)
+
+
+def _load_geofences(session: Session, user_id: int):
+    fences = session.execute(
+        select(
+            Task.id,
+            Task.title,
+            Place.lat,
+            Place.lon,
+            Location.geofence_radius_m,
+        )
+        .join(Location, Location.task_id == Task.id)
+        .join(Place, Place.place_id == Location.place_id)
+        .where(Task.user_id == user_id, Task.is_active, ~Task.done)
+    ).all()
+
+    return GeofenceIndex(fences)
+
+
+def ping_location_service(
+    ping: LocationPing,
+    session: Session,
+    current_user: CurrentUser,
+):
+    # The index covers all of the user's open tasks, so pings only touch
+    # the database when it was invalidated or expired
+    index = geofence_cache.get(current_user.id)
+    if index is None:
+        index = _load_geofences(session, current_user.id)
+        geofence_cache.set(current_user.id, index)
+
+    return {'tasks': index.containing(ping.lat, ping.lon)}
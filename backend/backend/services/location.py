@@ -1,15 +1,21 @@
-import json
-
-from sqlalchemy import select
-from sqlalchemy.sql import func
-
-from backend.database.models import Location, Task, User
+from geoalchemy2.shape import to_shape
+from shapely.geometry import mapping
+from sqlalchemy import delete, exists, insert, literal, null, select, update
+from sqlalchemy.orm import QueryableAttribute
+from sqlalchemy.sql import ClauseElement, func
+
+from backend.config.settings import Settings
+from backend.database.models import Location, Place, Task
 from backend.schemas.location import (
     TaskLocationSchema,
     UserLocationSchema,
 )
+from backend.services.geofence import invalidate_geofences
+from backend.services.location_tiles import bump_location_version
+from backend.services.place import upsert_place
 from backend.utils.dependencies import (
     CurrentUser,
+    FilterViewportQuery,
     Session,
 )
 from backend.utils.exceptions import (
@@ -18,50 +24,91 @@ from backend.utils.exceptions import (
     TaskNotFoundException,
     UserLocationExistsException,
     UserLocationNotFoundException,
-    UserNotFoundException,
 )
 
+settings = Settings()
+
+
+def _insert_location(values: dict, *criteria):
+    # INSERT ... SELECT so the existence and ownership checks run in the
+    # same statement; no row is inserted when the criteria do not match
+    columns = [
+        value
+        if isinstance(value, (ClauseElement, QueryableAttribute))
+        else literal(value, type_=getattr(Location, key).type)
+        for key, value in values.items()
+    ]
+
+    return (
+        insert(Location)
+        .from_select(list(values), select(*columns).where(*criteria))
+        .returning(Location)
+    )
+
+
+def _owned_task(task_id: int, current_user: CurrentUser):
+    return (
+        Task.id == task_id,
+        Task.user_id == current_user.id,
+        Task.is_active,
+    )
+
+
+def _task_missing_exception(
+    session: Session, task_id: int, current_user: CurrentUser, exception
+):
+    # Only reached on the error path, to tell a missing or foreign task
+    # apart from a task without (or with) a location. The place upserted
+    # before is rolled back with the rest of the request.
+    task_exists = session.scalar(
+        select(exists().where(*_owned_task(task_id, current_user)))
+    )
+
+    return exception if task_exists else TaskNotFoundException
+
+
+def _point(lon: float, lat: float):
+    return {'type': 'Point', 'coordinates': [lon, lat]}
+
+
+def _location_public(db_location: Location, place: Place | None = None):
+    # geom is already loaded as WKB with the place, so the GeoJSON is
+    # built here instead of asking the database for ST_AsGeoJSON
+    place = place or db_location.place
+
+    return {
+        **db_location.__dict__,
+        'display_name': place.display_name,
+        'name': place.name,
+        'lat': place.lat,
+        'lon': place.lon,
+        'geom': mapping(to_shape(place.geom)),
+    }
+
 
 def create_user_location_service(
     location: UserLocationSchema,
     session: Session,
     current_user: CurrentUser,
 ):
-    db_user = session.scalar(
-        select(User).where(User.id == current_user.id, User.is_active)
-    )
-    if not db_user:
-        raise UserNotFoundException
-
-    existing_location = session.scalar(
-        select(Location).where(Location.user_id == current_user.id)
+    place = upsert_place(session, location)
+    db_location = session.scalar(
+        _insert_location(
+            {
+                'place_id': location.place_id,
+                'user_id': current_user.id,
+                'task_id': None,
+            },
+            ~exists().where(Location.user_id == current_user.id),
+        )
     )
 
-    if existing_location:
+    if not db_location:
         raise UserLocationExistsException
 
-    db_location = Location(
-        place_id=location.place_id,
-        display_name=location.display_name,
-        name=location.name,
-        lat=location.lat,
-        lon=location.lon,
-        geom=func.ST_SetSRID(
-            func.ST_MakePoint(location.lon, location.lat), 4326
-        ),
-        user_id=current_user.id,
-        task_id=None,
-    )
-    session.add(db_location)
     session.commit()
-    session.refresh(db_location)
 
-    return {
-        **db_location.__dict__,
-        'geom': json.loads(
-            session.scalar(func.ST_AsGeoJSON(db_location.geom))
-        ),
-    }
+    return _location_public(db_location, place)
 
 
 def create_task_location_service(
@@ -70,45 +117,30 @@ def create_task_location_service(
     current_user: CurrentUser,
     task_id: int,
 ):
-    db_task = session.scalar(
-        select(Task).where(
-            Task.id == task_id, Task.user_id == current_user.id, Task.is_active
+    place = upsert_place(session, location)
+    db_location = session.scalar(
+        _insert_location(
+            {
+                'place_id': location.place_id,
+                'geofence_radius_m': location.geofence_radius_m,
+                'task_id': Task.id,
+                'user_id': null(),
+            },
+            *_owned_task(task_id, current_user),
+            ~exists().where(Location.task_id == Task.id),
         )
     )
 
-    if not db_task:
-        raise TaskNotFoundException
-
-    existing_location = (
-        session.query(Location).filter(Location.task_id == db_task.id).first()
-    )
-
-    if existing_location:
-        raise TaskLocationExistsException
-
-    db_location = Location(
-        place_id=location.place_id,
-        display_name=location.display_name,
-        name=location.name,
-        lat=location.lat,
-        lon=location.lon,
-        geom=func.ST_SetSRID(
-            func.ST_MakePoint(location.lon, location.lat), 4326
-        ),
-        task_id=task_id,
-        user_id=None,
-    )
+    if not db_location:
+        raise _task_missing_exception(
+            session, task_id, current_user, TaskLocationExistsException
+        )
 
-    session.add(db_location)
+    bump_location_version(session, current_user.id)
     session.commit()
-    session.refresh(db_location)
+    invalidate_geofences(current_user.id)
 
-    return {
-        **db_location.__dict__,
-        'geom': json.loads(
-            session.scalar(func.ST_AsGeoJSON(db_location.geom))
-        ),
-    }
+    return _location_public(db_location, place)
 
 
 def update_user_location_service(
@@ -116,40 +148,20 @@ def update_user_location_service(
     session: Session,
     current_user: CurrentUser,
 ):
-    db_user = session.scalar(
-        select(User).where(User.id == current_user.id, User.is_active)
-    )
-
-    if not db_user:
-        raise UserNotFoundException
-
+    place = upsert_place(session, location)
     db_location = session.scalar(
-        select(Location).where(Location.user_id == current_user.id)
+        update(Location)
+        .where(Location.user_id == current_user.id)
+        .values(place_id=location.place_id)
+        .returning(Location)
     )
 
     if not db_location:
         raise UserLocationNotFoundException
 
-    db_location.place_id = location.place_id
-    db_location.display_name = location.display_name
-    db_location.name = location.name
-    db_location.lat = location.lat
-    db_location.lon = location.lon
-    db_location.geom = func.ST_SetSRID(
-        func.ST_MakePoint(location.lon, location.lat), 4326
-    )
-    db_location.user_id = current_user.id
-    db_location.task_id = None
-
     session.commit()
-    session.refresh(db_location)
 
-    return {
-        **db_location.__dict__,
-        'geom': json.loads(
-            session.scalar(func.ST_AsGeoJSON(db_location.geom))
-        ),
-    }
+    return _location_public(db_location, place)
 
 
 def update_task_location_service(
@@ -158,67 +170,43 @@ def update_task_location_service(
     session: Session,
     current_user: CurrentUser,
 ):
-    db_task = session.scalar(
-        select(Task).where(
-            Task.id == task_id, Task.user_id == current_user.id, Task.is_active
-        )
-    )
-
-    if not db_task:
-        raise TaskNotFoundException
-
+    place = upsert_place(session, location)
     db_location = session.scalar(
-        select(Location).where(Location.task_id == task_id)
+        update(Location)
+        .where(
+            Location.task_id == Task.id, *_owned_task(task_id, current_user)
+        )
+        .values(
+            place_id=location.place_id,
+            geofence_radius_m=location.geofence_radius_m,
+        )
+        .returning(Location)
     )
 
     if not db_location:
-        raise TaskLocationNotFoundException
-
-    db_location.place_id = location.place_id
-    db_location.display_name = location.display_name
-    db_location.name = location.name
-    db_location.lat = location.lat
-    db_location.lon = location.lon
-    db_location.geom = func.ST_SetSRID(
-        func.ST_MakePoint(location.lon, location.lat), 4326
-    )
-    db_location.task_id = task_id
-    db_location.user_id = None
+        raise _task_missing_exception(
+            session, task_id, current_user, TaskLocationNotFoundException
+        )
 
+    bump_location_version(session, current_user.id)
     session.commit()
-    session.refresh(db_location)
+    invalidate_geofences(current_user.id)
 
-    return {
-        **db_location.__dict__,
-        'geom': json.loads(
-            session.scalar(func.ST_AsGeoJSON(db_location.geom))
-        ),
-    }
+    return _location_public(db_location, place)
 
 
 def read_user_location_service(
     session: Session,
     current_user: CurrentUser,
 ):
-    db_user = session.scalar(
-        select(User).where(User.id == current_user.id, User.is_active)
-    )
-
-    if not db_user:
-        raise UserNotFoundException
-
     db_location = session.scalar(
         select(Location).where(Location.user_id == current_user.id)
     )
 
     if not db_location:
         raise UserLocationNotFoundException
-    return {
-        **db_location.__dict__,
-        'geom': json.loads(
-            session.scalar(func.ST_AsGeoJSON(db_location.geom))
-        ),
-    }
+
+    return _location_public(db_location)
 
 
 def read_task_location_service(
@@ -226,45 +214,31 @@ def read_task_location_service(
     session: Session,
     current_user: CurrentUser,
 ):
-    db_task = session.scalar(
-        select(Task).where(
-            Task.id == task_id, Task.user_id == current_user.id, Task.is_active
-        )
-    )
+    row = session.execute(
+        select(Task.id, Location)
+        .outerjoin(Location, Location.task_id == Task.id)
+        .where(*_owned_task(task_id, current_user))
+    ).one_or_none()
 
-    if not db_task:
+    if not row:
         raise TaskNotFoundException
 
-    db_location = session.scalar(
-        select(Location).where(Location.task_id == task_id)
-    )
-
-    if not db_location:
+    if not row.Location:
         raise TaskLocationNotFoundException
 
-    return {
-        **db_location.__dict__,
-        'geom': json.loads(
-            session.scalar(func.ST_AsGeoJSON(db_location.geom))
-        ),
-    }
+    return _location_public(row.Location)
 
 
 def delete_user_location_service(session: Session, current_user: CurrentUser):
-    db_user = session.scalar(
-        select(User).where(User.id == current_user.id, User.is_active)
+    deleted_id = session.scalar(
+        delete(Location)
+        .where(Location.user_id == current_user.id)
+        .returning(Location.id)
     )
 
-    if not db_user:
-        raise UserNotFoundException
-
-    db_location = session.scalar(
-        select(Location).where(
-            Location.user_id == current_user.id,
-        )
-    )
+    if not deleted_id:
+        raise UserLocationNotFoundException
 
-    session.delete(db_location)
     session.commit()
 
     return {
@@ -275,20 +249,104 @@ def delete_user_location_service(session: Session, current_user: CurrentUser):
 def delete_task_location_service(
     task_id: int, session: Session, current_user: CurrentUser
 ):
-    db_task = session.scalar(
-        select(Task).where(Task.user_id == current_user.id, Task.id == task_id)
+    owned_task = select(Task.id).where(
+        Task.user_id == current_user.id, Task.id == task_id
     )
 
-    if not db_task:
-        raise TaskNotFoundException
-
-    db_location = session.scalar(
-        select(Location).where(Location.task_id == task_id)
+    deleted_id = session.scalar(
+        delete(Location)
+        .where(Location.task_id.in_(owned_task))
+        .returning(Location.id)
     )
 
-    session.delete(db_location)
+    if not deleted_id:
+        task_exists = session.scalar(select(exists(owned_task)))
+        if not task_exists:
+            raise TaskNotFoundException
+        raise TaskLocationNotFoundException
+
+    bump_location_version(session, current_user.id)
     session.commit()
+    invalidate_geofences(current_user.id)
 
     return {
         'message': 'The location of this task has been successfully deleted.'
     }
+
+
+def list_task_locations_service(
+    session: Session,
+    current_user: CurrentUser,
+    viewport: FilterViewportQuery,
+):
+    max_features = settings.LOCATION_VIEWPORT_MAX_FEATURES
+    in_viewport = (
+        Location.task_id == Task.id,
+        Place.place_id == Location.place_id,
+        Task.user_id == current_user.id,
+        Task.is_active,
+        # && is the bounding box operator served by idx_places_geom
+        Place.geom.bool_op('&&')(func.ST_MakeEnvelope(*viewport.bounds, 4326)),
+    )
+
+    if viewport.zoom <= settings.LOCATION_CLUSTER_MAX_ZOOM:
+        # Grid clustering: a few cells per 256px tile at this zoom, so the
+        # number of features is bounded by the viewport, not by the data
+        cell = (
+            360 / 2**viewport.zoom / settings.LOCATION_CLUSTER_CELLS_PER_TILE
+        )
+        column = func.floor(Place.lon / cell)
+        row = func.floor(Place.lat / cell)
+        clusters = session.execute(
+            select(
+                func.count().label('count'),
+                func.avg(Place.lon).label('lon'),
+                func.avg(Place.lat).label('lat'),
+            )
+            .where(*in_viewport)
+            .group_by(column, row)
+            .limit(max_features + 1)
+        ).all()
+
+        features = [
+            {
+                'geometry': _point(cluster.lon, cluster.lat),
+                'properties': {'cluster': True, 'count': cluster.count},
+            }
+            for cluster in clusters[:max_features]
+        ]
+
+        return {
+            'features': features,
+            'truncated': len(clusters) > max_features,
+        }
+
+    points = session.execute(
+        select(
+            Location.id,
+            Location.task_id,
+            Place.name,
+            Place.lon,
+            Place.lat,
+            Task.title,
+        )
+        .where(*in_viewport)
+        .order_by(Location.id)
+        .limit(max_features + 1)
+    ).all()
+
+    features = [
+        {
+            'geometry': _point(point.lon, point.lat),
+            'properties': {
+                'cluster': False,
+                'location_id': point.id,
+                'task_id': point.task_id,
+                'name': point.name,
+                'title': point.title,
+            },
+        }
+        for point in points[:max_features]
+    ]
+
+    return {'features': features, 'truncated': len(points) > max_features}
@@ -0,0 +1,101 @@
+from sqlalchemy import String, cast, func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.auth.throttle import load_backend
+from backend.config.settings import Settings
+from backend.database.models import Location, LocationVersion, Place, Task
+from backend.utils.dependencies import CurrentUser, Session
+from backend.utils.exceptions import TileNotFoundException
+from backend.utils.tile_cache import TileCache
+
+settings = Settings()
+tile_cache = TileCache(
+    maxsize=settings.TILE_CACHE_SIZE,
+    ttl=settings.TILE_CACHE_TTL_SECONDS,
+    store=load_backend(settings.TILE_CACHE_STORE),
+)
+
+MAX_ZOOM = 22
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+# Task columns that end up in a tile, or decide whether the task is in it
+TILE_TASK_FIELDS = {'title', 'done', 'priority', 'is_active'}
+
+
+def changes_tiles(values: dict):
+    return not TILE_TASK_FIELDS.isdisjoint(values)
+
+
+def bump_location_version(session: Session, user_id: int):
+    # Part of the caller's transaction; cached tiles are keyed by this
+    # version, so committing it retires every tile of the user at once
+    query = insert(LocationVersion).values(user_id=user_id, version=1)
+    session.execute(
+        query.on_conflict_do_update(
+            index_elements=[LocationVersion.user_id],
+            set_={'version': LocationVersion.version + 1},
+        )
+    )
+
+
+def _build_tile(session: Session, user_id: int, z: int, x: int, y: int):
+    envelope = func.ST_TileEnvelope(z, x, y)
+    tile_rows = (
+        select(
+            func.ST_AsMVTGeom(
+                func.ST_Transform(Place.geom, 3857),
+                envelope,
+                TILE_EXTENT,
+                TILE_BUFFER,
+                True,
+            ).label('geom'),
+            Task.id.label('task_id'),
+            Task.title,
+            Task.done,
+            cast(Task.priority, String).label('priority'),
+        )
+        .select_from(Location)
+        .join(Task, Task.id == Location.task_id)
+        .join(Location.place)
+        .where(
+            Task.user_id == user_id,
+            Task.is_active,
+            Place.geom.bool_op('&&')(func.ST_Transform(envelope, 4326)),
+        )
+        .subquery('tile_rows')
+    )
+
+    tile = session.scalar(
+        select(
+            func.ST_AsMVT(
+                tile_rows.table_valued(), 'tasks', TILE_EXTENT, 'geom'
+            )
+        )
+    )
+
+    return bytes(tile or b'')
+
+
+def read_task_tile_service(
+    z: int,
+    x: int,
+    y: int,
+    session: Session,
+    current_user: CurrentUser,
+):
+    if not (0 <= z <= MAX_ZOOM and 0 <= x < 2**z and 0 <= y < 2**z):
+        raise TileNotFoundException
+
+    version = session.scalar(
+        select(LocationVersion.version).where(
+            LocationVersion.user_id == current_user.id
+        )
+    )
+    key = (current_user.id, z, x, y, version or 0)
+
+    tile = tile_cache.get(key)
+    if tile is None:
+        tile = _build_tile(session, current_user.id, z, x, y)
+        tile_cache.set(key, tile)
+
+    return tile
@@ -0,0 +1,58 @@
+from math import isclose
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.database.models import Place
+from backend.schemas.location import TaskLocationSchema, UserLocationSchema
+from backend.utils.dependencies import Session
+from backend.utils.exceptions import PlaceConflictException
+
+# About 1 cm; geocoders send the coordinates of a place with fewer digits
+COORDINATE_TOLERANCE = 1e-7
+
+
+def _same_place(
+    place: Place, location: TaskLocationSchema | UserLocationSchema
+):
+    return (
+        place.name == location.name
+        and place.display_name == location.display_name
+        and isclose(place.lat, location.lat, abs_tol=COORDINATE_TOLERANCE)
+        and isclose(place.lon, location.lon, abs_tol=COORDINATE_TOLERANCE)
+    )
+
+
+def upsert_place(
+    session: Session, location: TaskLocationSchema | UserLocationSchema
+):
+    # A place is shared by every location pointing at it, so the client
+    # data only creates a missing row. Reusing an existing place requires
+    # the same data; otherwise one user could move or rename the place
+    # every other user sees.
+    place = session.scalar(
+        insert(Place)
+        .values(
+            place_id=location.place_id,
+            display_name=location.display_name,
+            name=location.name,
+            lat=location.lat,
+            lon=location.lon,
+            geom=func.ST_SetSRID(
+                func.ST_MakePoint(location.lon, location.lat), 4326
+            ),
+        )
+        .on_conflict_do_nothing(index_elements=[Place.place_id])
+        .returning(Place)
+    )
+
+    if place is None:
+        # The schema takes geocoder ids as numbers, the column is text
+        place = session.scalar(
+            select(Place).where(Place.place_id == str(location.place_id))
+        )
+
+        if not _same_place(place, location):
+            raise PlaceConflictException
+
+    return place
@@ -1,15 +1,135 @@
-from sqlalchemy import select
-
-from backend.database.models import Task
-from backend.schemas.task import TaskPatch, TaskSchema
+from sqlalchemy import (
+    Boolean,
+    Integer,
+    case,
+    cast,
+    column,
+    delete,
+    func,
+    insert,
+    not_,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.orm import selectinload
+
+from backend.config.settings import Settings
+from backend.database.models import Location, Task, TaskArchive
+from backend.schemas.filters import SortOrder
+from backend.schemas.task import (
+    TaskBulkCreate,
+    TaskBulkDelete,
+    TaskBulkPatch,
+    TaskInclude,
+    TaskPatch,
+    TaskSchema,
+    TaskSortField,
+)
+from backend.services.geofence import invalidate_geofences
+from backend.services.location_tiles import (
+    bump_location_version,
+    changes_tiles,
+)
+from backend.services.task_archive import restore_archived_task
+from backend.services.task_stats import apply_task_change, apply_task_changes
 from backend.utils.dependencies import (
     CurrentUser,
     FilterTaskPage,
     Session,
 )
-from backend.utils.exceptions import TaskExistsException, TaskNotFoundException
+from backend.utils.exceptions import (
+    BulkLimitExceededException,
+    TaskExistsException,
+    TaskNotFoundException,
+)
+from backend.utils.pagination import count_rows, keyset_page
 from backend.utils.sanitize import sanitize
 
+settings = Settings()
+
+PATCH_COLUMNS = ['title', 'description', 'done', 'priority']
+
+
+def _task_state(task: Task):
+    return task.is_active, task.done, task.priority
+
+
+def _update_tasks(session: Session, criteria, values: dict):
+    # Locks the matching rows and reads their state before the update, so
+    # stats deltas are computed from what was actually overwritten
+    previous = (
+        select(Task.id, Task.is_active, Task.done, Task.priority)
+        .where(*criteria)
+        .with_for_update()
+        .subquery()
+    )
+    rows = session.execute(
+        update(Task)
+        .where(Task.id == previous.c.id)
+        .values(**values)
+        .returning(
+            Task, previous.c.is_active, previous.c.done, previous.c.priority
+        )
+    ).all()
+
+    return [(db_task, previous_state) for db_task, *previous_state in rows]
+
+
+def _update_task(session: Session, criteria, values: dict):
+    rows = _update_tasks(session, criteria, values)
+
+    if not rows:
+        raise TaskNotFoundException
+
+    db_task, previous_state = rows[0]
+    apply_task_change(
+        session, db_task.user_id, previous_state, _task_state(db_task)
+    )
+    if changes_tiles(values):
+        bump_location_version(session, db_task.user_id)
+    session.commit()
+    invalidate_geofences(db_task.user_id)
+
+    return db_task
+
+
+def _patch_values(task: TaskPatch, exclude=None):
+    values = {}
+    for key, value in task.model_dump(
+        exclude_unset=True, exclude=exclude
+    ).items():
+        sanitized_value = value
+        if key in {'title', 'description'}:
+            sanitized_value = sanitize(value)
+
+        values[key] = sanitized_value
+
+    return values
+
+
+def _sort_keys(model, sort: TaskSortField | None):
+    # Each order matches a partial index on (user_id, <key>, id); priority
+    # sorts in TaskPriority declaration order because it is a native enum
+    if sort == TaskSortField.priority:
+        return [model.priority]
+
+    if sort == TaskSortField.created_at:
+        return [model.created_at]
+
+    if sort == TaskSortField.update_at:
+        return [func.coalesce(model.update_at, model.created_at)]
+
+    if sort == TaskSortField.done:
+        return [model.done]
+
+    return []
+
+
+def _check_bulk_size(items: list):
+    if len(items) > settings.TASK_BULK_MAX_ITEMS:
+        raise BulkLimitExceededException
+
 
 def create_task_service(
     task: TaskSchema,
@@ -25,17 +145,19 @@ def create_task_service(
     if existing_task:
         raise TaskExistsException
 
-    db_task = Task(
-        title=sanitize(task.title),
-        description=sanitize(task.description),
-        done=task.done,
-        priority=task.priority,
-        user_id=current_user.id,
+    db_task = session.scalar(
+        insert(Task)
+        .values(
+            title=sanitize(task.title),
+            description=sanitize(task.description),
+            done=task.done,
+            priority=task.priority,
+            user_id=current_user.id,
+        )
+        .returning(Task)
     )
-
-    session.add(db_task)
+    apply_task_change(session, current_user.id, None, _task_state(db_task))
     session.commit()
-    session.refresh(db_task)
 
     return db_task
 
@@ -45,19 +167,41 @@ def list_tasks_service(
     current_user: CurrentUser,
     task_filter: FilterTaskPage,
 ):
-    query = select(Task).where(Task.user_id == current_user.id, Task.is_active)
+    if task_filter.archived:
+        model = TaskArchive
+        query = select(TaskArchive).where(
+            TaskArchive.user_id == current_user.id
+        )
+    else:
+        model = Task
+        query = select(Task).where(
+            Task.user_id == current_user.id, Task.is_active
+        )
+
+        if task_filter.include == TaskInclude.location:
+            query = query.options(selectinload(Task.location))
 
     if task_filter.priority:
-        query = query.filter(Task.priority == task_filter.priority)
+        query = query.filter(model.priority == task_filter.priority)
 
     if task_filter.done is not None:
-        query = query.filter(Task.done == task_filter.done)
+        query = query.filter(model.done == task_filter.done)
+
+    tasks, next_cursor = keyset_page(
+        session,
+        query,
+        task_filter,
+        [*_sort_keys(model, task_filter.sort), model.id],
+        descending=task_filter.order == SortOrder.desc,
+    )
+    page = {'tasks': tasks, 'next_cursor': next_cursor}
 
-    tasks = session.scalars(
-        query.offset(task_filter.offset).limit(task_filter.limit)
-    ).all()
+    if task_filter.count:
+        page['total'], page['total_is_estimate'] = count_rows(
+            session, query, settings.PAGINATION_COUNT_CAP
+        )
 
-    return {'tasks': tasks}
+    return page
 
 
 def read_task_service(
@@ -83,27 +227,16 @@ def patch_task_service(
     current_user: CurrentUser,
     task: TaskPatch,
 ):
-    db_task = session.scalar(
-        select(Task).where(
-            Task.user_id == current_user.id, Task.id == task_id, Task.is_active
-        )
-    )
+    values = _patch_values(task)
 
-    if not db_task:
-        raise TaskNotFoundException
+    if not values:
+        return read_task_service(task_id, session, current_user)
 
-    for key, value in task.model_dump(exclude_unset=True).items():
-        sanitized_value = value
-        if key in {'title', 'description'}:
-            sanitized_value = sanitize(value)
-
-        setattr(db_task, key, sanitized_value)
-
-    session.add(db_task)
-    session.commit()
-    session.refresh(db_task)
-
-    return db_task
+    return _update_task(
+        session,
+        [Task.user_id == current_user.id, Task.id == task_id, Task.is_active],
+        values,
+    )
 
 
 def done_task_service(
@@ -111,72 +244,303 @@ def done_task_service(
     session: Session,
     current_user: CurrentUser,
 ):
-    db_task = session.scalar(
-        select(Task).where(
-            Task.user_id == current_user.id, Task.id == task_id, Task.is_active
-        )
+    return _update_task(
+        session,
+        [Task.user_id == current_user.id, Task.id == task_id, Task.is_active],
+        {'done': not_(Task.done)},
     )
 
-    if not db_task:
-        raise TaskNotFoundException
 
-    if db_task.done:
-        db_task.done = False
+def deactivate_task_service(
+    task_id: int, session: Session, current_user: CurrentUser
+):
+    return _update_task(
+        session,
+        [Task.user_id == current_user.id, Task.id == task_id],
+        {'is_active': False},
+    )
+
+
+def activate_task_service(
+    task_id: int, session: Session, current_user: CurrentUser
+):
+    rows = _update_tasks(
+        session,
+        [Task.user_id == current_user.id, Task.id == task_id],
+        {'is_active': True},
+    )
+
+    if rows:
+        db_task, previous_state = rows[0]
+        apply_task_change(
+            session, db_task.user_id, previous_state, _task_state(db_task)
+        )
     else:
-        db_task.done = True
+        db_task = restore_archived_task(session, task_id, current_user.id)
+
+    if not db_task:
+        raise TaskNotFoundException
 
-    session.add(db_task)
+    bump_location_version(session, db_task.user_id)
     session.commit()
-    session.refresh(db_task)
+    invalidate_geofences(db_task.user_id)
 
     return db_task
 
 
-def deactivate_task_service(
+def delete_task_service(
     task_id: int, session: Session, current_user: CurrentUser
 ):
-    db_task = session.scalar(
-        select(Task).where(Task.user_id == current_user.id, Task.id == task_id)
+    owned_task = select(Task.id).where(
+        Task.user_id == current_user.id, Task.id == task_id
     )
 
-    if not db_task:
-        raise TaskNotFoundException
+    session.execute(delete(Location).where(Location.task_id.in_(owned_task)))
+    deleted = session.execute(
+        delete(Task)
+        .where(Task.user_id == current_user.id, Task.id == task_id)
+        .returning(Task.is_active, Task.done, Task.priority)
+    ).one_or_none()
 
-    db_task.is_active = False
+    if not deleted:
+        raise TaskNotFoundException
 
-    session.add(db_task)
+    apply_task_change(session, current_user.id, deleted, None)
+    bump_location_version(session, current_user.id)
     session.commit()
-    session.refresh(db_task)
-
-    return db_task
+    invalidate_geofences(current_user.id)
 
+    return {'message': 'Task has been deleted successfully.'}
 
-def activate_task_service(task_id: int, session: Session):
-    db_task = session.scalar(select(Task).where(Task.id == task_id))
 
-    if not db_task:
-        raise TaskNotFoundException
+def create_tasks_bulk_service(
+    bulk: TaskBulkCreate,
+    session: Session,
+    current_user: CurrentUser,
+):
+    _check_bulk_size(bulk.tasks)
+
+    items = [
+        {
+            'title': sanitize(task.title),
+            'description': sanitize(task.description),
+            'done': task.done,
+            'priority': task.priority,
+            'user_id': current_user.id,
+        }
+        for task in bulk.tasks
+    ]
+    existing_titles = set(
+        session.scalars(
+            select(Task.title).where(
+                Task.user_id == current_user.id,
+                Task.title.in_({item['title'] for item in items}),
+            )
+        )
+    )
 
-    db_task.is_active = True
+    results = []
+    pending = []
+    for index, item in enumerate(items):
+        if item['title'] in existing_titles:
+            results.append({'index': index, 'status': 'exists'})
+            continue
+
+        existing_titles.add(item['title'])
+        pending.append(index)
+
+    if pending:
+        db_tasks = session.scalars(
+            insert(Task).returning(Task, sort_by_parameter_order=True),
+            [items[index] for index in pending],
+        ).all()
+
+        for index, db_task in zip(pending, db_tasks):
+            results.append(
+                {
+                    'index': index,
+                    'id': db_task.id,
+                    'status': 'created',
+                    'task': db_task,
+                }
+            )
+
+        apply_task_changes(
+            session,
+            current_user.id,
+            [(None, _task_state(db_task)) for db_task in db_tasks],
+        )
 
-    session.add(db_task)
     session.commit()
-    session.refresh(db_task)
 
-    return db_task
+    return {'results': sorted(results, key=lambda result: result['index'])}
+
+
+def _patch_tasks(session: Session, user_id: int, patches: dict):
+    # One UPDATE ... FROM (VALUES ...) for all items, whatever fields each
+    # one sets; every column travels with a flag telling whether the item
+    # set it, so a column is written exactly when a single patch would
+    columns = {name: Task.__table__.c[name] for name in PATCH_COLUMNS}
+    patch_rows = values(
+        column('id', Integer),
+        *(
+            patch_column
+            for name, task_column in columns.items()
+            for patch_column in (
+                column(name, task_column.type),
+                column(f'set_{name}', Boolean),
+            )
+        ),
+        name='patches',
+    ).data(
+        [
+            (
+                task_id,
+                *(
+                    value
+                    for name in columns
+                    for value in (fields.get(name), name in fields)
+                ),
+            )
+            for task_id, fields in patches.items()
+        ]
+    )
+    previous = (
+        select(
+            Task.id,
+            Task.is_active,
+            Task.done,
+            Task.priority,
+            *(
+                cast(patch_rows.c[name], task_column.type).label(
+                    f'patch_{name}'
+                )
+                for name, task_column in columns.items()
+            ),
+            *(patch_rows.c[f'set_{name}'] for name in columns),
+        )
+        .join(patch_rows, patch_rows.c.id == Task.id)
+        .where(Task.user_id == user_id, Task.is_active)
+        .with_for_update(of=Task)
+        .subquery()
+    )
+    rows = session.execute(
+        update(Task)
+        .where(Task.id == previous.c.id)
+        .values(
+            {
+                name: case(
+                    (previous.c[f'set_{name}'], previous.c[f'patch_{name}']),
+                    else_=task_column,
+                )
+                for name, task_column in columns.items()
+            }
+        )
+        .returning(
+            Task, previous.c.is_active, previous.c.done, previous.c.priority
+        )
+    ).all()
 
+    return [(db_task, previous_state) for db_task, *previous_state in rows]
 
-def delete_task_service(
-    task_id: int, session: Session, current_user: CurrentUser
+
+def patch_tasks_bulk_service(
+    bulk: TaskBulkPatch,
+    session: Session,
+    current_user: CurrentUser,
 ):
-    db_task = session.scalar(
-        select(Task).where(Task.user_id == current_user.id, Task.id == task_id)
+    _check_bulk_size(bulk.tasks)
+
+    # Later items for the same task add to or override the changes of
+    # earlier ones, so each task is updated once
+    patches = {}
+    for task in bulk.tasks:
+        patches.setdefault(task.id, {}).update(
+            _patch_values(task, exclude={'id'})
+        )
+
+    changed = {
+        task_id: fields for task_id, fields in patches.items() if fields
+    }
+    unchanged = patches.keys() - changed.keys()
+
+    found = {}
+    statuses = {}
+    changes = []
+    if changed:
+        for db_task, previous_state in _patch_tasks(
+            session, current_user.id, changed
+        ):
+            found[db_task.id] = db_task
+            statuses[db_task.id] = 'updated'
+            changes.append((previous_state, _task_state(db_task)))
+
+    if unchanged:
+        for db_task in session.scalars(
+            select(Task).where(
+                Task.user_id == current_user.id,
+                Task.id.in_(unchanged),
+                Task.is_active,
+            )
+        ):
+            found[db_task.id] = db_task
+            statuses[db_task.id] = 'unchanged'
+
+    apply_task_changes(session, current_user.id, changes)
+    if changes and any(changes_tiles(fields) for fields in changed.values()):
+        bump_location_version(session, current_user.id)
+    session.commit()
+    invalidate_geofences(current_user.id)
+
+    return {
+        'results': [
+            {
+                'index': index,
+                'id': task.id,
+                'status': statuses.get(task.id, 'not_found'),
+                'task': found.get(task.id),
+            }
+            for index, task in enumerate(bulk.tasks)
+        ]
+    }
+
+
+def delete_tasks_bulk_service(
+    bulk: TaskBulkDelete,
+    session: Session,
+    current_user: CurrentUser,
+):
+    _check_bulk_size(bulk.ids)
+
+    owned_tasks = select(Task.id).where(
+        Task.user_id == current_user.id, Task.id.in_(bulk.ids)
     )
 
-    if not db_task:
-        raise TaskNotFoundException
+    session.execute(delete(Location).where(Location.task_id.in_(owned_tasks)))
+    deleted = session.execute(
+        delete(Task)
+        .where(Task.user_id == current_user.id, Task.id.in_(bulk.ids))
+        .returning(Task.id, Task.is_active, Task.done, Task.priority)
+    ).all()
 
-    session.delete(db_task)
+    apply_task_changes(
+        session,
+        current_user.id,
+        [(tuple(row[1:]), None) for row in deleted],
+    )
+    bump_location_version(session, current_user.id)
     session.commit()
-
-    return {'message': 'Task has been deleted successfully.'}
+    invalidate_geofences(current_user.id)
+
+    deleted_ids = {row.id for row in deleted}
+
+    return {
+        'results': [
+            {
+                'index': index,
+                'id': task_id,
+                'status': 'deleted' if task_id in deleted_ids else 'not_found',
+            }
+            for index, task_id in enumerate(bulk.ids)
+        ]
+    }
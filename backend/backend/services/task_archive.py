@@ -0,0 +1,110 @@
+from collections import defaultdict
+
+from sqlalchemy import delete, insert, select, true
+
+from backend.database.models import (
+    Location,
+    LocationArchive,
+    Task,
+    TaskArchive,
+)
+from backend.services.location_tiles import bump_location_version
+from backend.services.task_stats import apply_task_changes
+from backend.utils.dependencies import Session
+
+TASK_COLUMNS = [
+    'id',
+    'user_id',
+    'title',
+    'description',
+    'done',
+    'priority',
+    'is_active',
+    'created_at',
+    'update_at',
+]
+LOCATION_COLUMNS = [
+    'id',
+    'task_id',
+    'user_id',
+    'place_id',
+    'geofence_radius_m',
+    'created_at',
+    'update_at',
+]
+
+
+def _move_locations(session: Session, source, target, criteria):
+    session.execute(
+        insert(target).from_select(
+            LOCATION_COLUMNS,
+            select(
+                *(getattr(source, column) for column in LOCATION_COLUMNS)
+            ).where(criteria),
+        )
+    )
+    session.execute(delete(source).where(criteria))
+
+
+def archive_tasks(session: Session, task_ids: list[int]):
+    # Copies first so the archived locations can reference their task,
+    # then removes the hot rows in the same transaction
+    session.execute(
+        insert(TaskArchive).from_select(
+            TASK_COLUMNS,
+            select(*(getattr(Task, column) for column in TASK_COLUMNS)).where(
+                Task.id.in_(task_ids)
+            ),
+        )
+    )
+    _move_locations(
+        session, Location, LocationArchive, Location.task_id.in_(task_ids)
+    )
+    removed = session.execute(
+        delete(Task)
+        .where(Task.id.in_(task_ids))
+        .returning(Task.user_id, Task.is_active, Task.done, Task.priority)
+    ).all()
+
+    changes = defaultdict(list)
+    for user_id, *state in removed:
+        changes[user_id].append((state, None))
+
+    for user_id, user_changes in changes.items():
+        apply_task_changes(session, user_id, user_changes)
+        bump_location_version(session, user_id)
+
+    return len(removed)
+
+
+def restore_archived_task(session: Session, task_id: int, user_id: int):
+    archived_columns = [
+        true() if column == 'is_active' else getattr(TaskArchive, column)
+        for column in TASK_COLUMNS
+    ]
+    db_task = session.scalar(
+        insert(Task)
+        .from_select(
+            TASK_COLUMNS,
+            select(*archived_columns).where(
+                TaskArchive.id == task_id, TaskArchive.user_id == user_id
+            ),
+        )
+        .returning(Task)
+    )
+
+    if not db_task:
+        return None
+
+    _move_locations(
+        session, LocationArchive, Location, LocationArchive.task_id == task_id
+    )
+    session.execute(delete(TaskArchive).where(TaskArchive.id == task_id))
+    apply_task_changes(
+        session,
+        db_task.user_id,
+        [(None, (db_task.is_active, db_task.done, db_task.priority))],
+    )
+    bump_location_version(session, db_task.user_id)
+
+    return db_task
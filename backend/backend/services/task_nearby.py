@@ -0,0 +1,70 @@
+from sqlalchemy import exists, func, select
+from sqlalchemy.orm import aliased, contains_eager
+
+from backend.database.models import Location, Place, Task
+from backend.utils.dependencies import (
+    CurrentUser,
+    FilterTaskNearbyQuery,
+    Session,
+)
+from backend.utils.exceptions import UserLocationNotFoundException
+
+
+def _geography(geom):
+    # Matches the ix_places_geography expression index, so both the
+    # radius filter and the <-> ordering are index scans in metres
+    return func.geography(geom)
+
+
+def nearby_tasks_service(
+    session: Session,
+    current_user: CurrentUser,
+    nearby: FilterTaskNearbyQuery,
+):
+    explicit_center = nearby.lat is not None and nearby.lon is not None
+
+    if explicit_center:
+        center = func.ST_SetSRID(
+            func.ST_MakePoint(nearby.lon, nearby.lat), 4326
+        )
+    else:
+        user_location = aliased(Location)
+        user_place = aliased(Place)
+        center = (
+            select(user_place.geom)
+            .join(user_location, user_location.place_id == user_place.place_id)
+            .where(user_location.user_id == current_user.id)
+            .scalar_subquery()
+        )
+
+    task_geography = _geography(Place.geom)
+    center_geography = _geography(center)
+    distance = func.ST_Distance(task_geography, center_geography)
+
+    rows = session.execute(
+        select(Task, distance)
+        .join(Task.location)
+        .join(Location.place)
+        .options(contains_eager(Task.location).contains_eager(Location.place))
+        .where(
+            Task.user_id == current_user.id,
+            Task.is_active,
+            func.ST_DWithin(task_geography, center_geography, nearby.radius_m),
+        )
+        .order_by(task_geography.op('<->')(center_geography))
+        .limit(nearby.limit)
+    ).all()
+
+    if not rows and not explicit_center:
+        has_location = session.scalar(
+            select(exists().where(Location.user_id == current_user.id))
+        )
+        if not has_location:
+            raise UserLocationNotFoundException
+
+    return {
+        'tasks': [
+            {'task': db_task, 'distance_m': distance_m}
+            for db_task, distance_m in rows
+        ]
+    }
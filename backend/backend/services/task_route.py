@@ -0,0 +1,147 @@
+import time
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import contains_eager
+
+from backend.config.settings import Settings
+from backend.database.models import Location, Place, Task
+from backend.utils.dependencies import (
+    CurrentUser,
+    FilterTaskRouteQuery,
+    Session,
+)
+from backend.utils.exceptions import UserLocationNotFoundException
+from backend.utils.geofence import EARTH_RADIUS_M
+
+settings = Settings()
+
+MIN_GAIN_M = 1e-6
+
+
+def _haversine_matrix(lat: np.ndarray, lon: np.ndarray):
+    lat = np.radians(lat)
+    lon = np.radians(lon)
+    half_dlat = (lat[:, None] - lat[None, :]) / 2
+    half_dlon = (lon[:, None] - lon[None, :]) / 2
+    a = (
+        np.sin(half_dlat) ** 2
+        + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(half_dlon) ** 2
+    )
+
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def _nearest_neighbour(distances: np.ndarray):
+    visited = np.zeros(len(distances), dtype=bool)
+    visited[0] = True
+    route = [0]
+
+    for _ in range(len(distances) - 1):
+        step = int(np.argmin(np.where(visited, np.inf, distances[route[-1]])))
+        visited[step] = True
+        route.append(step)
+
+    return np.array(route)
+
+
+def _two_opt(route: np.ndarray, distances: np.ndarray, deadline: float):
+    # The route is open and keeps the start first, so reversing route[i:j]
+    # swaps the edges (i-1, i) and (j, j+1); a reversed tail only changes
+    # the edge into it
+    stops = len(route)
+    improved = True
+
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for i in range(1, stops - 1):
+            before, first = route[i - 1], route[i]
+            last = route[i + 1 :]
+            after = np.append(route[i + 2 :], -1)
+            delta = (
+                distances[before, last]
+                - distances[before, first]
+                + np.where(
+                    after >= 0,
+                    distances[first, after] - distances[last, after],
+                    0,
+                )
+            )
+
+            best = int(np.argmin(delta))
+            if delta[best] < -MIN_GAIN_M:
+                route[i : i + best + 2] = route[i : i + best + 2][::-1]
+                improved = True
+
+            if time.perf_counter() >= deadline:
+                break
+
+    return route
+
+
+def plan_route(lat: list[float], lon: list[float], budget_ms: float):
+    # Point 0 is the start; returns the visiting order of the other points
+    # (0-based, without the start) and the leg in metres leading to each
+    deadline = time.perf_counter() + budget_ms / 1000
+    distances = _haversine_matrix(np.asarray(lat), np.asarray(lon))
+    route = _two_opt(_nearest_neighbour(distances), distances, deadline)
+    legs = distances[route[:-1], route[1:]]
+
+    return route[1:] - 1, legs
+
+
+def _start_point(session: Session, current_user: CurrentUser, route):
+    if route.point:
+        return route.point
+
+    start = session.execute(
+        select(Place.lat, Place.lon)
+        .join(Location, Location.place_id == Place.place_id)
+        .where(Location.user_id == current_user.id)
+    ).one_or_none()
+
+    if not start:
+        raise UserLocationNotFoundException
+
+    return tuple(start)
+
+
+def task_route_service(
+    session: Session,
+    current_user: CurrentUser,
+    route: FilterTaskRouteQuery,
+):
+    lat, lon = _start_point(session, current_user, route)
+    max_stops = settings.TASK_ROUTE_MAX_STOPS
+    start = func.geography(func.ST_SetSRID(func.ST_MakePoint(lon, lat), 4326))
+
+    # Above the cap only the stops closest to the start are planned; the
+    # <-> ordering is served by ix_places_geography
+    db_tasks = session.scalars(
+        select(Task)
+        .join(Task.location)
+        .join(Location.place)
+        .options(contains_eager(Task.location).contains_eager(Location.place))
+        .where(Task.user_id == current_user.id, Task.is_active, ~Task.done)
+        .order_by(func.geography(Place.geom).op('<->')(start))
+        .limit(max_stops + 1)
+    ).all()
+
+    stops = db_tasks[:max_stops]
+    if not stops:
+        return {'stops': [], 'total_m': 0.0, 'truncated': False}
+
+    order, legs = plan_route(
+        [lat, *(db_task.location.lat for db_task in stops)],
+        [lon, *(db_task.location.lon for db_task in stops)],
+        settings.TASK_ROUTE_TIME_BUDGET_MS,
+    )
+
+    return {
+        'stops': [
+            {'task': stops[index], 'leg_m': float(leg)}
+            for index, leg in zip(order, legs)
+        ],
+        'total_m': float(legs.sum()),
+        'truncated': len(db_tasks) > max_stops,
+    }
@@ -0,0 +1,65 @@
+from sqlalchemy import Float, cast, func, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION, TSVECTOR
+
+from backend.config.settings import Settings
+from backend.database.models import TASK_SEARCH_VECTOR, Task
+from backend.utils.dependencies import (
+    CurrentUser,
+    FilterTaskSearchPage,
+    Session,
+)
+from backend.utils.pagination import count_rows, keyset_page
+from backend.utils.sanitize import sanitize
+
+settings = Settings()
+
+# Inlined rather than bound, so it matches the ix_tasks_search_vector
+# expression exactly
+search_vector = literal_column(TASK_SEARCH_VECTOR, type_=TSVECTOR)
+
+
+def search_tasks_service(
+    session: Session,
+    current_user: CurrentUser,
+    search: FilterTaskSearchPage,
+):
+    terms = sanitize(search.q)
+    ts_query = func.websearch_to_tsquery('simple', terms)
+
+    # Full-text matches on either column, trigram similarity on the title
+    # catches typos; both predicates are served by GIN indexes
+    query = select(Task).where(
+        Task.user_id == current_user.id,
+        Task.is_active,
+        or_(
+            search_vector.bool_op('@@')(ts_query),
+            Task.title.bool_op('%')(terms),
+        ),
+    )
+
+    if search.priority:
+        query = query.filter(Task.priority == search.priority)
+
+    if search.done is not None:
+        query = query.filter(Task.done == search.done)
+
+    # ts_rank and similarity are real; the sum is widened to double in
+    # SQL so the cursor carries the exact value the rows are compared on
+    rank = cast(
+        func.ts_rank(search_vector, ts_query, type_=Float)
+        + func.similarity(Task.title, terms, type_=Float),
+        DOUBLE_PRECISION,
+    )
+
+    # Best matches first, ties broken by id
+    tasks, next_cursor = keyset_page(
+        session, query, search, [rank, Task.id], descending=True
+    )
+    page = {'tasks': tasks, 'next_cursor': next_cursor}
+
+    if search.count:
+        page['total'], page['total_is_estimate'] = count_rows(
+            session, query, settings.PAGINATION_COUNT_CAP
+        )
+
+    return page
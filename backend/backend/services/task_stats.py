@@ -0,0 +1,71 @@
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.database.enums import TaskPriority
+from backend.database.models import TaskStats
+from backend.utils.dependencies import CurrentUser, Session
+
+COUNTERS = ('total', 'active', 'done', 'high', 'medium', 'low')
+
+
+def _task_counters(is_active: bool, done: bool, priority: TaskPriority):
+    # Priority and done counters only cover active tasks
+    return {
+        'total': 1,
+        'active': int(is_active),
+        'done': int(is_active and done),
+        'high': int(is_active and priority == TaskPriority.high),
+        'medium': int(is_active and priority == TaskPriority.medium),
+        'low': int(is_active and priority == TaskPriority.low),
+    }
+
+
+def apply_task_changes(session: Session, user_id: int, changes):
+    # Each change is a (previous, current) pair of (is_active, done,
+    # priority), with None when the task did not exist before or no longer
+    # exists. Runs in the caller's transaction so the counters commit or
+    # roll back with the tasks.
+    delta = {}
+    for previous, current in changes:
+        before = _task_counters(*previous) if previous else {}
+        after = _task_counters(*current) if current else {}
+        for key in COUNTERS:
+            delta[key] = (
+                delta.get(key, 0) + after.get(key, 0) - before.get(key, 0)
+            )
+
+    apply_task_delta(session, user_id, delta)
+
+
+def apply_task_delta(session: Session, user_id: int, delta: dict):
+    delta = {key: value for key, value in delta.items() if value}
+    if not delta:
+        return
+
+    query = insert(TaskStats).values(
+        user_id=user_id, **{key: delta.get(key, 0) for key in COUNTERS}
+    )
+    session.execute(
+        query.on_conflict_do_update(
+            index_elements=[TaskStats.user_id],
+            set_={
+                key: getattr(TaskStats, key) + query.excluded[key]
+                for key in delta
+            },
+        )
+    )
+
+
+def apply_task_change(session: Session, user_id: int, previous, current):
+    apply_task_changes(session, user_id, [(previous, current)])
+
+
+def read_task_stats_service(session: Session, current_user: CurrentUser):
+    db_stats = session.scalar(
+        select(TaskStats).where(TaskStats.user_id == current_user.id)
+    )
+
+    if not db_stats:
+        return {key: 0 for key in COUNTERS}
+
+    return db_stats
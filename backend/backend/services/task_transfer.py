@@ -0,0 +1,213 @@
+import csv
+import io
+import json
+from typing import BinaryIO
+
+from pydantic import ValidationError
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    MetaData,
+    String,
+    Table,
+    cast,
+    exists,
+    func,
+    insert,
+    literal,
+    select,
+)
+from sqlalchemy.orm import Session
+
+from backend.database.database import engine
+from backend.database.enums import TaskPriority
+from backend.database.models import Task
+from backend.schemas.task import TaskFileFormat, TaskImportRow
+from backend.services.task_stats import apply_task_delta
+from backend.utils.exceptions import ImportEncodingException
+from backend.utils.sanitize import sanitize
+
+BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = (
+    Task.id,
+    Task.title,
+    Task.description,
+    Task.done,
+    Task.priority,
+    Task.is_active,
+    Task.created_at,
+    Task.update_at,
+)
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+MEDIA_TYPES = {
+    TaskFileFormat.ndjson: 'application/x-ndjson',
+    TaskFileFormat.csv: 'text/csv',
+}
+
+task_import = Table(
+    'task_import',
+    MetaData(),
+    Column('position', BigInteger),
+    Column('title', String),
+    Column('description', String),
+    Column('done', Boolean),
+    Column('priority', String),
+    prefixes=['TEMPORARY'],
+    postgresql_on_commit='DROP',
+)
+
+
+def _export_record(row):
+    record = row._asdict()
+    record['priority'] = row.priority.value
+    record['created_at'] = row.created_at.isoformat()
+    record['update_at'] = row.update_at and row.update_at.isoformat()
+
+    return record
+
+
+def _encode_rows(rows, file_format: TaskFileFormat):
+    if file_format == TaskFileFormat.ndjson:
+        return ''.join(json.dumps(_export_record(row)) + '\n' for row in rows)
+
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(_export_record(row).values() for row in rows)
+
+    return buffer.getvalue()
+
+
+def export_tasks_service(user_id: int, file_format: TaskFileFormat):
+    # Owns its session: the request session is closed before a streaming
+    # response starts sending the body
+    with Session(engine) as session:
+        result = session.execute(
+            select(*EXPORT_COLUMNS)
+            .where(Task.user_id == user_id)
+            .order_by(Task.id)
+            .execution_options(yield_per=BATCH_SIZE)
+        )
+
+        if file_format == TaskFileFormat.csv:
+            yield ','.join(EXPORT_FIELDS) + '\r\n'
+
+        for rows in result.partitions():
+            yield _encode_rows(rows, file_format)
+
+
+def _read_rows(file: BinaryIO, file_format: TaskFileFormat):
+    lines = io.TextIOWrapper(file, encoding='utf-8', newline='')
+
+    if file_format == TaskFileFormat.csv:
+        yield from csv.DictReader(lines)
+        return
+
+    for line in lines:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                yield None
+
+
+def _copy_rows(session: Session, file: BinaryIO, file_format):
+    counts = {'received': 0, 'invalid': 0}
+    connection = session.connection().connection.driver_connection
+
+    with connection.cursor() as cursor:
+        with cursor.copy(
+            'COPY task_import (position, title, description, done, priority)'
+            ' FROM STDIN'
+        ) as copy:
+            for position, record in enumerate(_read_rows(file, file_format)):
+                counts['received'] += 1
+                try:
+                    row = TaskImportRow.model_validate(record)
+                except ValidationError:
+                    counts['invalid'] += 1
+                    continue
+
+                copy.write_row(
+                    (
+                        position,
+                        sanitize(row.title),
+                        sanitize(row.description),
+                        row.done,
+                        row.priority.value,
+                    )
+                )
+
+    return counts
+
+
+def import_tasks_service(
+    file: BinaryIO, file_format: TaskFileFormat, user_id: int
+):
+    with Session(engine) as session:
+        task_import.create(session.connection())
+        try:
+            counts = _copy_rows(session, file, file_format)
+        except UnicodeDecodeError:
+            # Decoding is lazy, so this can surface halfway through the
+            # COPY; leaving the session rolls the staged rows back
+            raise ImportEncodingException
+
+        # The first occurrence of a title wins, and titles the user
+        # already has are left untouched, like create_task_service does
+        new_tasks = (
+            select(
+                task_import.c.title,
+                task_import.c.description,
+                task_import.c.done,
+                cast(task_import.c.priority, Task.priority.type),
+                literal(user_id),
+            )
+            .distinct(task_import.c.title)
+            .where(
+                ~exists().where(
+                    Task.user_id == user_id,
+                    Task.title == task_import.c.title,
+                )
+            )
+            .order_by(task_import.c.title, task_import.c.position)
+        )
+        inserted = (
+            insert(Task)
+            .from_select(
+                ['title', 'description', 'done', 'priority', 'user_id'],
+                new_tasks,
+            )
+            .returning(Task.is_active, Task.done, Task.priority)
+            .cte('inserted')
+        )
+        totals = session.execute(
+            select(
+                func.count().label('total'),
+                func.count().filter(inserted.c.is_active).label('active'),
+                func.count()
+                .filter(inserted.c.is_active, inserted.c.done)
+                .label('done'),
+                *(
+                    func.count()
+                    .filter(
+                        inserted.c.is_active, inserted.c.priority == priority
+                    )
+                    .label(priority.value)
+                    for priority in TaskPriority
+                ),
+            )
+        ).one()
+
+        apply_task_delta(session, user_id, totals._asdict())
+        session.commit()
+
+    valid = counts['received'] - counts['invalid']
+
+    return {
+        'received': counts['received'],
+        'imported': totals.total,
+        'skipped': valid - totals.total,
+        'invalid': counts['invalid'],
+    }
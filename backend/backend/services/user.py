@@ -1,9 +1,21 @@
-from sqlalchemy import select
+from sqlalchemy import delete, insert, select, update
 
 from backend.auth.security import (
     get_password_hash,
+    invalidate_principal,
+    revoke_tokens,
+)
+from backend.config.settings import Settings
+from backend.database.database import run_with_session
+from backend.database.models import (
+    Location,
+    LocationArchive,
+    LocationVersion,
+    Task,
+    TaskArchive,
+    TaskStats,
+    User,
 )
-from backend.database.models import User
 from backend.schemas.user import (
     UserPatch,
     UserSchema,
@@ -15,14 +27,48 @@ from backend.utils.exceptions import (
     UsernameExistsException,
     UserNotFoundException,
 )
+from backend.utils.pagination import count_rows, keyset_page
 from backend.utils.sanitize import sanitize_email, sanitize_username
 
+settings = Settings()
 
-def create_user_service(user: UserSchema, session: Session):
-    db_user = session.scalar(
-        select(User).where(
-            (User.username == user.username) | (User.email == user.email)
-        )
+
+def _insert_user(values: dict, session: Session):
+    db_user = session.scalar(insert(User).values(**values).returning(User))
+    session.commit()
+
+    return db_user
+
+
+def _update_user(
+    user_id: int, values: dict, session: Session, revoke: bool = False
+):
+    query = update(User).where(User.id == user_id).values(**values)
+    if revoke:
+        query = query.values(token_version=User.token_version + 1)
+
+    db_user = session.scalar(query.returning(User))
+    # With stateless verification a token can outlive its user until the
+    # revocation table is refreshed, so the principal may not exist
+    if not db_user:
+        raise UserNotFoundException
+
+    if revoke:
+        revoke_tokens(session, user_id, db_user.token_version)
+
+    session.commit()
+
+    return db_user
+
+
+async def create_user_service(user: UserSchema, session: Session):
+    db_user = await run_with_session(
+        lambda session: session.scalar(
+            select(User).where(
+                (User.username == user.username) | (User.email == user.email)
+            )
+        ),
+        session=session,
     )
 
     if db_user:
@@ -32,32 +78,33 @@ def create_user_service(user: UserSchema, session: Session):
         elif db_user.email == user.email:
             raise EmailExistsException
 
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash(user.password)
 
-    db_user = User(
-        email=sanitize_email(user.email),
-        username=sanitize_username(user.username),
-        password=hashed_password,
+    db_user = await run_with_session(
+        _insert_user,
+        {
+            'email': sanitize_email(user.email),
+            'username': sanitize_username(user.username),
+            'password': hashed_password,
+        },
+        session=session,
     )
 
-    session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
-
     return db_user
 
 
 def list_users_service(session: Session, filter: Filter):
-    query = (
-        select(User)
-        .offset(filter.offset)
-        .limit(filter.limit)
-        .where(User.is_active)
-    )
+    query = select(User).where(User.is_active)
+
+    users, next_cursor = keyset_page(session, query, filter, [User.id])
+    page = {'users': users, 'next_cursor': next_cursor}
 
-    users = session.scalars(query).all()
+    if filter.count:
+        page['total'], page['total_is_estimate'] = count_rows(
+            session, query, settings.PAGINATION_COUNT_CAP
+        )
 
-    return {'users': users}
+    return page
 
 
 def read_user_service(user_id: int, session: Session):
@@ -71,7 +118,7 @@ def read_user_service(user_id: int, session: Session):
     return db_user
 
 
-def update_user_service(
+async def update_user_service(
     user_id: int,
     user: UserSchema,
     session: Session,
@@ -80,17 +127,23 @@ def update_user_service(
     if current_user.id != user_id:
         raise NoPermissionException
 
-    current_user.email = sanitize_email(user.email)
-    current_user.username = sanitize_username(user.username)
-    current_user.password = get_password_hash(user.password)
-
-    session.commit()
-    session.refresh(current_user)
+    db_user = await run_with_session(
+        _update_user,
+        user_id,
+        {
+            'email': sanitize_email(user.email),
+            'username': sanitize_username(user.username),
+            'password': await get_password_hash(user.password),
+        },
+        session=session,
+        revoke=True,
+    )
+    invalidate_principal(user_id, db_user.token_version)
 
-    return current_user
+    return db_user
 
 
-def patch_user_service(
+async def patch_user_service(
     user_id: int,
     user: UserPatch,
     session: Session,
@@ -99,13 +152,21 @@ def patch_user_service(
     if current_user.id != user_id:
         raise NoPermissionException
 
-    for key, value in user.model_dump(exclude_unset=True).items():
-        setattr(current_user, key, value)
+    # None would only violate NOT NULL, so it leaves the column as it is
+    values = user.model_dump(exclude_unset=True, exclude_none=True)
+    if not values:
+        return current_user
 
-    session.commit()
-    session.refresh(current_user)
+    revoke = 'password' in values
+    if revoke:
+        values['password'] = await get_password_hash(values['password'])
+
+    db_user = await run_with_session(
+        _update_user, user_id, values, session=session, revoke=revoke
+    )
+    invalidate_principal(user_id, db_user.token_version if revoke else None)
 
-    return current_user
+    return db_user
 
 
 def deactivate_user_service(
@@ -116,26 +177,24 @@ def deactivate_user_service(
     if current_user.id != user_id:
         raise NoPermissionException
 
-    current_user.is_active = False
-
-    session.add(current_user)
-    session.commit()
-    session.refresh(current_user)
+    db_user = _update_user(user_id, {'is_active': False}, session, revoke=True)
+    invalidate_principal(user_id, db_user.token_version)
 
-    return current_user
+    return db_user
 
 
 def activate_user_service(user_id: int, session: Session):
-    db_user = session.scalar(select(User).where(User.id == user_id))
+    db_user = session.scalar(
+        update(User)
+        .where(User.id == user_id)
+        .values(is_active=True)
+        .returning(User)
+    )
 
     if not db_user:
         raise UserNotFoundException
 
-    db_user.is_active = True
-
-    session.add(db_user)
     session.commit()
-    session.refresh(db_user)
 
     return db_user
 
@@ -148,7 +207,35 @@ def delete_user_service(
     if current_user.id != user_id:
         raise NoPermissionException
 
-    session.delete(current_user)
+    user_tasks = select(Task.id).where(Task.user_id == user_id)
+    session.execute(
+        delete(Location).where(
+            (Location.user_id == user_id) | Location.task_id.in_(user_tasks)
+        )
+    )
+    session.execute(delete(Task).where(Task.user_id == user_id))
+    session.execute(delete(TaskStats).where(TaskStats.user_id == user_id))
+    archived_tasks = select(TaskArchive.id).where(
+        TaskArchive.user_id == user_id
+    )
+    session.execute(
+        delete(LocationArchive).where(
+            LocationArchive.task_id.in_(archived_tasks)
+        )
+    )
+    session.execute(delete(TaskArchive).where(TaskArchive.user_id == user_id))
+    session.execute(
+        delete(LocationVersion).where(LocationVersion.user_id == user_id)
+    )
+    token_version = session.scalar(
+        delete(User).where(User.id == user_id).returning(User.token_version)
+    )
+    if token_version is None:
+        raise UserNotFoundException
+
+    revoke_tokens(session, user_id, token_version + 1)
+
     session.commit()
+    invalidate_principal(user_id, token_version + 1)
 
     return {'message': 'User deleted'}
@@ -8,7 +8,14 @@ from backend.auth.security import get_current_user
 from backend.database.database import get_session
 from backend.database.models import User
 from backend.schemas.filters import FilterPage
-from backend.schemas.task import FilterTask, FilterTaskPagination
+from backend.schemas.location import FilterViewport
+from backend.schemas.task import (
+    FilterTask,
+    FilterTaskNearby,
+    FilterTaskPagination,
+    FilterTaskRoute,
+    FilterTaskSearch,
+)
 
 CurrentUser = Annotated[User, Depends(get_current_user)]
 OAuth2Form = Annotated[OAuth2PasswordRequestForm, Depends()]
@@ -16,3 +23,7 @@ Session = Annotated[Session, Depends(get_session)]
 Filter = Annotated[FilterPage, Query()]
 FilterTaskPage = Annotated[FilterTaskPagination, Query()]
 FilterTaskQuery = Annotated[FilterTask, Query()]
+FilterTaskSearchPage = Annotated[FilterTaskSearch, Query()]
+FilterTaskNearbyQuery = Annotated[FilterTaskNearby, Query()]
+FilterTaskRouteQuery = Annotated[FilterTaskRoute, Query()]
+FilterViewportQuery = Annotated[FilterViewport, Query()]
@@ -51,3 +51,39 @@ TaskLocationNotFoundException = HTTPException(
     status_code=HTTPStatus.NOT_FOUND,
     detail='Task does not have a location yet',
 )
+
+ServiceBusyException = HTTPException(
+    status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+    detail='Server is busy, try again later',
+    headers={'Retry-After': '1'},
+)
+
+TooManyLoginAttemptsException = HTTPException(
+    status_code=HTTPStatus.TOO_MANY_REQUESTS,
+    detail='Too many login attempts, try again later',
+)
+
+InvalidCursorException = HTTPException(
+    status_code=HTTPStatus.BAD_REQUEST,
+    detail='Invalid pagination cursor',
+)
+
+ImportEncodingException = HTTPException(
+    status_code=HTTPStatus.BAD_REQUEST,
+    detail='Import file is not valid UTF-8',
+)
+
+BulkLimitExceededException = HTTPException(
+    status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+    detail='Too many items in a single bulk request',
+)
+
+TileNotFoundException = HTTPException(
+    status_code=HTTPStatus.NOT_FOUND,
+    detail='Tile is outside the tile grid',
+)
+
+PlaceConflictException = HTTPException(
+    status_code=HTTPStatus.CONFLICT,
+    detail='Place data does not match the stored place',
+)
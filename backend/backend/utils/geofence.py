@@ -0,0 +1,70 @@
+import numpy as np
+import shapely
+from shapely import STRtree
+
+EARTH_RADIUS_M = 6_371_008.8
+METRES_PER_DEGREE = np.pi * EARTH_RADIUS_M / 180
+MIN_COS_LAT = 1e-6
+
+
+def haversine_m(lat, lon, lats: np.ndarray, lons: np.ndarray):
+    lat, lon = np.radians(lat), np.radians(lon)
+    lats, lons = np.radians(lats), np.radians(lons)
+    a = (
+        np.sin((lats - lat) / 2) ** 2
+        + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    )
+
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GeofenceIndex:
+    # Each fence is indexed by its bounding box in degrees; the tree only
+    # narrows the candidates, the exact test is a haversine distance
+    def __init__(self, fences: list[tuple]):
+        task_ids, titles, lats, lons, radii = (
+            zip(*fences) if fences else ((),) * 5
+        )
+        self.task_ids = list(task_ids)
+        self.titles = list(titles)
+        self.lats = np.asarray(lats, dtype=float)
+        self.lons = np.asarray(lons, dtype=float)
+        self.radii = np.asarray(radii, dtype=float)
+
+        half_height = self.radii / METRES_PER_DEGREE
+        half_width = half_height / np.maximum(
+            np.cos(np.radians(self.lats)), MIN_COS_LAT
+        )
+        self.tree = STRtree(
+            shapely.box(
+                self.lons - half_width,
+                self.lats - half_height,
+                self.lons + half_width,
+                self.lats + half_height,
+            )
+        )
+
+    def __len__(self):
+        return len(self.task_ids)
+
+    def containing(self, lat: float, lon: float):
+        candidates = self.tree.query(shapely.Point(lon, lat))
+        distances = haversine_m(
+            lat, lon, self.lats[candidates], self.lons[candidates]
+        )
+        inside = distances <= self.radii[candidates]
+
+        return sorted(
+            (
+                {
+                    'task_id': self.task_ids[index],
+                    'title': self.titles[index],
+                    'distance_m': float(distance),
+                    'radius_m': float(self.radii[index]),
+                }
+                for index, distance in zip(
+                    candidates[inside], distances[inside]
+                )
+            ),
+            key=lambda fence: fence['distance_m'],
+        )
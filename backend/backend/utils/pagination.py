@@ -0,0 +1,134 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from enum import Enum
+
+from sqlalchemy import func, literal, select, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from backend.schemas.filters import FilterPage
+from backend.utils.exceptions import InvalidCursorException
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+
+    if isinstance(value, Enum):
+        return value.value
+
+    raise TypeError(f'Cannot encode {type(value).__name__} in a cursor')
+
+
+def encode_cursor(values: list):
+    raw = json.dumps(
+        values, separators=(',', ':'), default=_encode_value
+    ).encode()
+    return urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except ValueError:
+        raise InvalidCursorException
+
+    if not isinstance(values, list):
+        raise InvalidCursorException
+
+    return values
+
+
+def _cursor_value(key, value):
+    # JSON only round-trips numbers, strings and booleans; datetimes and
+    # enums are rebuilt from the key's type so they bind with that type.
+    # Anything else that does not fit the key is rejected here, not by
+    # the database.
+    python_type = key.type.python_type
+
+    try:
+        if python_type is datetime and isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        elif issubclass(python_type, Enum):
+            value = python_type(value)
+        elif python_type is float and type(value) is int:
+            value = float(value)
+    except (TypeError, ValueError):
+        raise InvalidCursorException
+
+    if not isinstance(value, python_type) or (
+        isinstance(value, bool) and python_type is not bool
+    ):
+        raise InvalidCursorException
+
+    return literal(value, type_=key.type)
+
+
+def keyset_page(
+    session, query, page: FilterPage, keys: list, descending: bool = False
+):
+    # keys must end with a unique column so every row has a distinct
+    # position; the cursor is that position for the last row returned.
+    # All keys share one direction so a single index scan serves the page.
+    if page.cursor:
+        values = decode_cursor(page.cursor)
+        if len(values) != len(keys):
+            raise InvalidCursorException
+
+        position = tuple_(*keys)
+        cursor = tuple_(*map(_cursor_value, keys, values))
+        query = query.where(
+            position < cursor if descending else position > cursor
+        )
+    else:
+        query = query.offset(page.offset)
+
+    order_by = [key.desc() if descending else key for key in keys]
+    rows = session.execute(
+        query.add_columns(*keys).order_by(*order_by).limit(page.limit + 1)
+    ).all()
+
+    next_cursor = None
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        if rows:
+            next_cursor = encode_cursor(list(rows[-1][1:]))
+
+    return [row[0] for row in rows], next_cursor
+
+
+class Explain(Executable, ClauseElement):
+    # EXPLAIN (FORMAT JSON) of a statement, compiled and bound like the
+    # statement itself, so parameters keep their types
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, 'postgresql')
+def _compile_explain(element, compiler, **kw):
+    return 'EXPLAIN (FORMAT JSON) ' + compiler.process(element.statement, **kw)
+
+
+def estimate_rows(session, query):
+    plan = session.scalar(Explain(query))
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def count_rows(session, query, cap: int):
+    # Exact while the result is small, otherwise the planner's estimate,
+    # so counting never walks more than cap + 1 index entries. The
+    # estimate is never below the cap + 1 rows already seen.
+    exact = session.scalar(
+        select(func.count()).select_from(query.limit(cap + 1).subquery())
+    )
+    if exact <= cap:
+        return exact, False
+
+    return max(estimate_rows(session, query), exact), True
@@ -0,0 +1,139 @@
+import heapq
+from pathlib import Path
+from threading import Lock
+from time import time
+
+from backend.config.settings import Settings
+from backend.utils.cache import TTLCache
+
+
+class NullTileStore:
+    def get(self, key):
+        return None
+
+    def set(self, key, tile: bytes):
+        pass
+
+    def stats(self):
+        return {}
+
+
+class DiskTileStore:
+    # Tiles survive restarts and are shared by workers on the same host.
+    # Stale versions of a tile are removed when a newer one is written;
+    # tiles older than the TTL are dropped on read and by periodic sweeps,
+    # which also keep the store under max_tiles by removing the oldest.
+    def __init__(
+        self,
+        directory: str | None = None,
+        ttl: float | None = None,
+        max_tiles: int | None = None,
+    ):
+        settings = Settings()
+        self.directory = Path(directory or settings.TILE_CACHE_DIR)
+        self.ttl = settings.TILE_CACHE_TTL_SECONDS if ttl is None else ttl
+        self.max_tiles = (
+            settings.TILE_CACHE_DISK_MAX_TILES
+            if max_tiles is None
+            else max_tiles
+        )
+        self.sweep_every = max(1, self.max_tiles // 10)
+        self.expired = 0
+        self.evicted = 0
+        self._writes = 0
+        self._lock = Lock()
+
+    def _path(self, key):
+        user_id, z, x, y, version = key
+        directory = self.directory.joinpath(str(user_id), str(z), str(x))
+        return directory, f'{y}.{version}'
+
+    def get(self, key):
+        directory, name = self._path(key)
+        path = directory / f'{name}.mvt'
+        try:
+            if time() - path.stat().st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+                self.expired += 1
+                return None
+
+            return path.read_bytes()
+        except OSError:
+            return None
+
+    def set(self, key, tile: bytes):
+        directory, name = self._path(key)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        for stale in directory.glob(f'{key[3]}.*.mvt'):
+            stale.unlink(missing_ok=True)
+
+        partial = directory / f'{name}.mvt.partial'
+        partial.write_bytes(tile)
+        partial.replace(directory / f'{name}.mvt')
+
+        with self._lock:
+            self._writes += 1
+            sweep = self._writes >= self.sweep_every
+            if sweep:
+                self._writes = 0
+
+        if sweep:
+            self.sweep()
+
+    def sweep(self):
+        now = time()
+        tiles = []
+        for path in self.directory.rglob('*.mvt'):
+            try:
+                modified_at = path.stat().st_mtime
+            except OSError:
+                continue
+
+            if now - modified_at > self.ttl:
+                path.unlink(missing_ok=True)
+                self.expired += 1
+            else:
+                tiles.append((modified_at, path))
+
+        excess = len(tiles) - self.max_tiles
+        if excess > 0:
+            for _, path in heapq.nsmallest(excess, tiles):
+                path.unlink(missing_ok=True)
+            self.evicted += excess
+
+    def stats(self):
+        return {'expired': self.expired, 'evicted': self.evicted}
+
+
+class TileCache:
+    def __init__(self, maxsize: int, ttl: float, store):
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.store = store
+        self.store_hits = 0
+        self._lock = Lock()
+
+    def get(self, key):
+        tile = self.memory.get(key)
+        if tile is not None:
+            return tile
+
+        tile = self.store.get(key)
+        if tile is not None:
+            with self._lock:
+                self.store_hits += 1
+            self.memory.set(key, tile)
+
+        return tile
+
+    def set(self, key, tile: bytes):
+        self.memory.set(key, tile)
+        self.store.set(key, tile)
+
+    def stats(self):
+        return {
+            **self.memory.stats(),
+            'store': type(self.store).__name__,
+            'store_hits': self.store_hits,
+            **self.store.stats(),
+        }
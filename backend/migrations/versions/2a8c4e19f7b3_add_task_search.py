@@ -0,0 +1,33 @@
+"""add task search vector and trigram indexes
+
+Revision ID: 2a8c4e19f7b3
+Revises: e5d92b7f1c36
+Create Date: 2026-10-18 14:26:03.418925
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2a8c4e19f7b3'
+down_revision: Union[str, None] = 'e5d92b7f1c36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # An expression index instead of a stored generated column: adding that
+    # column would rewrite tasks under an ACCESS EXCLUSIVE lock
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_search_vector', 'tasks', [sa.text("to_tsvector('simple', title || ' ' || description)")], unique=False, postgresql_using='gin', postgresql_concurrently=True)
+        op.create_index('ix_tasks_title_trgm', 'tasks', ['title'], unique=False, postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'}, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_title_trgm', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_search_vector', table_name='tasks', postgresql_concurrently=True)
@@ -0,0 +1,30 @@
+"""add location place id index
+
+Revision ID: 3c9d5b7e2a14
+Revises: a9c3e5f1d207
+Create Date: 2026-10-18 21:12:40.316805
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9d5b7e2a14'
+down_revision: Union[str, None] = 'a9c3e5f1d207'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Spatial queries find places through their index first and then need
+    # the locations pointing at each place without scanning locations
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_locations_place_id'), 'locations', ['place_id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_locations_place_id'), table_name='locations', postgresql_concurrently=True)
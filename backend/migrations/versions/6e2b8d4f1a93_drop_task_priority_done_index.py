@@ -0,0 +1,30 @@
+"""drop task priority done index
+
+Revision ID: 6e2b8d4f1a93
+Revises: 3c9d5b7e2a14
+Create Date: 2026-10-18 23:05:12.208431
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e2b8d4f1a93'
+down_revision: Union[str, None] = '3c9d5b7e2a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # (user_id, priority, id) serves the priority and done filters as well
+    # and also orders by id, so this one only costs writes
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_active_user_id_priority_done', table_name='tasks', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_active_user_id_priority_done', 'tasks', ['user_id', 'priority', 'done'], unique=False, postgresql_where=sa.text('is_active'), postgresql_concurrently=True)
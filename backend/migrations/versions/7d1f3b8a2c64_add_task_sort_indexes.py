@@ -0,0 +1,34 @@
+"""add task sort indexes
+
+Revision ID: 7d1f3b8a2c64
+Revises: 2a8c4e19f7b3
+Create Date: 2026-10-18 15:07:36.902451
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d1f3b8a2c64'
+down_revision: Union[str, None] = '2a8c4e19f7b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_active_user_id_priority_id', 'tasks', ['user_id', 'priority', 'id'], unique=False, postgresql_where=sa.text('is_active'), postgresql_concurrently=True)
+        op.create_index('ix_tasks_active_user_id_created_at_id', 'tasks', ['user_id', 'created_at', 'id'], unique=False, postgresql_where=sa.text('is_active'), postgresql_concurrently=True)
+        op.create_index('ix_tasks_active_user_id_changed_at_id', 'tasks', ['user_id', sa.text('coalesce(update_at, created_at)'), 'id'], unique=False, postgresql_where=sa.text('is_active'), postgresql_concurrently=True)
+        op.create_index('ix_tasks_active_user_id_done_id', 'tasks', ['user_id', 'done', 'id'], unique=False, postgresql_where=sa.text('is_active'), postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_active_user_id_done_id', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_active_user_id_changed_at_id', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_active_user_id_created_at_id', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_active_user_id_priority_id', table_name='tasks', postgresql_concurrently=True)
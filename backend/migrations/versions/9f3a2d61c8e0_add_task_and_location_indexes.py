@@ -0,0 +1,38 @@
+"""add task and location indexes
+
+Revision ID: 9f3a2d61c8e0
+Revises: 5b1e0c7a9d24
+Create Date: 2026-10-18 10:02:17.554130
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f3a2d61c8e0'
+down_revision: Union[str, None] = '5b1e0c7a9d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY keeps tasks and locations writable while the indexes
+    # build, but it cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_user_id_title', 'tasks', ['user_id', 'title'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_tasks_active_user_id', 'tasks', ['user_id', 'id'], unique=False, postgresql_where=sa.text('is_active'), postgresql_concurrently=True)
+        op.create_index('ix_tasks_active_user_id_priority_done', 'tasks', ['user_id', 'priority', 'done'], unique=False, postgresql_where=sa.text('is_active'), postgresql_concurrently=True)
+        op.create_index(op.f('ix_locations_task_id'), 'locations', ['task_id'], unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_locations_user_id'), 'locations', ['user_id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_locations_user_id'), table_name='locations', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_locations_task_id'), table_name='locations', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_active_user_id_priority_done', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_active_user_id', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_user_id_title', table_name='tasks', postgresql_concurrently=True)
@@ -0,0 +1,28 @@
+"""add location geofence radius
+
+Revision ID: a9c3e5f1d207
+Revises: f4a7c2e91b50
+Create Date: 2026-10-18 18:21:37.540912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9c3e5f1d207'
+down_revision: Union[str, None] = 'f4a7c2e91b50'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('locations', sa.Column('geofence_radius_m', sa.Float(), server_default=sa.text('100'), nullable=False))
+    op.add_column('locations_archive', sa.Column('geofence_radius_m', sa.Float(), server_default=sa.text('100'), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('locations_archive', 'geofence_radius_m')
+    op.drop_column('locations', 'geofence_radius_m')
@@ -0,0 +1,30 @@
+"""add location geography index
+
+Revision ID: b3e7a91d4f08
+Revises: 7d1f3b8a2c64
+Create Date: 2026-10-18 16:12:44.371096
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e7a91d4f08'
+down_revision: Union[str, None] = '7d1f3b8a2c64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # idx_locations_geom is on geometry, so it cannot serve distances in
+    # metres; this expression index backs ST_DWithin and <-> on geography
+    with op.get_context().autocommit_block():
+        op.create_index('ix_locations_geography', 'locations', [sa.text('geography(geom)')], unique=False, postgresql_using='gist', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_locations_geography', table_name='locations', postgresql_concurrently=True)
@@ -0,0 +1,50 @@
+"""create task stats table
+
+Revision ID: c47e18b5a3f2
+Revises: 9f3a2d61c8e0
+Create Date: 2026-10-18 11:24:05.102377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47e18b5a3f2'
+down_revision: Union[str, None] = '9f3a2d61c8e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('task_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('active', sa.Integer(), nullable=False),
+    sa.Column('done', sa.Integer(), nullable=False),
+    sa.Column('high', sa.Integer(), nullable=False),
+    sa.Column('medium', sa.Integer(), nullable=False),
+    sa.Column('low', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # Priority and done counters only cover active tasks
+    op.execute("""
+        INSERT INTO task_stats (user_id, total, active, done, high, medium, low)
+        SELECT
+            user_id,
+            count(*),
+            count(*) FILTER (WHERE is_active),
+            count(*) FILTER (WHERE is_active AND done),
+            count(*) FILTER (WHERE is_active AND priority = 'high'),
+            count(*) FILTER (WHERE is_active AND priority = 'medium'),
+            count(*) FILTER (WHERE is_active AND priority = 'low')
+        FROM tasks
+        GROUP BY user_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('task_stats')
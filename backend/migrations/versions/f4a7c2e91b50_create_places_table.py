@@ -0,0 +1,105 @@
+"""create places table
+
+Revision ID: f4a7c2e91b50
+Revises: d81f6c2a9e47
+Create Date: 2026-10-18 17:34:09.218457
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from geoalchemy2 import Geometry
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a7c2e91b50'
+down_revision: Union[str, None] = 'd81f6c2a9e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+PLACE_COLUMNS = ['display_name', 'name', 'lat', 'lon', 'geom']
+
+
+def _backfill_places(table: str) -> None:
+    # Newest ids first, so each place keeps its most recent data; every
+    # batch commits on its own and reruns skip places already copied
+    bind = op.get_bind()
+    max_id = bind.execute(sa.text(f'SELECT coalesce(max(id), 0) FROM {table}')).scalar()
+    for end in range(max_id, 0, -BATCH_SIZE):
+        bind.execute(sa.text(f"""
+            INSERT INTO places (place_id, display_name, name, lat, lon, geom)
+            SELECT DISTINCT ON (place_id)
+                place_id, display_name, name, lat, lon, geom
+            FROM {table}
+            WHERE id > :start AND id <= :end
+            ORDER BY place_id, id DESC
+            ON CONFLICT (place_id) DO NOTHING
+        """), {'start': end - BATCH_SIZE, 'end': end})
+
+
+def upgrade() -> None:
+    # The backfill commits batch by batch, so a rerun after a failure finds
+    # the table and part of the constraints already in place
+    if not sa.inspect(op.get_bind()).has_table('places'):
+        _create_places_table()
+
+    with op.get_context().autocommit_block():
+        _backfill_places('locations')
+        _backfill_places('locations_archive')
+
+    op.create_index('idx_places_geom', 'places', ['geom'], unique=False, postgresql_using='gist', if_not_exists=True)
+    op.create_index('ix_places_geography', 'places', [sa.text('geography(geom)')], unique=False, postgresql_using='gist', if_not_exists=True)
+    for table in ('locations', 'locations_archive'):
+        foreign_keys = {fk['name'] for fk in sa.inspect(op.get_bind()).get_foreign_keys(table)}
+        if f'{table}_place_id_fkey' not in foreign_keys:
+            op.create_foreign_key(f'{table}_place_id_fkey', table, 'places', ['place_id'], ['place_id'])
+
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_locations_geography', table_name='locations', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('idx_locations_geom', table_name='locations', postgresql_concurrently=True, if_exists=True)
+    for column in PLACE_COLUMNS:
+        op.drop_column('locations', column)
+        op.drop_column('locations_archive', column)
+
+
+def _create_places_table() -> None:
+    op.create_table('places',
+    sa.Column('place_id', sa.String(), nullable=False),
+    sa.Column('display_name', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('lat', sa.Float(), nullable=False),
+    sa.Column('lon', sa.Float(), nullable=False),
+    sa.Column('geom', Geometry(geometry_type='POINT', srid=4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry', nullable=False), nullable=False),
+    sa.PrimaryKeyConstraint('place_id')
+    )
+
+
+def downgrade() -> None:
+    for table in ('locations', 'locations_archive'):
+        op.add_column(table, sa.Column('display_name', sa.String(), nullable=True))
+        op.add_column(table, sa.Column('name', sa.String(), nullable=True))
+        op.add_column(table, sa.Column('lat', sa.Float(), nullable=True))
+        op.add_column(table, sa.Column('lon', sa.Float(), nullable=True))
+        op.add_column(table, sa.Column('geom', Geometry(geometry_type='POINT', srid=4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry'), nullable=True))
+        op.execute(f"""
+            UPDATE {table}
+            SET display_name = places.display_name,
+                name = places.name,
+                lat = places.lat,
+                lon = places.lon,
+                geom = places.geom
+            FROM places
+            WHERE places.place_id = {table}.place_id
+        """)
+        for column in PLACE_COLUMNS:
+            op.alter_column(table, column, nullable=False)
+
+    op.drop_constraint('locations_archive_place_id_fkey', 'locations_archive', type_='foreignkey')
+    op.drop_constraint('locations_place_id_fkey', 'locations', type_='foreignkey')
+    op.create_index('idx_locations_geom', 'locations', ['geom'], unique=False, postgresql_using='gist')
+    op.create_index('ix_locations_geography', 'locations', [sa.text('geography(geom)')], unique=False, postgresql_using='gist')
+    op.drop_index('ix_places_geography', table_name='places')
+    op.drop_index('idx_places_geom', table_name='places')
+    op.drop_table('places')
@@ -0,0 +1,96 @@
+from statistics import quantiles
+from time import perf_counter
+
+from sqlalchemy import text
+
+# Long enough for the caches and the pool to settle
+DURATION_SECONDS = 5
+
+
+def sustained(fn, seconds: float = DURATION_SECONDS):
+    # Calls fn back to back for the given time; returns the latencies
+    latencies = []
+    deadline = perf_counter() + seconds
+    while (start := perf_counter()) < deadline:
+        fn()
+        latencies.append(perf_counter() - start)
+
+    return latencies
+
+
+def timed(fn):
+    start = perf_counter()
+    result = fn()
+
+    return result, perf_counter() - start
+
+
+def report(name: str, latencies: list[float]):
+    # Printed with -s, which task benchmark passes
+    percentiles = quantiles(latencies, n=100) if len(latencies) > 1 else []
+    p50, p99 = (percentiles[49], percentiles[98]) if percentiles else (0, 0)
+    rate = len(latencies) / sum(latencies)
+    print(
+        f'\n{name}: {rate:,.0f} req/s, '
+        f'p50 {p50 * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms'
+    )
+
+    return rate
+
+
+def seed_tasks(session, user_id: int, count: int, **columns):
+    # Bulk seeding in SQL; inactive and done fractions are per mille
+    session.execute(
+        text(
+            'INSERT INTO tasks '
+            '(user_id, title, description, done, priority, is_active, '
+            'created_at, update_at) '
+            "SELECT :user_id, 'task ' || g, "
+            "'description of task ' || g || ' ' || md5(g::text), "
+            'g % 1000 < :done, '
+            "(ARRAY['high', 'medium', 'low'])[g % 3 + 1]::taskpriority, "
+            'g % 1000 >= :inactive, '
+            'now() - CAST(:age AS interval), now() - CAST(:age AS interval) '
+            'FROM generate_series(1, :count) AS g'
+        ),
+        {
+            'user_id': user_id,
+            'count': count,
+            'done': columns.get('done', 0),
+            'inactive': columns.get('inactive', 0),
+            'age': columns.get('age', '0 days'),
+        },
+    )
+    session.commit()
+    session.execute(text('ANALYZE tasks'))
+
+
+def seed_locations(session, user_id: int, center, spread: float, radius_m):
+    # One place per task of the user, scattered around center
+    session.execute(
+        text(
+            'INSERT INTO places '
+            '(place_id, display_name, name, lat, lon, geom) '
+            "SELECT 'bench ' || id, 'Place ' || id, 'Place ' || id, lat, lon, "
+            'ST_SetSRID(ST_MakePoint(lon, lat), 4326) FROM ('
+            'SELECT id, :lat + (random() - 0.5) * :spread AS lat, '
+            ':lon + (random() - 0.5) * :spread AS lon '
+            'FROM tasks WHERE user_id = :user_id) AS scattered'
+        ),
+        {
+            'user_id': user_id,
+            'lat': center[0],
+            'lon': center[1],
+            'spread': spread,
+        },
+    )
+    session.execute(
+        text(
+            'INSERT INTO locations (task_id, place_id, geofence_radius_m) '
+            "SELECT id, 'bench ' || id, :radius_m FROM tasks "
+            'WHERE user_id = :user_id'
+        ),
+        {'user_id': user_id, 'radius_m': radius_m},
+    )
+    session.commit()
+    session.execute(text('ANALYZE'))
@@ -0,0 +1,56 @@
+import pytest
+
+from backend.schemas.location import LocationPing
+from backend.services.geofence import geofence_cache, ping_location_service
+from tests.benchmarks.conftest import (
+    report,
+    seed_locations,
+    seed_tasks,
+    sustained,
+)
+from tests.conftest import statements
+
+pytestmark = pytest.mark.benchmark
+
+FENCED_TASKS = 300
+CENTER = (40.7826, -73.9656)
+# About 5 km across, so a ping sits inside a handful of 500 m fences
+SPREAD = 0.05
+RADIUS_M = 500
+
+
+@pytest.fixture
+def fenced(session, user):
+    seed_tasks(session, user.id, FENCED_TASKS)
+    seed_locations(session, user.id, CENTER, SPREAD, RADIUS_M)
+
+
+def test_sustained_pings(client, headers, fenced):
+    ping = {'lat': CENTER[0], 'lon': CENTER[1]}
+    counts = []
+
+    def send():
+        response = client.post('/locations/ping', json=ping, headers=headers)
+        counts.append(statements(response))
+
+    report('POST /locations/ping', sustained(send))
+
+    # Only the first ping builds the index
+    assert counts[0] == 1
+    assert set(counts[1:]) == {0}
+
+
+def test_pings_against_rebuilding_the_index(session, user, fenced):
+    ping = LocationPing(lat=CENTER[0], lon=CENTER[1])
+
+    def cached():
+        ping_location_service(ping, session, user)
+
+    def rebuilt():
+        geofence_cache.clear()
+        ping_location_service(ping, session, user)
+
+    cached_rate = report('ping, cached index', sustained(cached))
+    rebuilt_rate = report('ping, index rebuilt', sustained(rebuilt))
+
+    assert cached_rate > rebuilt_rate
@@ -0,0 +1,90 @@
+import pytest
+from sqlalchemy import text
+
+from backend.config.settings import Settings
+from backend.jobs.task_archive import archive_tasks_batch
+from tests.benchmarks.conftest import report, seed_tasks, sustained, timed
+
+pytestmark = pytest.mark.benchmark
+
+settings = Settings()
+
+TASKS = 1_000_000
+# Per mille: nine in ten tasks are deactivated, a few more long done
+INACTIVE = 900
+DONE = 50
+
+
+@pytest.fixture
+def cold_tasks(session, user):
+    seed_tasks(
+        session,
+        user.id,
+        TASKS,
+        inactive=INACTIVE,
+        done=DONE,
+        age=f'{settings.TASK_ARCHIVE_DONE_DAYS + 1} days',
+    )
+
+
+def _table_stats(engine):
+    # VACUUM cannot run in a transaction; it also refreshes the row counts
+    with engine.connect().execution_options(
+        isolation_level='AUTOCOMMIT'
+    ) as connection:
+        connection.execute(text('VACUUM ANALYZE tasks'))
+
+        return connection.execute(
+            text(
+                "SELECT pg_total_relation_size('tasks'), n_live_tup "
+                "FROM pg_stat_user_tables WHERE relname = 'tasks'"
+            )
+        ).one()
+
+
+def _hot_reads(client, headers, label: str):
+    def list_page():
+        client.get('/tasks/', params={'limit': 100}, headers=headers)
+
+    def filtered_page():
+        client.get(
+            '/tasks/',
+            params={'limit': 100, 'priority': 'high', 'done': False},
+            headers=headers,
+        )
+
+    return (
+        report(f'GET /tasks/, {label}', sustained(list_page)),
+        report(
+            f'GET /tasks/?priority&done, {label}', sustained(filtered_page)
+        ),
+    )
+
+
+def test_hot_table_before_and_after_archiving(
+    client, session, engine, headers, cold_tasks
+):
+    size_before, rows_before = _table_stats(engine)
+    before = _hot_reads(client, headers, 'before archiving')
+
+    def archive_all():
+        archived, last_id = 0, 0
+        while True:
+            batch, last_id = archive_tasks_batch(
+                session, settings.TASK_ARCHIVE_BATCH_SIZE, last_id
+            )
+            archived += batch
+            if batch < settings.TASK_ARCHIVE_BATCH_SIZE:
+                return archived
+
+    archived, seconds = timed(archive_all)
+    size_after, rows_after = _table_stats(engine)
+    after = _hot_reads(client, headers, 'after archiving')
+
+    print(
+        f'\narchived {archived:,} tasks in {seconds:.1f} s, '
+        f'tasks {rows_before:,} -> {rows_after:,} rows, '
+        f'{size_before:,} -> {size_after:,} bytes with indexes'
+    )
+    print(f'req/s before {before}, after {after}')
+    assert archived > 0
@@ -0,0 +1,87 @@
+from itertools import count, cycle
+
+import pytest
+from sqlalchemy import select
+
+from backend.database.enums import TaskPriority
+from backend.database.models import Task
+from tests.benchmarks.conftest import report, seed_tasks, sustained
+
+pytestmark = pytest.mark.benchmark
+
+TASKS = 10_000
+BATCH = 100
+
+
+def _new_task(title: str):
+    return {
+        'title': title,
+        'description': 'benchmark',
+        'done': False,
+        'priority': TaskPriority.medium.value,
+        'user_id': 0,
+    }
+
+
+@pytest.fixture
+def task_ids(session, user):
+    seed_tasks(session, user.id, TASKS)
+
+    return list(
+        session.scalars(
+            select(Task.id).where(Task.user_id == user.id).order_by(Task.id)
+        )
+    )
+
+
+def test_bulk_patch_against_single_patches(client, headers, task_ids):
+    # Items per second through each endpoint, every item flipping done
+    ids = cycle(task_ids)
+    done = cycle([True, False])
+
+    def single():
+        client.patch(
+            f'/tasks/{next(ids)}', json={'done': next(done)}, headers=headers
+        )
+
+    def bulk():
+        state = next(done)
+        client.patch(
+            '/tasks/bulk',
+            json={
+                'tasks': [
+                    {'id': next(ids), 'done': state} for _ in range(BATCH)
+                ]
+            },
+            headers=headers,
+        )
+
+    single_rate = report('PATCH /tasks/{id}', sustained(single))
+    bulk_rate = report(f'PATCH /tasks/bulk x{BATCH}', sustained(bulk))
+    print(f'items/s: single {single_rate:,.0f}, bulk {bulk_rate * BATCH:,.0f}')
+
+    assert bulk_rate * BATCH > single_rate
+
+
+def test_bulk_create_against_single_creates(client, headers):
+    titles = (f'created {index}' for index in count())
+
+    def single():
+        client.post(
+            '/tasks/',
+            json=_new_task(next(titles)),
+            headers=headers,
+        )
+
+    def bulk():
+        client.post(
+            '/tasks/bulk',
+            json={'tasks': [_new_task(next(titles)) for _ in range(BATCH)]},
+            headers=headers,
+        )
+
+    single_rate = report('POST /tasks/', sustained(single))
+    bulk_rate = report(f'POST /tasks/bulk x{BATCH}', sustained(bulk))
+    print(f'items/s: single {single_rate:,.0f}, bulk {bulk_rate * BATCH:,.0f}')
+
+    assert bulk_rate * BATCH > single_rate
@@ -0,0 +1,74 @@
+import pytest
+from sqlalchemy import text
+
+from backend.schemas.task import FilterTaskSearch
+from backend.services.task_search import search_tasks_service
+from tests.benchmarks.conftest import report, sustained
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.usefixtures('searchable')]
+
+USERS = 1_000
+TASKS = 2_000_000
+# A word shared by one task in a thousand, so each user has a couple of
+# hits among two thousand tasks
+RARE_WORDS = 1_000
+QUERIES = {
+    'rare word': 'word7',
+    'typo in title': 'erand 7',
+    'common word': 'errand',
+}
+
+
+@pytest.fixture
+def searchable(session, user):
+    # The authenticated user is user 1 and gets its share of the tasks
+    session.execute(
+        text(
+            'INSERT INTO users (username, password, email, is_active) '
+            "SELECT 'bench' || g, 'x', 'bench' || g || '@test.com', true "
+            'FROM generate_series(2, :users) AS g'
+        ),
+        {'users': USERS},
+    )
+    session.execute(
+        text(
+            'INSERT INTO tasks '
+            '(user_id, title, description, done, priority, is_active) '
+            "SELECT g % :users + 1, 'errand ' || g, "
+            "'pick up word' || g % :words || ' at ' || md5(g::text), "
+            "false, 'medium', true "
+            'FROM generate_series(1, :tasks) AS g'
+        ),
+        {'users': USERS, 'tasks': TASKS, 'words': RARE_WORDS},
+    )
+    session.commit()
+    session.execute(text('ANALYZE'))
+
+
+def _naive_search(session, user_id: int, q: str):
+    # What the search replaced: substring matching, which reads every
+    # task of the user
+    return session.execute(
+        text(
+            'SELECT * FROM tasks WHERE user_id = :user_id AND is_active '
+            "AND (title ILIKE '%' || :q || '%' "
+            "OR description ILIKE '%' || :q || '%') "
+            'ORDER BY id LIMIT 100'
+        ),
+        {'user_id': user_id, 'q': q},
+    ).all()
+
+
+@pytest.mark.parametrize('label', QUERIES)
+def test_search_latency(session, user, label):
+    # Both run straight on the session, so only the queries differ
+    q = QUERIES[label]
+
+    def search():
+        search_tasks_service(session, user, FilterTaskSearch(q=q))
+
+    def naive():
+        _naive_search(session, user.id, q)
+
+    report(f'ILIKE, {label}', sustained(naive))
+    report(f'search, {label}', sustained(search))
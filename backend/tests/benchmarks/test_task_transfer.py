@@ -0,0 +1,56 @@
+import pytest
+from sqlalchemy import func, select
+
+from backend.database.models import Task
+from tests.benchmarks.conftest import seed_tasks, timed
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.usefixtures('transfer_engine'),
+]
+
+TASKS = 1_000_000
+
+
+def _count_tasks(session, user_id: int):
+    return session.scalar(
+        select(func.count()).select_from(Task).where(Task.user_id == user_id)
+    )
+
+
+def _print_rate(name: str, seconds: float, size: int):
+    print(
+        f'\n{name}: {TASKS:,} rows, {size / 2**20:,.0f} MiB in '
+        f'{seconds:.2f} s, {TASKS / seconds:,.0f} rows/s'
+    )
+
+
+@pytest.mark.parametrize('file_format', ['ndjson', 'csv'])
+def test_export_and_import_a_million_tasks(
+    client, session, user, headers, file_format
+):
+    seed_tasks(session, user.id, TASKS)
+
+    def export():
+        with client.stream(
+            'GET', f'/tasks/export?format={file_format}', headers=headers
+        ) as response:
+            return b''.join(response.iter_bytes())
+
+    body, seconds = timed(export)
+    _print_rate(f'GET /tasks/export?format={file_format}', seconds, len(body))
+
+    # Emptied first, so every title is new again
+    session.execute(Task.__table__.delete())
+    session.commit()
+    response, seconds = timed(
+        lambda: client.post(
+            f'/tasks/import?format={file_format}',
+            files={'file': (f'tasks.{file_format}', body)},
+            headers=headers,
+        )
+    )
+    _print_rate(f'POST /tasks/import?format={file_format}', seconds, len(body))
+
+    assert response.json()['imported'] == TASKS
+    assert _count_tasks(session, user.id) == TASKS
@@ -0,0 +1,219 @@
+import json
+from http import HTTPStatus
+
+import factory
+import factory.fuzzy
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+from testcontainers.postgres import PostgresContainer
+
+from backend.app import app
+from backend.app import settings as app_settings
+from backend.auth.hashing import pwd_context
+from backend.auth.security import (
+    create_access_token,
+    login_throttle,
+    principal_cache,
+    revocation_table,
+    user_token_claims,
+)
+from backend.auth.throttle import InMemoryThrottleBackend
+from backend.database.database import get_session
+from backend.database.enums import TaskPriority
+from backend.database.models import Task, User, table_registry
+from backend.services import task_transfer
+from backend.services.geofence import geofence_cache
+from backend.services.location_tiles import tile_cache
+from backend.utils.pagination import Explain
+
+PLACE = {
+    'place_id': 1001,
+    'display_name': 'Central Park, New York',
+    'name': 'Central Park',
+    'lat': 40.7826,
+    'lon': -73.9656,
+}
+
+
+def statements(response):
+    # get_current_user adds one user lookup while the principal cache is
+    # cold; the headers fixture warms it
+    return int(response.headers['X-DB-Statements'])
+
+
+class UserFactory(factory.Factory):
+    class Meta:
+        model = User
+
+    username = factory.Sequence(lambda n: f'test{n}')
+    email = factory.LazyAttribute(lambda obj: f'{obj.username}@test.com')
+    password = factory.LazyAttribute(lambda obj: f'{obj.username}@example.com')
+
+
+class TaskFactory(factory.Factory):
+    class Meta:
+        model = Task
+
+    title = factory.Sequence(lambda n: f'task {n}')
+    description = factory.Faker('text')
+    done = False
+    priority = factory.fuzzy.FuzzyChoice(TaskPriority)
+    user_id = 1
+
+
+@pytest.fixture(scope='session')
+def engine():
+    with PostgresContainer('postgis/postgis:16-3.4', driver='psycopg') as pg:
+        _engine = create_engine(pg.get_connection_url())
+
+        with _engine.begin() as connection:
+            connection.execute(text('CREATE EXTENSION IF NOT EXISTS postgis'))
+            connection.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+
+        yield _engine
+
+        _engine.dispose()
+
+
+@pytest.fixture
+def session(engine):
+    table_registry.metadata.create_all(engine)
+
+    with Session(engine, expire_on_commit=False) as session:
+        yield session
+
+    table_registry.metadata.drop_all(engine)
+
+
+@pytest.fixture(autouse=True)
+def _count_statements(monkeypatch):
+    monkeypatch.setattr(app_settings, 'DATABASE_COUNT_STATEMENTS', True)
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    yield
+
+    principal_cache.clear()
+    revocation_table.clear()
+    geofence_cache.clear()
+    tile_cache.memory.clear()
+    login_throttle.backend = InMemoryThrottleBackend()
+
+
+@pytest.fixture
+def transfer_engine(engine, monkeypatch):
+    # Export and import open their own sessions on the module engine
+    monkeypatch.setattr(task_transfer, 'engine', engine)
+
+
+@pytest.fixture
+def client(session):
+    def get_session_override():
+        # Like closing the real session, a failed request leaves nothing
+        # uncommitted behind
+        try:
+            yield session
+        except Exception:
+            session.rollback()
+            raise
+
+    with TestClient(app) as client:
+        app.dependency_overrides[get_session] = get_session_override
+        yield client
+
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def user(session):
+    password = 'testtest'
+    user = UserFactory(password=pwd_context.hash(password))
+
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+
+    user.clean_password = password
+
+    return user
+
+
+@pytest.fixture
+def other_user(session):
+    user = UserFactory(password=pwd_context.hash('testtest'))
+
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+
+    return user
+
+
+@pytest.fixture
+def token(user):
+    return create_access_token(data=user_token_claims(user))
+
+
+@pytest.fixture
+def headers(client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    # Warms the principal cache so statement counts only cover the service
+    client.get('/tasks/stats', headers=headers)
+
+    return headers
+
+
+@pytest.fixture
+def task(session, user):
+    task = TaskFactory(user_id=user.id)
+    session.add(task)
+    session.commit()
+
+    return task
+
+
+@pytest.fixture
+def task_location(client, task, token):
+    response = client.post(
+        f'/locations/task?task_id={task.id}',
+        json=PLACE,
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    return response.json()
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+@pytest.fixture
+def service_plan():
+    # Runs a service call and plans the first statement it sent, bound
+    # exactly as the service bound it
+    def _service_plan(session, call):
+        engine = session.get_bind()
+        queries = []
+
+        def capture(conn, clauseelement, *args):
+            queries.append(clauseelement)
+
+        event.listen(engine, 'before_execute', capture)
+        try:
+            call()
+        finally:
+            event.remove(engine, 'before_execute', capture)
+
+        plan = session.scalar(Explain(queries[0]))
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        return list(plan_nodes(plan[0]['Plan']))
+
+    return _service_plan
@@ -0,0 +1,97 @@
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import select
+
+from backend.database.models import Task
+from backend.database.replica import track_commits
+from tests.conftest import PLACE, statements
+
+RADIUS_M = 500
+NEAR = {'lat': PLACE['lat'] + 0.001, 'lon': PLACE['lon']}
+FAR = {'lat': PLACE['lat'] + 0.1, 'lon': PLACE['lon']}
+PINGS = 5
+
+
+@pytest.fixture
+def fenced_task(client, session, user, headers):
+    task = Task(
+        user_id=user.id, title='pick up keys', description='at the park'
+    )
+    session.add(task)
+    session.commit()
+
+    response = client.post(
+        f'/locations/task?task_id={task.id}',
+        json={**PLACE, 'geofence_radius_m': RADIUS_M},
+        headers=headers,
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    return task
+
+
+def test_ping_inside_geofence(client, fenced_task, headers):
+    response = client.post('/locations/ping', json=NEAR, headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    [hit] = response.json()['tasks']
+    assert hit['task_id'] == fenced_task.id
+    assert hit['title'] == fenced_task.title
+    assert hit['radius_m'] == RADIUS_M
+    assert hit['distance_m'] < RADIUS_M
+
+
+def test_ping_outside_geofence(client, fenced_task, headers):
+    response = client.post('/locations/ping', json=FAR, headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'tasks': []}
+
+
+def test_ping_skips_done_tasks(client, fenced_task, headers):
+    client.patch(f'/tasks/done/{fenced_task.id}', headers=headers)
+
+    response = client.post('/locations/ping', json=NEAR, headers=headers)
+
+    assert response.json() == {'tasks': []}
+
+
+def test_repeated_pings_do_not_touch_the_database(
+    client, fenced_task, headers
+):
+    first = client.post('/locations/ping', json=NEAR, headers=headers)
+    repeated = [
+        client.post('/locations/ping', json=NEAR, headers=headers)
+        for _ in range(PINGS)
+    ]
+
+    assert statements(first) == 1
+    assert [statements(response) for response in repeated] == [0] * PINGS
+    assert all(response.json() == first.json() for response in repeated)
+
+
+def test_location_change_invalidates_geofences(client, fenced_task, headers):
+    client.post('/locations/ping', json=NEAR, headers=headers)
+
+    client.put(
+        f'/locations/task/{fenced_task.id}',
+        json={**PLACE, 'place_id': 1002, **FAR, 'geofence_radius_m': RADIUS_M},
+        headers=headers,
+    )
+    response = client.post('/locations/ping', json=FAR, headers=headers)
+
+    assert statements(response) == 1
+    assert [hit['task_id'] for hit in response.json()['tasks']] == [
+        fenced_task.id
+    ]
+
+
+def test_reads_do_not_count_as_commits(session):
+    track_commits(session)
+
+    session.scalars(select(Task)).all()
+    assert session.info['committed'] is False
+
+    session.commit()
+    assert session.info['committed'] is True
@@ -0,0 +1,79 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from backend.app import app
+from backend.auth.hashing import HashingExecutor, pwd_context
+from backend.auth.security import hashing_executor
+
+PASSWORD = 'secret'
+
+
+@pytest.fixture
+def executor():
+    executor = HashingExecutor(max_workers=1, max_pending=1)
+    yield executor
+    executor.shutdown()
+
+
+def test_hash_runs_in_the_pool(executor):
+    hashed = asyncio.run(executor.hash(PASSWORD))
+
+    assert pwd_context.verify(PASSWORD, hashed)
+    assert asyncio.run(executor.verify(PASSWORD, hashed)) is True
+
+
+def test_rejects_past_max_pending(executor):
+    async def hash_twice():
+        return await asyncio.gather(
+            executor.hash(PASSWORD),
+            executor.hash(PASSWORD),
+            return_exceptions=True,
+        )
+
+    first, second = asyncio.run(hash_twice())
+
+    assert pwd_context.verify(PASSWORD, first)
+    assert isinstance(second, HTTPException)
+    assert second.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert executor.stats()['rejected'] == 1
+    assert executor.stats()['pending'] == 0
+
+
+def test_login_is_busy_past_max_pending(client, user, monkeypatch):
+    monkeypatch.setattr(hashing_executor, 'max_pending', 0)
+
+    response = client.post(
+        '/auth/login',
+        data={'username': user.email, 'password': user.clean_password},
+    )
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers['Retry-After'] == '1'
+
+
+def test_shutdown_stops_the_pool(executor):
+    asyncio.run(executor.hash(PASSWORD))
+    pool = executor._executor
+
+    executor.shutdown()
+
+    assert executor._executor is None
+    with pytest.raises(RuntimeError):
+        pool.submit(pow, 2, 2)
+    # A later call starts a fresh pool
+    assert pwd_context.verify(PASSWORD, asyncio.run(executor.hash(PASSWORD)))
+
+
+def test_lifespan_shuts_the_pool_down():
+    with TestClient(app) as client:
+        hashed = client.portal.call(hashing_executor.hash, PASSWORD)
+        pool = hashing_executor._executor
+
+    assert pwd_context.verify(PASSWORD, hashed)
+    assert hashing_executor._executor is None
+    with pytest.raises(RuntimeError):
+        pool.submit(pow, 2, 2)
@@ -0,0 +1,166 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from backend.database.enums import TaskPriority
+from backend.database.models import User, table_registry
+from backend.schemas.task import (
+    FilterTaskPagination,
+    TaskSchema,
+    TaskSortField,
+)
+from backend.services.location import (
+    read_task_location_service,
+    read_user_location_service,
+)
+from backend.services.task import create_task_service, list_tasks_service
+from backend.utils.exceptions import TaskExistsException
+
+USERS = 1_000
+TASKS = 1_000_000
+PLACES = 10_000
+USER_ID = 7
+TASK_ID = 7006
+
+
+@pytest.fixture(scope='module')
+def seeded(engine):
+    # A thousand users with a thousand tasks each; every other task has a
+    # location, every tenth task is inactive. Seeded once for the module.
+    table_registry.metadata.create_all(engine)
+    session = Session(engine)
+    session.execute(
+        text(
+            'INSERT INTO users (username, password, email, is_active) '
+            "SELECT 'user' || g, 'x', 'user' || g || '@test.com', true "
+            'FROM generate_series(1, :users) AS g'
+        ),
+        {'users': USERS},
+    )
+    session.execute(
+        text(
+            'INSERT INTO tasks '
+            '(user_id, title, description, done, priority, is_active) '
+            "SELECT g % :users + 1, 'task ' || g, 'description', g % 3 = 0, "
+            "(ARRAY['high', 'medium', 'low'])[g % 3 + 1]::taskpriority, "
+            'g % 10 <> 0 '
+            'FROM generate_series(1, :tasks) AS g'
+        ),
+        {'users': USERS, 'tasks': TASKS},
+    )
+    session.execute(
+        text(
+            'INSERT INTO places '
+            '(place_id, display_name, name, lat, lon, geom) '
+            "SELECT 'place' || g, 'Place ' || g, 'Place ' || g, "
+            'g % 180 - 90, g % 360 - 180, '
+            'ST_SetSRID(ST_MakePoint(g % 360 - 180, g % 180 - 90), 4326) '
+            'FROM generate_series(1, :places) AS g'
+        ),
+        {'places': PLACES},
+    )
+    session.execute(
+        text(
+            'INSERT INTO locations (task_id, place_id) '
+            "SELECT id, 'place' || (id % :places + 1) FROM tasks "
+            'WHERE id % 2 = 0'
+        ),
+        {'places': PLACES},
+    )
+    session.execute(
+        text(
+            'INSERT INTO locations (user_id, place_id) '
+            "SELECT id, 'place' || id FROM users"
+        )
+    )
+    session.commit()
+    session.execute(text('ANALYZE'))
+
+    yield session
+
+    session.close()
+    table_registry.metadata.drop_all(engine)
+
+
+@pytest.fixture(scope='module')
+def seeded_user(seeded):
+    return seeded.get(User, USER_ID)
+
+
+def index_names(nodes):
+    # The plan reads only through the named indexes; a sequential scan
+    # anywhere fails the check
+    assert not [node for node in nodes if node['Node Type'] == 'Seq Scan']
+
+    return {node['Index Name'] for node in nodes if 'Index Name' in node}
+
+
+def test_duplicate_title_check_uses_index(seeded, seeded_user, service_plan):
+    def create():
+        with pytest.raises(TaskExistsException):
+            create_task_service(
+                TaskSchema(
+                    title=f'task {TASK_ID}',
+                    description='description',
+                    done=False,
+                    priority=TaskPriority.medium,
+                    user_id=USER_ID,
+                ),
+                seeded,
+                seeded_user,
+            )
+
+    nodes = service_plan(seeded, create)
+
+    assert index_names(nodes) == {'ix_tasks_user_id_title'}
+
+
+@pytest.mark.parametrize(
+    ('sort', 'index'),
+    [
+        (None, 'ix_tasks_active_user_id'),
+        (TaskSortField.priority, 'ix_tasks_active_user_id_priority_id'),
+        (TaskSortField.created_at, 'ix_tasks_active_user_id_created_at_id'),
+        (TaskSortField.update_at, 'ix_tasks_active_user_id_changed_at_id'),
+        (TaskSortField.done, 'ix_tasks_active_user_id_done_id'),
+    ],
+)
+def test_task_list_uses_index(seeded, seeded_user, service_plan, sort, index):
+    nodes = service_plan(
+        seeded,
+        lambda: list_tasks_service(
+            seeded, seeded_user, FilterTaskPagination(sort=sort)
+        ),
+    )
+
+    assert index_names(nodes) == {index}
+
+
+def test_filtered_task_list_uses_index(seeded, seeded_user, service_plan):
+    nodes = service_plan(
+        seeded,
+        lambda: list_tasks_service(
+            seeded,
+            seeded_user,
+            FilterTaskPagination(priority=TaskPriority.high, done=False),
+        ),
+    )
+
+    assert index_names(nodes) == {'ix_tasks_active_user_id_priority_id'}
+
+
+def test_task_location_lookup_uses_index(seeded, seeded_user, service_plan):
+    nodes = service_plan(
+        seeded,
+        lambda: read_task_location_service(TASK_ID, seeded, seeded_user),
+    )
+
+    assert index_names(nodes) == {'tasks_pkey', 'ix_locations_task_id'}
+
+
+def test_user_location_lookup_uses_index(seeded, seeded_user, service_plan):
+    nodes = service_plan(
+        seeded, lambda: read_user_location_service(seeded, seeded_user)
+    )
+
+    assert index_names(nodes) == {'ix_locations_user_id'}
@@ -0,0 +1,67 @@
+from http import HTTPStatus
+
+import pytest
+
+from backend.routers import internal
+from tests.conftest import app_settings
+
+TOKEN = 'internal-secret'
+
+
+@pytest.fixture
+def internal_token(monkeypatch):
+    monkeypatch.setattr(internal.settings, 'INTERNAL_STATS_TOKEN', TOKEN)
+
+    return TOKEN
+
+
+def test_stats_closed_without_configured_token(client):
+    response = client.get(
+        '/internal/stats', headers={'X-Internal-Token': TOKEN}
+    )
+
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+def test_stats_without_token(client, internal_token):
+    response = client.get('/internal/stats')
+
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+def test_stats_with_wrong_token(client, internal_token):
+    response = client.get(
+        '/internal/stats', headers={'X-Internal-Token': 'wrong'}
+    )
+
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+def test_stats_with_user_token(client, internal_token, token):
+    response = client.get(
+        '/internal/stats', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+
+def test_stats(client, internal_token):
+    response = client.get(
+        '/internal/stats', headers={'X-Internal-Token': internal_token}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert 'database_pool' in response.json()
+    assert 'login_throttle' in response.json()
+
+
+def test_statements_are_not_counted_by_default(
+    client, monkeypatch, internal_token
+):
+    monkeypatch.setattr(app_settings, 'DATABASE_COUNT_STATEMENTS', False)
+
+    response = client.get(
+        '/internal/stats', headers={'X-Internal-Token': internal_token}
+    )
+
+    assert 'X-DB-Statements' not in response.headers
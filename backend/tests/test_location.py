@@ -0,0 +1,259 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import event, func, select
+
+from backend.auth.security import create_access_token, user_token_claims
+from backend.database.models import Place
+from tests.conftest import PLACE, TaskFactory, statements
+
+RADIUS_M = 250
+# place upsert, insert, tile version
+CREATE_STATEMENTS = 3
+# place upsert, update, tile version
+UPDATE_STATEMENTS = 3
+# delete returning, tile version
+DELETE_STATEMENTS = 2
+
+
+def test_create_task_location(client, task, token):
+    response = client.post(
+        f'/locations/task?task_id={task.id}',
+        json={**PLACE, 'geofence_radius_m': RADIUS_M},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['task_id'] == task.id
+    assert response.json()['geofence_radius_m'] == RADIUS_M
+    assert response.json()['geom'] == {
+        'type': 'Point',
+        'coordinates': [PLACE['lon'], PLACE['lat']],
+    }
+
+
+def test_read_task_location_in_one_statement(client, task_location, token):
+    response = client.get(
+        f'/locations/task/{task_location["task_id"]}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == task_location
+    assert statements(response) == 1
+
+
+def test_read_task_location_without_location(client, task, token):
+    response = client.get(
+        f'/locations/task/{task.id}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'Task does not have a location yet'}
+    assert statements(response) == 1 + 1
+
+
+def test_read_task_location_of_other_user(client, session, other_user, token):
+    task = TaskFactory(user_id=other_user.id)
+    session.add(task)
+    session.commit()
+
+    response = client.get(
+        f'/locations/task/{task.id}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'Task not found'}
+
+
+def test_read_missing_task_location(client, token):
+    response = client.get(
+        '/locations/task/999', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'Task not found'}
+    assert statements(response) == 1 + 1
+
+
+def test_update_task_location(client, task_location, token):
+    other_place = {**PLACE, 'place_id': 1002, 'name': 'Bryant Park'}
+
+    response = client.put(
+        f'/locations/task/{task_location["task_id"]}',
+        json=other_place,
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['name'] == 'Bryant Park'
+    assert statements(response) == UPDATE_STATEMENTS
+
+
+def test_update_location_of_other_users_task(
+    client, session, other_user, token
+):
+    task = TaskFactory(user_id=other_user.id)
+    session.add(task)
+    session.commit()
+
+    response = client.put(
+        f'/locations/task/{task.id}',
+        json={**PLACE, 'place_id': 2001},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'Task not found'}
+    assert session.get(Place, '2001') is None
+
+
+def test_update_task_without_location(client, task, token):
+    response = client.put(
+        f'/locations/task/{task.id}',
+        json=PLACE,
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'Task does not have a location yet'}
+
+
+def test_existing_place_is_not_rewritten(
+    client, session, task_location, other_user
+):
+    task = TaskFactory(user_id=other_user.id)
+    session.add(task)
+    session.commit()
+    other_token = create_access_token(data=user_token_claims(other_user))
+
+    response = client.post(
+        f'/locations/task?task_id={task.id}',
+        json={**PLACE, 'name': 'Renamed', 'lat': 0, 'lon': 0},
+        headers={'Authorization': f'Bearer {other_token}'},
+    )
+
+    assert response.status_code == HTTPStatus.CONFLICT
+    session.expire_all()
+    place = session.get(Place, str(PLACE['place_id']))
+    assert (place.name, place.lat, place.lon) == (
+        PLACE['name'],
+        PLACE['lat'],
+        PLACE['lon'],
+    )
+
+
+def test_existing_place_is_shared(client, session, task_location, other_user):
+    task = TaskFactory(user_id=other_user.id)
+    session.add(task)
+    session.commit()
+    other_token = create_access_token(data=user_token_claims(other_user))
+
+    response = client.post(
+        f'/locations/task?task_id={task.id}',
+        json=PLACE,
+        headers={'Authorization': f'Bearer {other_token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['geom'] == task_location['geom']
+
+
+def test_create_location_for_missing_task_keeps_no_place(
+    client, session, token
+):
+    response = client.post(
+        '/locations/task?task_id=999',
+        json={**PLACE, 'place_id': 2002},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'Task not found'}
+    assert session.get(Place, '2002') is None
+
+
+def test_delete_task_location(client, task_location, token):
+    response = client.delete(
+        f'/locations/task/{task_location["task_id"]}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert statements(response) == DELETE_STATEMENTS
+
+
+def test_delete_task_location_twice(client, task_location, token):
+    url = f'/locations/task/{task_location["task_id"]}'
+    headers = {'Authorization': f'Bearer {token}'}
+    client.delete(url, headers=headers)
+
+    response = client.delete(url, headers=headers)
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'Task does not have a location yet'}
+
+
+def test_read_user_location_in_one_statement(client, user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    created = client.post(
+        '/locations/user', json={**PLACE, 'user_id': user.id}, headers=headers
+    ).json()
+
+    response = client.get(f'/locations/user/{user.id}', headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == created
+    assert statements(response) == 1
+
+
+@pytest.fixture
+def sent_sql(engine):
+    sql = []
+
+    def capture(conn, cursor, statement, *args):
+        sql.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', capture)
+    yield sql
+    event.remove(engine, 'before_cursor_execute', capture)
+
+
+def _database_geojson(session, place_id):
+    return json.loads(
+        session.scalar(
+            select(func.ST_AsGeoJSON(Place.geom)).where(
+                Place.place_id == str(place_id)
+            )
+        )
+    )
+
+
+def test_location_geojson_is_built_from_the_loaded_geom(
+    client, session, task, headers, sent_sql
+):
+    moved = {**PLACE, 'place_id': 1002, 'lat': 48.8566, 'lon': 2.3522}
+
+    responses = [
+        client.post(
+            f'/locations/task?task_id={task.id}', json=PLACE, headers=headers
+        ),
+        client.put(f'/locations/task/{task.id}', json=moved, headers=headers),
+        client.get(f'/locations/task/{task.id}', headers=headers),
+    ]
+
+    assert [response.status_code for response in responses] == [
+        HTTPStatus.OK
+    ] * 3
+    assert statements(responses[0]) == CREATE_STATEMENTS
+    assert not [sql for sql in sent_sql if 'ST_AsGeoJSON' in sql]
+    assert responses[0].json()['geom'] == _database_geojson(
+        session, PLACE['place_id']
+    )
+    for response in responses[1:]:
+        assert response.json()['geom'] == _database_geojson(
+            session, moved['place_id']
+        )
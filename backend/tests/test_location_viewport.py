@@ -0,0 +1,165 @@
+from http import HTTPStatus
+from math import floor
+
+import pytest
+from sqlalchemy import update
+
+from backend.auth.security import create_access_token, user_token_claims
+from backend.database.models import Task
+from backend.services import location as location_service
+from tests.conftest import TaskFactory
+
+CLUSTER_ZOOM = location_service.settings.LOCATION_CLUSTER_MAX_ZOOM
+POINT_ZOOM = CLUSTER_ZOOM + 1
+CELL = (
+    360
+    / 2**CLUSTER_ZOOM
+    / location_service.settings.LOCATION_CLUSTER_CELLS_PER_TILE
+)
+# Grid cells in Manhattan; points sit near a cell centre, so none of them
+# falls on a cell edge
+NEAR_CELL = (floor(-73.9656 / CELL), floor(40.7826 / CELL))
+FAR_CELL = (NEAR_CELL[0] + 3, NEAR_CELL[1] + 2)
+NEAR_POINTS = 3
+FAR_POINTS = 2
+BBOX = '-74.1,40.7,-73.7,41.0'
+PARIS = (2.3522, 48.8566)
+
+
+def _cell_point(cell, index: int):
+    column, row = cell
+    return (
+        (column + 0.5) * CELL + index * CELL / 10,
+        (row + 0.5) * CELL + index * CELL / 10,
+    )
+
+
+def _locate(client, headers, task_id: int, place_id: int, point):
+    lon, lat = point
+    response = client.post(
+        f'/locations/task?task_id={task_id}',
+        json={
+            'place_id': place_id,
+            'display_name': f'Place {place_id}',
+            'name': f'place {place_id}',
+            'lat': lat,
+            'lon': lon,
+        },
+        headers=headers,
+    )
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.fixture
+def mapped_tasks(client, session, user, headers):
+    points = [
+        *(_cell_point(NEAR_CELL, index) for index in range(NEAR_POINTS)),
+        *(_cell_point(FAR_CELL, index) for index in range(FAR_POINTS)),
+    ]
+    # One more in the viewport but deactivated, and one far away
+    tasks = TaskFactory.create_batch(len(points) + 2, user_id=user.id)
+    session.add_all(tasks)
+    session.commit()
+
+    for place_id, (task, point) in enumerate(
+        zip(tasks, [*points, points[0], PARIS])
+    ):
+        _locate(client, headers, task.id, place_id + 1, point)
+
+    session.execute(
+        update(Task)
+        .where(Task.id == tasks[len(points)].id)
+        .values(is_active=False)
+    )
+    session.commit()
+
+    return tasks[: len(points)]
+
+
+def _viewport(client, headers, zoom: int, bbox: str = BBOX):
+    return client.get(
+        '/locations/tasks',
+        params={'bbox': bbox, 'zoom': zoom},
+        headers=headers,
+    )
+
+
+def test_low_zoom_clusters_by_grid_cell(client, headers, mapped_tasks):
+    response = _viewport(client, headers, CLUSTER_ZOOM)
+
+    assert response.status_code == HTTPStatus.OK
+    features = response.json()['features']
+    assert {feature['properties']['cluster'] for feature in features} == {True}
+    assert sorted(
+        feature['properties']['count'] for feature in features
+    ) == sorted([NEAR_POINTS, FAR_POINTS])
+    assert response.json()['truncated'] is False
+
+
+def test_cluster_sits_at_the_mean_of_its_points(client, headers, mapped_tasks):
+    response = _viewport(client, headers, CLUSTER_ZOOM)
+
+    near = [_cell_point(NEAR_CELL, index) for index in range(NEAR_POINTS)]
+    [cluster] = [
+        feature
+        for feature in response.json()['features']
+        if feature['properties']['count'] == NEAR_POINTS
+    ]
+    lon, lat = cluster['geometry']['coordinates']
+    assert lon == pytest.approx(sum(point[0] for point in near) / NEAR_POINTS)
+    assert lat == pytest.approx(sum(point[1] for point in near) / NEAR_POINTS)
+
+
+def test_high_zoom_returns_each_location(client, headers, mapped_tasks):
+    response = _viewport(client, headers, POINT_ZOOM)
+
+    features = response.json()['features']
+    assert [feature['properties']['task_id'] for feature in features] == [
+        task.id for task in mapped_tasks
+    ]
+    assert {feature['properties']['cluster'] for feature in features} == {
+        False
+    }
+    assert features[0]['properties']['title'] == mapped_tasks[0].title
+
+
+def test_viewport_skips_other_users(client, session, other_user, token):
+    task = TaskFactory(user_id=other_user.id)
+    session.add(task)
+    session.commit()
+    # Only the owner can locate a task, so the other user does it
+    other_headers = {
+        'Authorization': (
+            f'Bearer {create_access_token(user_token_claims(other_user))}'
+        )
+    }
+    _locate(client, other_headers, task.id, 1, _cell_point(NEAR_CELL, 0))
+
+    response = _viewport(
+        client, {'Authorization': f'Bearer {token}'}, POINT_ZOOM
+    )
+
+    assert response.json()['features'] == []
+
+
+@pytest.mark.parametrize('zoom', [CLUSTER_ZOOM, POINT_ZOOM])
+def test_viewport_is_truncated_at_max_features(
+    client, headers, mapped_tasks, monkeypatch, zoom
+):
+    monkeypatch.setattr(
+        location_service.settings, 'LOCATION_VIEWPORT_MAX_FEATURES', 1
+    )
+
+    response = _viewport(client, headers, zoom)
+
+    assert len(response.json()['features']) == 1
+    assert response.json()['truncated'] is True
+
+
+@pytest.mark.parametrize(
+    'bbox', ['-74,40,-73', '-73,40,-74,41', '-74,-91,-73,41', 'a,b,c,d']
+)
+def test_viewport_rejects_bad_bbox(client, headers, bbox):
+    response = _viewport(client, headers, POINT_ZOOM, bbox)
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
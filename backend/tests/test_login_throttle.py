@@ -0,0 +1,179 @@
+from http import HTTPStatus
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from backend.auth.security import hashing_executor, login_throttle
+from backend.auth.throttle import InMemoryThrottleBackend, LoginThrottle
+from backend.routers import auth
+
+MAX_PER_EMAIL = 3
+MAX_PER_CLIENT = 5
+
+
+@pytest.fixture
+def throttle():
+    return LoginThrottle(
+        backend=InMemoryThrottleBackend(),
+        max_attempts_per_email=MAX_PER_EMAIL,
+        max_attempts_per_client=MAX_PER_CLIENT,
+        window_seconds=60,
+    )
+
+
+def test_burst_is_capped_before_any_failure(throttle):
+    # Every attempt of a concurrent burst passes check before the first
+    # one fails its password; only the window's worth may proceed
+    for _ in range(MAX_PER_EMAIL):
+        throttle.check('user@test.com', '10.0.0.1')
+
+    with pytest.raises(HTTPException) as exc_info:
+        throttle.check('user@test.com', '10.0.0.1')
+
+    assert exc_info.value.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert throttle.allowed == MAX_PER_EMAIL
+
+
+def test_failures_keep_their_slot(throttle):
+    for _ in range(MAX_PER_EMAIL):
+        throttle.record_failure(throttle.check('user@test.com', '10.0.0.1'))
+
+    with pytest.raises(HTTPException):
+        throttle.check('user@test.com', '10.0.0.1')
+
+
+def test_released_attempts_free_their_slot(throttle):
+    for _ in range(MAX_PER_EMAIL + 1):
+        throttle.release(throttle.check('user@test.com', '10.0.0.1'))
+
+
+def test_success_clears_email_window(throttle):
+    for _ in range(MAX_PER_EMAIL - 1):
+        throttle.record_failure(throttle.check('user@test.com', '10.0.0.1'))
+
+    throttle.record_success(throttle.check('user@test.com', '10.0.0.1'))
+
+    for _ in range(MAX_PER_EMAIL):
+        throttle.check('user@test.com', '10.0.0.1')
+
+
+def test_client_window_spans_emails(throttle):
+    for n in range(MAX_PER_CLIENT):
+        throttle.record_failure(throttle.check(f'{n}@test.com', '10.0.0.1'))
+
+    with pytest.raises(HTTPException):
+        throttle.check('other@test.com', '10.0.0.1')
+
+    throttle.check('other@test.com', '10.0.0.2')
+
+
+def _request(headers: dict):
+    return Request(
+        {
+            'type': 'http',
+            'headers': [
+                (key.lower().encode(), value.encode())
+                for key, value in headers.items()
+            ],
+            'client': ('172.16.0.1', 4000),
+        }
+    )
+
+
+def test_client_address_from_trusted_header(monkeypatch):
+    monkeypatch.setattr(auth.settings, 'CLIENT_IP_HEADER', 'Fly-Client-IP')
+
+    assert auth.client_address(_request({'Fly-Client-IP': '1.2.3.4'})) == (
+        '1.2.3.4'
+    )
+    assert auth.client_address(_request({})) == '172.16.0.1'
+
+
+def test_client_address_ignores_header_when_untrusted(monkeypatch):
+    monkeypatch.setattr(auth.settings, 'CLIENT_IP_HEADER', None)
+
+    assert auth.client_address(_request({'Fly-Client-IP': '1.2.3.4'})) == (
+        '172.16.0.1'
+    )
+
+
+def test_login_is_throttled_after_failures(client, user):
+    for _ in range(login_throttle.max_attempts_per_email):
+        response = client.post(
+            '/auth/login',
+            data={'username': user.email, 'password': 'wrong'},
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    response = client.post(
+        '/auth/login',
+        data={'username': user.email, 'password': user.clean_password},
+    )
+
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+
+
+def _login(client, email: str, password: str, address: str = '10.0.0.1'):
+    return client.post(
+        '/auth/login',
+        data={'username': email, 'password': password},
+        headers={'Fly-Client-IP': address},
+    )
+
+
+@pytest.fixture
+def small_windows(monkeypatch):
+    monkeypatch.setattr(auth.settings, 'CLIENT_IP_HEADER', 'Fly-Client-IP')
+    monkeypatch.setattr(
+        login_throttle, 'max_attempts_per_email', MAX_PER_EMAIL
+    )
+    monkeypatch.setattr(
+        login_throttle, 'max_attempts_per_client', MAX_PER_CLIENT
+    )
+
+
+@pytest.mark.usefixtures('small_windows')
+def test_login_success_clears_the_email_window(client, user):
+    for _ in range(MAX_PER_EMAIL - 1):
+        _login(client, user.email, 'wrong')
+
+    assert (
+        _login(client, user.email, user.clean_password).status_code
+        == HTTPStatus.OK
+    )
+    for _ in range(MAX_PER_EMAIL - 1):
+        _login(client, user.email, 'wrong')
+
+    response = _login(client, user.email, user.clean_password)
+
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.usefixtures('small_windows')
+def test_login_client_window_spans_emails(client, user):
+    for n in range(MAX_PER_CLIENT):
+        response = _login(client, f'{n}@test.com', 'wrong')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    blocked = _login(client, user.email, user.clean_password)
+    other_client = _login(
+        client, user.email, user.clean_password, address='10.0.0.2'
+    )
+
+    assert blocked.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert other_client.status_code == HTTPStatus.OK
+
+
+@pytest.mark.usefixtures('small_windows')
+def test_busy_login_does_not_use_up_the_window(client, user, monkeypatch):
+    max_pending = hashing_executor.max_pending
+    monkeypatch.setattr(hashing_executor, 'max_pending', 0)
+    for _ in range(MAX_PER_EMAIL + 1):
+        response = _login(client, user.email, user.clean_password)
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+
+    monkeypatch.setattr(hashing_executor, 'max_pending', max_pending)
+    response = _login(client, user.email, user.clean_password)
+
+    assert response.status_code == HTTPStatus.OK
@@ -0,0 +1,175 @@
+from datetime import datetime, timedelta
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import text, update
+
+from backend.database.enums import TaskPriority
+from backend.database.models import Task
+from backend.services import task as task_service
+from backend.utils.pagination import encode_cursor
+from tests.conftest import TaskFactory
+
+PAGE_SIZE = 2
+SORTED_TASKS = 9
+DAY = timedelta(days=1)
+
+PRIORITY_ORDER = list(TaskPriority)
+SORT_KEYS = {
+    'priority': lambda task: PRIORITY_ORDER.index(task.priority),
+    'created_at': lambda task: task.created_at,
+    'update_at': lambda task: task.update_at or task.created_at,
+    'done': lambda task: task.done,
+}
+
+
+@pytest.fixture
+def tasks(session, user):
+    tasks = TaskFactory.create_batch(5, user_id=user.id)
+    session.add_all(tasks)
+    session.commit()
+
+    return tasks
+
+
+@pytest.fixture
+def tied_tasks(session, user):
+    # Every sort key repeats: three priorities, two done states, and the
+    # created_at all tasks share except the three moved back in time;
+    # update_at is only set on some, so the rest fall back to created_at
+    tasks = [
+        TaskFactory(
+            user_id=user.id,
+            priority=PRIORITY_ORDER[index % len(PRIORITY_ORDER)],
+            done=index % 2 == 0,
+        )
+        for index in range(SORTED_TASKS)
+    ]
+    session.add_all(tasks)
+    session.commit()
+
+    earlier = datetime.now() - DAY
+    for index, task in enumerate(tasks[:3]):
+        session.execute(
+            update(Task)
+            .where(Task.id == task.id)
+            .values(created_at=earlier, update_at=earlier + index % 2 * DAY)
+        )
+    session.commit()
+    for task in tasks:
+        session.refresh(task)
+
+    return tasks
+
+
+def _page_all(client, headers, **params):
+    paged = []
+    cursor = None
+    while True:
+        page_params = {'limit': PAGE_SIZE, **params}
+        if cursor:
+            page_params['cursor'] = cursor
+        page = client.get('/tasks/', params=page_params, headers=headers)
+        assert page.status_code == HTTPStatus.OK
+        paged.extend(task['id'] for task in page.json()['tasks'])
+        cursor = page.json()['next_cursor']
+        if not cursor:
+            break
+
+    return paged
+
+
+def test_list_tasks_pages_with_cursor(client, token, tasks):
+    headers = {'Authorization': f'Bearer {token}'}
+
+    assert _page_all(client, headers) == [task.id for task in tasks]
+
+
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+@pytest.mark.parametrize('sort', SORT_KEYS)
+def test_list_tasks_pages_by_sort_key(
+    client, headers, tied_tasks, sort, order
+):
+    expected = sorted(
+        tied_tasks,
+        key=lambda task: (SORT_KEYS[sort](task), task.id),
+        reverse=order == 'desc',
+    )
+
+    paged = _page_all(client, headers, sort=sort, order=order)
+
+    assert paged == [task.id for task in expected]
+
+
+@pytest.mark.parametrize('limit', [0, -1, 101])
+def test_list_tasks_rejects_limit_out_of_range(client, token, limit):
+    response = client.get(
+        '/tasks/',
+        params={'limit': limit},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.parametrize(
+    ('sort', 'values'),
+    [
+        (None, ['x']),
+        (None, [True]),
+        (None, [1, 2]),
+        ('priority', ['urgent', 1]),
+        ('created_at', [3, 1]),
+        ('done', ['yes', 1]),
+    ],
+)
+def test_list_tasks_rejects_mistyped_cursor(client, token, sort, values):
+    params = {'cursor': encode_cursor(values)}
+    if sort:
+        params['sort'] = sort
+
+    response = client.get(
+        '/tasks/', params=params, headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Invalid pagination cursor'}
+
+
+def test_list_tasks_rejects_garbage_cursor(client, token):
+    response = client.get(
+        '/tasks/',
+        params={'cursor': '!!'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_list_tasks_counts_exactly_up_to_the_cap(client, token, tasks):
+    response = client.get(
+        '/tasks/',
+        params={'limit': PAGE_SIZE, 'count': True},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.json()['total'] == len(tasks)
+    assert response.json()['total_is_estimate'] is False
+
+
+def test_list_tasks_estimates_past_the_cap(
+    client, session, token, tasks, monkeypatch
+):
+    monkeypatch.setattr(task_service.settings, 'PAGINATION_COUNT_CAP', 1)
+    # Fresh statistics, so the estimate is close to the real count
+    session.execute(text('ANALYZE tasks'))
+
+    response = client.get(
+        '/tasks/',
+        params={'limit': PAGE_SIZE, 'count': True},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['total'] >= len(tasks)
+    assert response.json()['total_is_estimate'] is True
@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.orm import Session
+
+from backend.database.pool import instrument_engine, pool_snapshot
+
+SESSIONS = 3
+
+
+@pytest.fixture
+def pool_engine(tmp_path):
+    # A file database, so SQLite gets a QueuePool like PostgreSQL does
+    engine = instrument_engine(
+        create_engine(
+            f'sqlite:///{tmp_path / "pool.db"}',
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.01,
+        )
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_sessions_are_counted(pool_engine):
+    for _ in range(SESSIONS):
+        with Session(pool_engine) as session:
+            session.execute(text('SELECT 1'))
+
+    snapshot = pool_snapshot(pool_engine)
+    assert snapshot['connects'] == 1
+    assert snapshot['checkouts'] == snapshot['checkins'] == SESSIONS
+    assert snapshot['in_use'] == 0
+    assert snapshot['idle'] == 1
+    assert snapshot['wait_max_ms'] >= snapshot['wait_avg_ms'] > 0
+
+
+def test_exhausted_pool_counts_a_timeout(pool_engine):
+    with pool_engine.connect():
+        assert pool_snapshot(pool_engine)['in_use'] == 1
+
+        with pytest.raises(TimeoutError):
+            pool_engine.connect()
+
+    assert pool_snapshot(pool_engine)['timeouts'] == 1
+
+
+def test_counts_survive_dispose(pool_engine):
+    with pool_engine.connect():
+        pass
+    pool_engine.dispose()
+
+    with pool_engine.connect():
+        pass
+
+    # The new pool opened its own connection and still reported it
+    snapshot = pool_snapshot(pool_engine)
+    assert snapshot['connects'] == snapshot['checkouts']
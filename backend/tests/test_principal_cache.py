@@ -0,0 +1,79 @@
+from http import HTTPStatus
+from time import monotonic
+
+import pytest
+
+from backend.auth.security import principal_cache
+from backend.utils import cache
+from tests.conftest import statements
+
+
+def _read_stats(client, token):
+    return client.get(
+        '/tasks/stats', headers={'Authorization': f'Bearer {token}'}
+    )
+
+
+@pytest.fixture
+def cold(client, token):
+    # The first request looks the user up and caches the principal
+    response = _read_stats(client, token)
+    assert principal_cache.stats()['size'] == 1
+
+    return statements(response)
+
+
+def test_cached_principal_skips_the_user_lookup(client, token, cold):
+    response = _read_stats(client, token)
+
+    assert response.status_code == HTTPStatus.OK
+    assert statements(response) == cold - 1
+
+
+def test_expired_principal_is_looked_up_again(
+    client, token, cold, monkeypatch
+):
+    expired = monotonic() + principal_cache.ttl
+    monkeypatch.setattr(cache, 'monotonic', lambda: expired)
+
+    response = _read_stats(client, token)
+
+    assert statements(response) == cold
+
+
+def test_patch_invalidates_the_principal(client, user, token, cold):
+    client.patch(
+        f'/users/{user.id}',
+        json={'username': 'renamed'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    assert principal_cache.stats()['size'] == 0
+
+    response = _read_stats(client, token)
+
+    assert response.status_code == HTTPStatus.OK
+    assert statements(response) == cold
+
+
+@pytest.mark.usefixtures('cold')
+@pytest.mark.parametrize(
+    'change',
+    [
+        ('PATCH', '/users/{id}', {'password': 'changed'}),
+        ('PATCH', '/users/deactivate/{id}', None),
+        ('DELETE', '/users/{id}', None),
+    ],
+)
+def test_revoking_change_rejects_the_cached_principal(
+    client, user, token, change
+):
+    method, path, body = change
+    response = client.request(
+        method,
+        path.format(id=user.id),
+        json=body,
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    assert _read_stats(client, token).status_code == HTTPStatus.UNAUTHORIZED
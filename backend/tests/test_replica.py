@@ -0,0 +1,117 @@
+import pytest
+from sqlalchemy import create_engine
+from starlette.requests import Request
+
+from backend.auth.security import create_access_token
+from backend.database import database
+from backend.database.replica import ReplicaRouter
+from backend.utils import cache
+
+USER_ID = 7
+MAX_LAG_SECONDS = 5
+STICKY_SECONDS = 10
+
+
+@pytest.fixture
+def router():
+    return ReplicaRouter(
+        max_lag_seconds=MAX_LAG_SECONDS,
+        sticky_seconds=STICKY_SECONDS,
+        check_seconds=60,
+    )
+
+
+@pytest.fixture
+def healthy(router, monkeypatch):
+    # Skips the lag query, which needs a real standby
+    router._record_check(0.0)
+    monkeypatch.setattr(router, '_check_due', lambda: False)
+
+    return router
+
+
+@pytest.fixture
+def engines(healthy, monkeypatch):
+    # Never connected to; only which one a session is bound to matters
+    primary = create_engine('sqlite://')
+    replica = create_engine('sqlite://')
+    monkeypatch.setattr(database, 'engine', primary)
+    monkeypatch.setattr(database, 'replica_engine', replica)
+    monkeypatch.setattr(database, 'replica_router', healthy)
+
+    return primary, replica
+
+
+def _request(method: str, user_id: int | None = USER_ID):
+    headers = []
+    if user_id is not None:
+        token = create_access_token({'sub': 'user@test.com', 'uid': user_id})
+        headers.append((b'authorization', f'Bearer {token}'.encode()))
+
+    return Request({'type': 'http', 'method': method, 'headers': headers})
+
+
+def _bind(method: str, commit: bool = False):
+    # Runs the session dependency like FastAPI does, including its exit
+    sessions = database.get_sync_session(_request(method))
+    session = next(sessions)
+    if commit:
+        session.commit()
+    next(sessions, None)
+
+    return session.bind
+
+
+def test_request_key_reads_the_user_id():
+    assert ReplicaRouter.request_key(_request('GET')) == USER_ID
+    assert ReplicaRouter.request_key(_request('GET', None)) is None
+
+
+def test_lagging_replica_is_not_used(router, monkeypatch):
+    monkeypatch.setattr(router, '_check_due', lambda: False)
+    router._record_check(MAX_LAG_SECONDS + 1)
+
+    assert router.use_replica(None, None) is False
+    assert router.stats()['primary_reads'] == 1
+
+
+def test_failed_lag_check_marks_the_replica_unhealthy(router):
+    # SQLite has no pg_last_wal_receive_lsn, so the check fails
+    assert router.use_replica(None, create_engine('sqlite://')) is False
+    assert router.stats()['failed_checks'] == 1
+    assert router.stats()['healthy'] is False
+
+
+def test_writes_pin_only_their_user(healthy, monkeypatch):
+    healthy.mark_write(USER_ID)
+
+    assert healthy.use_replica(USER_ID, None) is False
+    assert healthy.use_replica(USER_ID + 1, None) is True
+
+    expired = cache.monotonic() + STICKY_SECONDS
+    monkeypatch.setattr(cache, 'monotonic', lambda: expired)
+    assert healthy.use_replica(USER_ID, None) is True
+
+
+def test_reads_go_to_the_replica(engines):
+    primary, replica = engines
+
+    assert _bind('GET') is replica
+    assert _bind('HEAD') is replica
+    assert _bind('POST') is primary
+
+
+def test_committed_request_pins_reads_to_the_primary(engines):
+    primary, replica = engines
+
+    assert _bind('POST', commit=True) is primary
+
+    assert _bind('GET') is primary
+
+
+def test_request_without_commit_does_not_pin(engines):
+    primary, replica = engines
+
+    assert _bind('POST') is primary
+
+    assert _bind('GET') is replica
@@ -0,0 +1,166 @@
+from datetime import datetime, timedelta
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import func, select, update
+
+from backend.auth.security import create_access_token, user_token_claims
+from backend.config.settings import Settings
+from backend.database.models import LocationArchive, Task, TaskArchive
+from backend.jobs.task_archive import archive_tasks_batch
+from tests.conftest import PLACE, TaskFactory
+
+settings = Settings()
+
+OLD_TASKS = 7
+BATCH_SIZE = 3
+# Anything but the server default of 100
+RADIUS_M = 250
+
+
+def _deactivate_long_ago(session, user_id: int):
+    long_ago = datetime.now() - timedelta(
+        days=settings.TASK_ARCHIVE_INACTIVE_DAYS + 1
+    )
+    session.execute(
+        update(Task)
+        .where(Task.user_id == user_id)
+        .values(is_active=False, update_at=long_ago)
+    )
+    session.commit()
+
+
+@pytest.fixture
+def old_tasks(session, user):
+    tasks = TaskFactory.create_batch(OLD_TASKS, user_id=user.id)
+    session.add_all(tasks)
+    session.commit()
+    _deactivate_long_ago(session, user.id)
+
+    return sorted(task.id for task in tasks)
+
+
+def _archived_ids(session):
+    return list(
+        session.scalars(select(TaskArchive.id).order_by(TaskArchive.id))
+    )
+
+
+def test_archive_batches_carry_the_last_id_forward(session, old_tasks):
+    batches = []
+    last_id = 0
+    while True:
+        archived, last_id = archive_tasks_batch(session, BATCH_SIZE, last_id)
+        batches.append((archived, last_id))
+        if archived < BATCH_SIZE:
+            break
+
+    assert batches == [
+        (BATCH_SIZE, old_tasks[BATCH_SIZE - 1]),
+        (BATCH_SIZE, old_tasks[2 * BATCH_SIZE - 1]),
+        (OLD_TASKS - 2 * BATCH_SIZE, old_tasks[-1]),
+    ]
+    assert _archived_ids(session) == old_tasks
+    assert session.scalar(select(func.count()).select_from(Task)) == 0
+
+
+def test_archive_batch_skips_ids_before_the_keyset(session, old_tasks):
+    archived, last_id = archive_tasks_batch(
+        session, OLD_TASKS, old_tasks[BATCH_SIZE - 1]
+    )
+
+    assert archived == OLD_TASKS - BATCH_SIZE
+    assert last_id == old_tasks[-1]
+    assert _archived_ids(session) == old_tasks[BATCH_SIZE:]
+
+
+def test_empty_archive_batch_keeps_the_keyset(session, old_tasks):
+    assert archive_tasks_batch(session, BATCH_SIZE, old_tasks[-1]) == (
+        0,
+        old_tasks[-1],
+    )
+
+
+def test_activate_task_requires_a_user(client, old_tasks):
+    response = client.patch(f'/tasks/activate/{old_tasks[0]}')
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_activate_task(client, old_tasks, token):
+    response = client.patch(
+        f'/tasks/activate/{old_tasks[0]}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['is_active'] is True
+
+
+def test_activate_task_of_other_user(client, session, other_user, token):
+    task = TaskFactory(user_id=other_user.id)
+    session.add(task)
+    session.commit()
+    session.execute(
+        update(Task).where(Task.id == task.id).values(is_active=False)
+    )
+    session.commit()
+
+    response = client.patch(
+        f'/tasks/activate/{task.id}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    session.refresh(task)
+    assert task.is_active is False
+
+
+def test_restore_archived_task(client, session, old_tasks, token):
+    archive_tasks_batch(session, OLD_TASKS)
+
+    response = client.patch(
+        f'/tasks/activate/{old_tasks[0]}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['id'] == old_tasks[0]
+    assert response.json()['is_active'] is True
+    assert _archived_ids(session) == old_tasks[1:]
+
+
+def test_restore_archived_task_of_other_user(
+    client, session, old_tasks, other_user
+):
+    archive_tasks_batch(session, OLD_TASKS)
+    other_token = create_access_token(data=user_token_claims(other_user))
+
+    response = client.patch(
+        f'/tasks/activate/{old_tasks[0]}',
+        headers={'Authorization': f'Bearer {other_token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert _archived_ids(session) == old_tasks
+
+
+def test_restore_keeps_the_geofence_radius(
+    client, session, user, task, headers
+):
+    client.post(
+        f'/locations/task?task_id={task.id}',
+        json={**PLACE, 'geofence_radius_m': RADIUS_M},
+        headers=headers,
+    )
+    _deactivate_long_ago(session, user.id)
+    archive_tasks_batch(session, OLD_TASKS)
+    assert session.scalar(select(LocationArchive.geofence_radius_m)) == (
+        RADIUS_M
+    )
+
+    client.patch(f'/tasks/activate/{task.id}', headers=headers)
+    response = client.get(f'/locations/task/{task.id}', headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['geofence_radius_m'] == RADIUS_M
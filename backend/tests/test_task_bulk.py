@@ -0,0 +1,260 @@
+from http import HTTPStatus
+
+import pytest
+
+from backend.config.settings import Settings
+from backend.database.enums import TaskPriority
+from tests.conftest import TaskFactory, statements
+
+settings = Settings()
+
+SMALL_BATCH = 10
+LARGE_BATCH = 100
+# existing titles, insert, stats
+CREATE_STATEMENTS = 3
+# update, stats, tile version
+PATCH_STATEMENTS = 3
+# locations, tasks, stats, tile version
+DELETE_STATEMENTS = 4
+
+
+@pytest.fixture
+def tasks(session, user):
+    tasks = TaskFactory.create_batch(
+        LARGE_BATCH, user_id=user.id, done=False, priority=TaskPriority.low
+    )
+    session.add_all(tasks)
+    session.commit()
+
+    return tasks
+
+
+def _new_task(title: str, description: str):
+    return {
+        'title': title,
+        'description': description,
+        'done': False,
+        'priority': TaskPriority.medium.value,
+        'user_id': 0,
+    }
+
+
+def _patch_items(tasks):
+    # Every item changes a different field, the case that used to cost
+    # one UPDATE per item
+    fields = [
+        lambda task: {'title': f'{task.title} renamed'},
+        lambda _: {'done': True},
+        lambda _: {'priority': TaskPriority.high.value},
+        lambda task: {'description': f'{task.description} more'},
+    ]
+
+    return [
+        {'id': task.id, **fields[index % len(fields)](task)}
+        for index, task in enumerate(tasks)
+    ]
+
+
+def test_create_tasks_bulk(client, headers):
+    response = client.post(
+        '/tasks/bulk',
+        json={
+            'tasks': [
+                _new_task(f'bulk {index}', 'bulk')
+                for index in range(SMALL_BATCH)
+            ]
+            + [_new_task('bulk 0', 'duplicate')]
+        },
+        headers=headers,
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    results = response.json()['results']
+    assert [result['status'] for result in results] == [
+        'created'
+    ] * SMALL_BATCH + ['exists']
+    assert statements(response) == CREATE_STATEMENTS
+
+
+def test_patch_tasks_bulk(client, headers, tasks):
+    items = _patch_items(tasks[:SMALL_BATCH])
+
+    response = client.patch(
+        '/tasks/bulk', json={'tasks': items}, headers=headers
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    for item, result in zip(items, response.json()['results']):
+        assert result['status'] == 'updated'
+        for key, value in item.items():
+            assert result['task'][key] == value
+
+    # The fixture inserts tasks directly, so the counters hold the deltas
+    stats = client.get('/tasks/stats', headers=headers).json()
+    assert stats['done'] == len([item for item in items if item.get('done')])
+    assert stats['high'] == len(
+        [item for item in items if item.get('priority')]
+    )
+
+
+def test_patch_tasks_bulk_statements_do_not_grow_with_items(
+    client, headers, tasks
+):
+    small = client.patch(
+        '/tasks/bulk',
+        json={'tasks': _patch_items(tasks[:SMALL_BATCH])},
+        headers=headers,
+    )
+    large = client.patch(
+        '/tasks/bulk',
+        json={'tasks': _patch_items(tasks[SMALL_BATCH:])},
+        headers=headers,
+    )
+
+    assert statements(small) == PATCH_STATEMENTS
+    assert statements(large) == PATCH_STATEMENTS
+
+
+def test_patch_tasks_bulk_against_single_patches(client, headers, tasks):
+    items = _patch_items(tasks[:SMALL_BATCH])
+
+    single = sum(
+        statements(
+            client.patch(
+                f'/tasks/{item["id"]}',
+                json={
+                    key: value for key, value in item.items() if key != 'id'
+                },
+                headers=headers,
+            )
+        )
+        for item in items
+    )
+    bulk = client.patch('/tasks/bulk', json={'tasks': items}, headers=headers)
+
+    assert statements(bulk) == PATCH_STATEMENTS
+    assert statements(bulk) < single
+
+
+def test_patch_tasks_bulk_merges_items_for_the_same_task(
+    client, headers, tasks
+):
+    task = tasks[0]
+
+    response = client.patch(
+        '/tasks/bulk',
+        json={
+            'tasks': [
+                {'id': task.id, 'title': 'first'},
+                {'id': task.id, 'done': True},
+                {'id': task.id, 'title': 'second'},
+            ]
+        },
+        headers=headers,
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    for result in response.json()['results']:
+        assert result['status'] == 'updated'
+        assert result['task']['title'] == 'second'
+        assert result['task']['done'] is True
+
+
+def test_explicit_null_is_rejected_like_single_patch(client, headers, tasks):
+    task = tasks[0]
+
+    single = client.patch(
+        f'/tasks/{task.id}', json={'description': None}, headers=headers
+    )
+    bulk = client.patch(
+        '/tasks/bulk',
+        json={'tasks': [{'id': task.id, 'description': None}]},
+        headers=headers,
+    )
+
+    assert single.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert bulk.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_patch_tasks_bulk_writes_only_the_fields_each_item_sets(
+    client, headers, tasks
+):
+    first, second = tasks[:2]
+
+    response = client.patch(
+        '/tasks/bulk',
+        json={
+            'tasks': [
+                {'id': first.id, 'description': 'first only'},
+                {'id': second.id, 'title': 'second only'},
+            ]
+        },
+        headers=headers,
+    )
+
+    first_result, second_result = response.json()['results']
+    assert first_result['task']['title'] == first.title
+    assert first_result['task']['description'] == 'first only'
+    assert second_result['task']['title'] == 'second only'
+    assert second_result['task']['description'] == second.description
+
+
+def test_patch_tasks_bulk_statuses(
+    client, session, headers, tasks, other_user
+):
+    foreign = TaskFactory(user_id=other_user.id)
+    session.add(foreign)
+    session.commit()
+
+    response = client.patch(
+        '/tasks/bulk',
+        json={
+            'tasks': [
+                {'id': tasks[0].id, 'done': True},
+                {'id': tasks[1].id},
+                {'id': foreign.id, 'done': True},
+                {'id': 0, 'done': True},
+            ]
+        },
+        headers=headers,
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert [result['status'] for result in response.json()['results']] == [
+        'updated',
+        'unchanged',
+        'not_found',
+        'not_found',
+    ]
+    session.refresh(foreign)
+    assert foreign.done is False
+
+
+def test_delete_tasks_bulk(client, headers, tasks):
+    ids = [task.id for task in tasks[:SMALL_BATCH]]
+    # The fixture inserts tasks directly, so only the delta is checked
+    total = client.get('/tasks/stats', headers=headers).json()['total']
+
+    response = client.request(
+        'DELETE', '/tasks/bulk', json={'ids': [*ids, 0]}, headers=headers
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert [result['status'] for result in response.json()['results']] == [
+        'deleted'
+    ] * SMALL_BATCH + ['not_found']
+    assert statements(response) == DELETE_STATEMENTS
+    assert client.get('/tasks/stats', headers=headers).json()['total'] == (
+        total - SMALL_BATCH
+    )
+
+
+def test_bulk_limit(client, headers):
+    response = client.request(
+        'DELETE',
+        '/tasks/bulk',
+        json={'ids': list(range(settings.TASK_BULK_MAX_ITEMS + 1))},
+        headers=headers,
+    )
+
+    assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
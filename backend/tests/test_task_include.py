@@ -0,0 +1,91 @@
+from http import HTTPStatus
+
+import pytest
+
+from backend.services.task_archive import archive_tasks
+from tests.conftest import PLACE, TaskFactory, statements
+
+TASKS = 6
+PAGE_SIZE = 2
+# the page, and one SELECT ... IN for the locations of all its tasks
+INCLUDE_STATEMENTS = 2
+
+
+@pytest.fixture
+def located_tasks(client, session, user, headers):
+    # Every other task gets a location
+    tasks = TaskFactory.create_batch(TASKS, user_id=user.id)
+    session.add_all(tasks)
+    session.commit()
+
+    for task in tasks[::2]:
+        response = client.post(
+            f'/locations/task?task_id={task.id}', json=PLACE, headers=headers
+        )
+        assert response.status_code == HTTPStatus.OK
+
+    return tasks
+
+
+def _list(client, headers, **params):
+    response = client.get('/tasks/', params=params, headers=headers)
+    assert response.status_code == HTTPStatus.OK
+
+    return response
+
+
+def test_include_location_embeds_the_summary(client, headers, located_tasks):
+    response = _list(client, headers, include='location')
+
+    locations = [task['location'] for task in response.json()['tasks']]
+    assert [location is not None for location in locations] == [
+        index % 2 == 0 for index in range(TASKS)
+    ]
+    for location in filter(None, locations):
+        assert location['place_id'] == PLACE['place_id']
+        assert (location['lat'], location['lon']) == (
+            PLACE['lat'],
+            PLACE['lon'],
+        )
+        assert location['name'] == PLACE['name']
+
+
+def test_include_location_statements_do_not_grow_with_the_page(
+    client, headers, located_tasks
+):
+    small = _list(client, headers, include='location', limit=PAGE_SIZE)
+    large = _list(client, headers, include='location', limit=TASKS)
+
+    assert statements(small) == INCLUDE_STATEMENTS
+    assert statements(large) == INCLUDE_STATEMENTS
+
+
+def test_list_without_include_does_not_load_locations(
+    client, headers, located_tasks
+):
+    response = _list(client, headers)
+
+    assert statements(response) == 1
+    assert {task['location'] for task in response.json()['tasks']} == {None}
+
+
+def test_single_task_does_not_load_its_location(
+    client, headers, located_tasks
+):
+    response = client.get(f'/tasks/{located_tasks[0].id}', headers=headers)
+
+    assert response.json()['location'] is None
+    assert statements(response) == 1
+
+
+def test_archived_list_ignores_include(
+    client, session, headers, located_tasks
+):
+    archive_tasks(session, [located_tasks[0].id])
+    session.commit()
+
+    response = _list(client, headers, include='location', archived=True)
+
+    [archived] = response.json()['tasks']
+    assert archived['id'] == located_tasks[0].id
+    assert archived['location'] is None
@@ -0,0 +1,200 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import event, text
+
+from backend.schemas.task import FilterTaskNearby
+from backend.services.task_nearby import nearby_tasks_service
+from tests.conftest import plan_nodes
+
+CENTER = (40.7826, -73.9656)
+FAR_AWAY = (48.8566, 2.3522)
+NEAR_TASKS = 20
+RADIUS_M = 1000
+
+
+def _seed(session, user_id, ids: range, origin, spread):
+    # One place per task on a 100 x 100 grid starting at origin, with
+    # explicit ids so tasks, places and locations line up
+    params = {
+        'user_id': user_id,
+        'start': ids.start,
+        'stop': ids.stop - 1,
+        'lat': origin[0],
+        'lon': origin[1],
+        'spread': spread,
+    }
+    session.execute(
+        text(
+            'INSERT INTO tasks '
+            '(id, user_id, title, description, done, priority, is_active) '
+            "SELECT g, :user_id, 'task ' || g, 'description', false, "
+            "'medium', true FROM generate_series(:start, :stop) AS g"
+        ),
+        params,
+    )
+    session.execute(
+        text(
+            'INSERT INTO places '
+            '(place_id, display_name, name, lat, lon, geom) '
+            "SELECT 'place ' || g, 'Place ' || g, 'Place ' || g, lat, lon, "
+            'ST_SetSRID(ST_MakePoint(lon, lat), 4326) FROM ('
+            'SELECT g, :lat + (g % 100) * :spread AS lat, '
+            ':lon + (g / 100 % 100) * :spread AS lon '
+            'FROM generate_series(:start, :stop) AS g) AS grid'
+        ),
+        params,
+    )
+    session.execute(
+        text(
+            'INSERT INTO locations (task_id, place_id) '
+            "SELECT g, 'place ' || g FROM generate_series(:start, :stop) AS g"
+        ),
+        params,
+    )
+    session.commit()
+
+
+@pytest.fixture
+def near_tasks(session, user):
+    _seed(session, user.id, range(1, NEAR_TASKS + 1), CENTER, 0.0001)
+
+
+def _analyze(session, user, engine):
+    # Runs the service, then EXPLAIN ANALYZE on the statement it sent
+    queries = []
+
+    def capture(conn, clauseelement, *args):
+        queries.append(clauseelement)
+
+    event.listen(engine, 'before_execute', capture)
+    try:
+        nearby_tasks_service(
+            session,
+            user,
+            FilterTaskNearby(
+                lat=CENTER[0], lon=CENTER[1], radius_m=RADIUS_M, limit=100
+            ),
+        )
+    finally:
+        event.remove(engine, 'before_execute', capture)
+
+    compiled = queries[0].compile(
+        dialect=engine.dialect, compile_kwargs={'literal_binds': True}
+    )
+    plan = session.scalar(text(f'EXPLAIN (ANALYZE, FORMAT JSON) {compiled}'))
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return list(plan_nodes(plan[0]['Plan']))
+
+
+def test_nearby_orders_by_distance(client, user, token, near_tasks):
+    response = client.get(
+        '/tasks/nearby',
+        params={'lat': CENTER[0], 'lon': CENTER[1], 'radius_m': RADIUS_M},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    distances = [hit['distance_m'] for hit in response.json()['tasks']]
+    assert distances == sorted(distances)
+    assert all(distance <= RADIUS_M for distance in distances)
+    assert response.json()['tasks'][0]['task']['title'] == 'task 1'
+
+
+def test_nearby_respects_radius(client, user, token, near_tasks):
+    response = client.get(
+        '/tasks/nearby',
+        params={'lat': FAR_AWAY[0], 'lon': FAR_AWAY[1]},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.json() == {'tasks': []}
+
+
+def test_nearby_respects_limit(client, user, token, near_tasks):
+    limit = 5
+    response = client.get(
+        '/tasks/nearby',
+        params={'lat': CENTER[0], 'lon': CENTER[1], 'limit': limit},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert len(response.json()['tasks']) == limit
+
+
+def test_nearby_skips_other_users(client, session, other_user, token):
+    _seed(session, other_user.id, range(1, NEAR_TASKS + 1), CENTER, 0.0001)
+
+    response = client.get(
+        '/tasks/nearby',
+        params={'lat': CENTER[0], 'lon': CENTER[1]},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.json() == {'tasks': []}
+
+
+def test_nearby_defaults_to_user_location(client, user, token, near_tasks):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.post(
+        '/locations/user',
+        json={
+            'place_id': 9001,
+            'display_name': 'Home',
+            'name': 'Home',
+            'lat': CENTER[0],
+            'lon': CENTER[1],
+            'user_id': user.id,
+        },
+        headers=headers,
+    )
+
+    response = client.get('/tasks/nearby', headers=headers)
+
+    assert len(response.json()['tasks']) == NEAR_TASKS
+
+
+def test_nearby_without_user_location(client, token, near_tasks):
+    response = client.get(
+        '/tasks/nearby', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'Could not find this user location'}
+
+
+@pytest.mark.parametrize('point', [{'lat': 40.0}, {'lon': -73.0}])
+def test_nearby_rejects_half_a_point(client, token, point):
+    response = client.get(
+        '/tasks/nearby',
+        params=point,
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_nearby_work_does_not_grow_with_far_locations(
+    session, engine, user, near_tasks
+):
+    # The geography index keeps the rows the query touches bounded by the
+    # places inside the radius, however many locations exist elsewhere
+    touched = []
+    for far_ids in (range(1_000, 2_000), range(2_000, 22_000)):
+        _seed(session, user.id, far_ids, FAR_AWAY, 0.001)
+        session.execute(text('ANALYZE'))
+
+        nodes = _analyze(session, user, engine)
+
+        assert not [node for node in nodes if node['Node Type'] == 'Seq Scan']
+        [index_scan] = [
+            node
+            for node in nodes
+            if node.get('Index Name') == 'ix_places_geography'
+        ]
+        touched.append(index_scan['Actual Rows'])
+
+    assert touched == [NEAR_TASKS, NEAR_TASKS]
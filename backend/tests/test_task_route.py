@@ -0,0 +1,124 @@
+from itertools import permutations
+from math import asin, cos, radians, sin, sqrt
+from time import perf_counter
+
+import numpy as np
+import pytest
+
+from backend.config.settings import Settings
+from backend.services.task_route import plan_route
+from backend.utils.geofence import EARTH_RADIUS_M
+
+settings = Settings()
+
+CENTER = (40.7826, -73.9656)
+# About 10 km across
+SPREAD = 0.1
+SMALL_ROUTES = 200
+MAX_SMALL_STOPS = 7
+# Nearest neighbour plus 2-opt is a heuristic and misses the optimum on
+# some layouts, so it is held to a mean over many routes
+MAX_MEAN_DETOUR = 1.05
+BUDGET_MS = 50
+TIMED_RUNS = 5
+
+
+def _distance(a, b):
+    half_dlat = radians(b[0] - a[0]) / 2
+    half_dlon = radians(b[1] - a[1]) / 2
+    h = (
+        sin(half_dlat) ** 2
+        + cos(radians(a[0])) * cos(radians(b[0])) * sin(half_dlon) ** 2
+    )
+
+    return 2 * EARTH_RADIUS_M * asin(sqrt(min(h, 1.0)))
+
+
+def _length(points, order):
+    path = [points[0], *(points[index + 1] for index in order)]
+
+    return sum(_distance(a, b) for a, b in zip(path, path[1:]))
+
+
+def _random_points(rng, stops: int):
+    lat = CENTER[0] + (rng.random(stops + 1) - 0.5) * SPREAD
+    lon = CENTER[1] + (rng.random(stops + 1) - 0.5) * SPREAD
+
+    return lat.tolist(), lon.tolist()
+
+
+def _plan(lat, lon, budget_ms=settings.TASK_ROUTE_TIME_BUDGET_MS):
+    order, legs = plan_route(lat, lon, budget_ms)
+
+    return order.tolist(), legs.tolist()
+
+
+def _reversals(order):
+    # Every route one 2-opt move away
+    for i in range(len(order)):
+        for j in range(i + 2, len(order) + 1):
+            yield order[:i] + order[i:j][::-1] + order[j:]
+
+
+def test_route_against_brute_force():
+    detours = []
+    for seed in range(SMALL_ROUTES):
+        rng = np.random.default_rng(seed)
+        stops = int(rng.integers(1, MAX_SMALL_STOPS + 1))
+        lat, lon = _random_points(rng, stops)
+        points = list(zip(lat, lon))
+
+        order, legs = _plan(lat, lon)
+        length = _length(points, order)
+
+        assert sorted(order) == list(range(stops))
+        assert sum(legs) == pytest.approx(length)
+        assert all(
+            _length(points, other) >= length - 1e-6
+            for other in _reversals(order)
+        )
+        best = min(
+            _length(points, candidate)
+            for candidate in permutations(range(stops))
+        )
+        detours.append(length / best)
+
+    assert min(detours) == pytest.approx(1)
+    assert sum(detours) / len(detours) <= MAX_MEAN_DETOUR
+
+
+def test_route_legs_follow_the_order():
+    lat = [CENTER[0], CENTER[0] + 0.02, CENTER[0] + 0.01]
+    lon = [CENTER[1]] * 3
+
+    order, legs = _plan(lat, lon)
+
+    assert order == [1, 0]
+    assert legs == pytest.approx(
+        [
+            _distance((lat[0], lon[0]), (lat[2], lon[2])),
+            _distance((lat[2], lon[2]), (lat[1], lon[1])),
+        ]
+    )
+
+
+def test_route_with_the_start_only():
+    order, legs = _plan([CENTER[0]], [CENTER[1]])
+
+    assert (order, legs) == ([], [])
+
+
+def test_route_at_max_stops_stays_within_budget():
+    rng = np.random.default_rng(0)
+    lat, lon = _random_points(rng, settings.TASK_ROUTE_MAX_STOPS)
+    # Warms numpy up so the first run does not pay for it
+    _plan(lat, lon)
+
+    timings = []
+    for _ in range(TIMED_RUNS):
+        start = perf_counter()
+        order, _ = _plan(lat, lon)
+        timings.append((perf_counter() - start) * 1000)
+
+    assert sorted(order) == list(range(settings.TASK_ROUTE_MAX_STOPS))
+    assert max(timings) < BUDGET_MS
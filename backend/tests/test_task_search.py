@@ -0,0 +1,111 @@
+from http import HTTPStatus
+
+import pytest
+
+from backend.services import task_search
+from tests.conftest import TaskFactory
+
+PAGE_SIZE = 3
+COUNT_CAP = 2
+
+
+@pytest.fixture
+def tasks(session, user):
+    tasks = [
+        TaskFactory(
+            user_id=user.id,
+            title=f'buy groceries {n}',
+            description=' '.join(['milk'] * (n % 4 + 1) + ['bread'] * n),
+        )
+        for n in range(10)
+    ]
+    tasks.append(
+        TaskFactory(
+            user_id=user.id, title='call plumber', description='kitchen sink'
+        )
+    )
+    session.add_all(tasks)
+    session.commit()
+
+    return tasks
+
+
+def test_search_matches_description(client, token, tasks):
+    response = client.get(
+        '/tasks/search?q=sink', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert [task['title'] for task in response.json()['tasks']] == [
+        'call plumber'
+    ]
+
+
+def test_search_matches_title_typo(client, token, tasks):
+    response = client.get(
+        '/tasks/search?q=plumbr', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert [task['title'] for task in response.json()['tasks']] == [
+        'call plumber'
+    ]
+
+
+def test_search_skips_other_users(client, session, other_user, token, tasks):
+    session.add(
+        TaskFactory(
+            user_id=other_user.id, title='fix sink', description='kitchen'
+        )
+    )
+    session.commit()
+
+    response = client.get(
+        '/tasks/search?q=sink', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert [task['title'] for task in response.json()['tasks']] == [
+        'call plumber'
+    ]
+
+
+def test_search_pages_match_single_page(client, token, tasks):
+    headers = {'Authorization': f'Bearer {token}'}
+    expected = [
+        task['id']
+        for task in client.get('/tasks/search?q=milk', headers=headers).json()[
+            'tasks'
+        ]
+    ]
+
+    paged = []
+    cursor = None
+    while True:
+        params = {'q': 'milk', 'limit': PAGE_SIZE}
+        if cursor:
+            params['cursor'] = cursor
+        page = client.get(
+            '/tasks/search', params=params, headers=headers
+        ).json()
+        paged.extend(task['id'] for task in page['tasks'])
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+
+    assert len(expected) == len(tasks) - 1
+    assert paged == expected
+
+
+def test_search_count_past_cap(client, token, tasks, monkeypatch):
+    monkeypatch.setattr(
+        task_search.settings, 'PAGINATION_COUNT_CAP', COUNT_CAP
+    )
+
+    response = client.get(
+        '/tasks/search?q=milk&count=true',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    # The planner's estimate, never below the cap + 1 rows counted
+    assert response.json()['total'] > COUNT_CAP
+    assert response.json()['total_is_estimate']
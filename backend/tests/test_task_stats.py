@@ -0,0 +1,136 @@
+import logging
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import update
+
+from backend.database.enums import TaskPriority
+from backend.database.models import TaskStats
+from backend.jobs import task_stats as task_stats_job
+from backend.jobs.task_stats import repair_task_stats_batch
+from tests.conftest import TaskFactory
+
+TASKS = 4
+
+
+def _stats(client, headers):
+    response = client.get('/tasks/stats', headers=headers)
+    assert response.status_code == HTTPStatus.OK
+
+    return response.json()
+
+
+def _create(client, headers, title: str, priority: TaskPriority):
+    response = client.post(
+        '/tasks/',
+        json={
+            'title': title,
+            'description': 'counted',
+            'done': False,
+            'priority': priority.value,
+            'user_id': 0,
+        },
+        headers=headers,
+    )
+    assert response.status_code == HTTPStatus.OK
+
+    return response.json()['id']
+
+
+@pytest.fixture
+def direct_tasks(session, user):
+    # Inserted behind the API's back, so the counters do not know them
+    tasks = TaskFactory.create_batch(
+        TASKS, user_id=user.id, done=False, priority=TaskPriority.low
+    )
+    session.add_all(tasks)
+    session.commit()
+
+    return tasks
+
+
+def test_counters_follow_task_writes(client, headers):
+    high = _create(client, headers, 'high', TaskPriority.high)
+    low = _create(client, headers, 'low', TaskPriority.low)
+    assert _stats(client, headers) == {
+        'total': 2,
+        'active': 2,
+        'done': 0,
+        'high': 1,
+        'medium': 0,
+        'low': 1,
+    }
+
+    client.patch(f'/tasks/done/{high}', headers=headers)
+    client.patch(f'/tasks/{low}', json={'priority': 'medium'}, headers=headers)
+    assert _stats(client, headers) == {
+        'total': 2,
+        'active': 2,
+        'done': 1,
+        'high': 1,
+        'medium': 1,
+        'low': 0,
+    }
+
+    client.patch(f'/tasks/deactivate/{high}', headers=headers)
+    client.delete(f'/tasks/{low}', headers=headers)
+    assert _stats(client, headers) == {
+        'total': 1,
+        'active': 0,
+        'done': 0,
+        'high': 0,
+        'medium': 0,
+        'low': 0,
+    }
+
+
+def test_repair_creates_missing_rows(session, user, direct_tasks):
+    assert session.get(TaskStats, user.id) is None
+
+    assert repair_task_stats_batch(session, [user.id]) == [user.id]
+
+    stats = session.get(TaskStats, user.id)
+    assert (stats.total, stats.active, stats.low) == (TASKS, TASKS, TASKS)
+
+
+def test_repair_fixes_drifted_counters(client, session, user, headers):
+    _create(client, headers, 'counted', TaskPriority.high)
+    session.execute(
+        update(TaskStats).where(TaskStats.user_id == user.id).values(total=99)
+    )
+    session.commit()
+
+    assert repair_task_stats_batch(session, [user.id]) == [user.id]
+    assert _stats(client, headers)['total'] == 1
+
+
+def test_repair_leaves_correct_counters(client, session, user, headers):
+    _create(client, headers, 'counted', TaskPriority.high)
+
+    assert repair_task_stats_batch(session, [user.id]) == []
+
+
+def test_repair_gives_users_without_tasks_a_row(session, user):
+    assert repair_task_stats_batch(session, [user.id]) == []
+
+    stats = session.get(TaskStats, user.id)
+    assert (stats.total, stats.active) == (0, 0)
+
+
+def test_repair_job_logs_its_report(
+    engine, user, direct_tasks, monkeypatch, caplog
+):
+    monkeypatch.setattr(task_stats_job, 'engine', engine)
+
+    with caplog.at_level(logging.INFO, logger=task_stats_job.__name__):
+        report = task_stats_job.repair_task_stats(batch_size=1)
+
+    assert report == {
+        'users_checked': 1,
+        'users_drifted': 1,
+        'drifted_user_ids': [user.id],
+    }
+    assert [record.levelname for record in caplog.records] == [
+        'WARNING',
+        'INFO',
+    ]
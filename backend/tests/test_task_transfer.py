@@ -0,0 +1,135 @@
+import csv
+import io
+import json
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import select
+
+from backend.database.models import Task, TaskStats
+from tests.conftest import TaskFactory
+
+pytestmark = pytest.mark.usefixtures('transfer_engine')
+
+
+def test_export_never_updated_task(client, session, user, token):
+    task = TaskFactory(user_id=user.id)
+    session.add(task)
+    session.commit()
+
+    response = client.get(
+        '/tasks/export', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    [record] = [json.loads(line) for line in response.text.splitlines()]
+    assert record['id'] == task.id
+    assert record['title'] == task.title
+    assert record['priority'] == task.priority.value
+    assert record['update_at'] is None
+
+
+def test_export_csv(client, session, user, token):
+    tasks = TaskFactory.create_batch(3, user_id=user.id)
+    session.add_all(tasks)
+    session.commit()
+
+    response = client.get(
+        '/tasks/export?format=csv',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row['title'] for row in rows] == [task.title for task in tasks]
+    assert {row['update_at'] for row in rows} == {''}
+
+
+def test_export_only_own_tasks(client, session, user, other_user, token):
+    session.add(TaskFactory(user_id=other_user.id))
+    session.commit()
+
+    response = client.get(
+        '/tasks/export', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.text == ''
+
+
+def test_import_tasks(client, session, user, token):
+    session.add(TaskFactory(user_id=user.id, title='existing'))
+    session.commit()
+    lines = [
+        {'title': 'a', 'description': 'd', 'done': True, 'priority': 'high'},
+        {'title': 'a', 'description': 'd', 'done': False, 'priority': 'low'},
+        {
+            'title': 'existing',
+            'description': 'd',
+            'done': False,
+            'priority': 'low',
+        },
+        {'title': 'b', 'description': 'd', 'done': False, 'priority': 'nope'},
+        {'title': 'c', 'description': 'd', 'done': False, 'priority': 'low'},
+    ]
+    body = '\n'.join(json.dumps(line) for line in lines) + '\nnot json\n'
+
+    response = client.post(
+        '/tasks/import',
+        headers={'Authorization': f'Bearer {token}'},
+        files={'file': ('tasks.ndjson', body.encode())},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'received': 6,
+        'imported': 2,
+        'skipped': 2,
+        'invalid': 2,
+    }
+    imported = session.scalars(
+        select(Task).where(Task.user_id == user.id).order_by(Task.title)
+    ).all()
+    assert [(task.title, task.done) for task in imported] == [
+        ('a', True),
+        ('c', False),
+        ('existing', False),
+    ]
+    stats = session.get(TaskStats, user.id)
+    assert (stats.total, stats.done, stats.high, stats.low) == (2, 1, 1, 1)
+
+
+def test_import_csv_round_trips_export(client, session, user, token):
+    tasks = TaskFactory.create_batch(5, user_id=user.id)
+    session.add_all(tasks)
+    session.commit()
+    exported = client.get(
+        '/tasks/export?format=csv',
+        headers={'Authorization': f'Bearer {token}'},
+    ).text
+    session.execute(Task.__table__.delete())
+    session.commit()
+
+    response = client.post(
+        '/tasks/import?format=csv',
+        headers={'Authorization': f'Bearer {token}'},
+        files={'file': ('tasks.csv', exported.encode())},
+    )
+
+    assert response.json()['imported'] == len(tasks)
+
+
+def test_import_rejects_invalid_utf8(client, session, user, token):
+    line = json.dumps(
+        {'title': 'a', 'description': 'd', 'done': False, 'priority': 'low'}
+    )
+    body = f'{line}\n'.encode() + b'\xff\xfe not utf-8\n'
+
+    response = client.post(
+        '/tasks/import',
+        headers={'Authorization': f'Bearer {token}'},
+        files={'file': ('tasks.ndjson', body)},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Import file is not valid UTF-8'}
+    assert session.scalars(select(Task)).all() == []
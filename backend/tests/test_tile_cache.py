@@ -0,0 +1,129 @@
+import os
+from http import HTTPStatus
+from time import time
+
+from sqlalchemy import select
+
+from backend.database.models import LocationVersion
+from backend.utils.tile_cache import DiskTileStore, NullTileStore, TileCache
+from tests.conftest import TaskFactory
+
+TTL = 60
+
+
+def _age(store: DiskTileStore, key, seconds: float):
+    directory, name = store._path(key)
+    stamp = time() - seconds
+    os.utime(directory / f'{name}.mvt', (stamp, stamp))
+
+
+def test_disk_store_round_trip(tmp_path):
+    store = DiskTileStore(str(tmp_path), ttl=TTL, max_tiles=10)
+    store.set((1, 0, 0, 0, 1), b'tile')
+
+    assert store.get((1, 0, 0, 0, 1)) == b'tile'
+    assert store.get((1, 0, 0, 0, 2)) is None
+
+
+def test_disk_store_replaces_stale_versions(tmp_path):
+    store = DiskTileStore(str(tmp_path), ttl=TTL, max_tiles=10)
+    store.set((1, 0, 0, 0, 1), b'old')
+    store.set((1, 0, 0, 0, 2), b'new')
+
+    assert store.get((1, 0, 0, 0, 1)) is None
+    assert len(list(tmp_path.rglob('*.mvt'))) == 1
+
+
+def test_disk_store_expires_tiles_on_read(tmp_path):
+    store = DiskTileStore(str(tmp_path), ttl=TTL, max_tiles=10)
+    store.set((1, 0, 0, 0, 1), b'tile')
+    _age(store, (1, 0, 0, 0, 1), TTL + 1)
+
+    assert store.get((1, 0, 0, 0, 1)) is None
+    assert not list(tmp_path.rglob('*.mvt'))
+    assert store.stats()['expired'] == 1
+
+
+def test_disk_store_sweep_caps_size(tmp_path):
+    max_tiles = 3
+    store = DiskTileStore(str(tmp_path), ttl=TTL, max_tiles=max_tiles)
+    for y in range(max_tiles + 2):
+        store.set((1, 4, 0, y, 1), b'tile')
+        _age(store, (1, 4, 0, y, 1), max_tiles + 2 - y)
+
+    store.sweep()
+
+    assert len(list(tmp_path.rglob('*.mvt'))) == max_tiles
+    assert store.get((1, 4, 0, 0, 1)) is None
+    assert store.get((1, 4, 0, max_tiles + 1, 1)) == b'tile'
+
+
+def test_disk_store_sweep_drops_expired(tmp_path):
+    store = DiskTileStore(str(tmp_path), ttl=TTL, max_tiles=10)
+    store.set((1, 0, 0, 0, 1), b'tile')
+    store.set((2, 0, 0, 0, 1), b'tile')
+    _age(store, (1, 0, 0, 0, 1), TTL + 1)
+
+    store.sweep()
+
+    assert [path.parts[-4] for path in tmp_path.rglob('*.mvt')] == ['2']
+
+
+def test_tile_cache_does_not_refill_from_expired_store(tmp_path):
+    store = DiskTileStore(str(tmp_path), ttl=TTL, max_tiles=10)
+    cache = TileCache(maxsize=10, ttl=TTL, store=store)
+    store.set((1, 0, 0, 0, 1), b'tile')
+    _age(store, (1, 0, 0, 0, 1), TTL + 1)
+
+    assert cache.get((1, 0, 0, 0, 1)) is None
+    assert cache.stats()['size'] == 0
+
+
+def test_tile_cache_without_store():
+    cache = TileCache(maxsize=10, ttl=TTL, store=NullTileStore())
+    cache.set((1, 0, 0, 0, 1), b'tile')
+
+    assert cache.get((1, 0, 0, 0, 1)) == b'tile'
+
+
+def _version(session, user):
+    return session.scalar(
+        select(LocationVersion.version).where(
+            LocationVersion.user_id == user.id
+        )
+    )
+
+
+def test_task_edits_bump_tile_version(client, session, user, token):
+    task = TaskFactory(user_id=user.id)
+    session.add(task)
+    session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    versions = []
+
+    for method, url, body in [
+        ('PATCH', f'/tasks/{task.id}', {'title': 'renamed'}),
+        ('PATCH', f'/tasks/done/{task.id}', None),
+        ('PATCH', f'/tasks/deactivate/{task.id}', None),
+        ('PATCH', f'/tasks/activate/{task.id}', None),
+        ('PATCH', '/tasks/bulk', {'tasks': [{'id': task.id, 'done': False}]}),
+    ]:
+        response = client.request(method, url, json=body, headers=headers)
+        assert response.status_code == HTTPStatus.OK
+        versions.append(_version(session, user))
+
+    assert versions == list(range(1, len(versions) + 1))
+
+
+def test_description_edit_keeps_tile_version(client, session, user, token):
+    task = TaskFactory(user_id=user.id)
+    session.add(task)
+    session.commit()
+
+    client.patch(
+        f'/tasks/{task.id}',
+        json={'description': 'only the description'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert _version(session, user) is None
@@ -0,0 +1,112 @@
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import delete
+
+from backend.auth import security
+from backend.auth.hashing import pwd_context
+from backend.database.models import User
+
+
+@pytest.fixture
+def stateless(monkeypatch):
+    monkeypatch.setattr(security.settings, 'TOKEN_STATELESS_VERIFY', True)
+
+
+@pytest.fixture
+def deleted_user(session, user):
+    # Deleted behind the API's back, as another worker would, so this
+    # worker's revocation table does not know about it yet
+    session.execute(delete(User).where(User.id == user.id))
+    session.commit()
+
+    return user
+
+
+@pytest.mark.usefixtures('stateless')
+def test_patch_deleted_user_with_stateless_token(client, token, deleted_user):
+    response = client.patch(
+        f'/users/{deleted_user.id}',
+        json={'username': 'renamed'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'User not found'}
+
+
+@pytest.mark.usefixtures('stateless')
+def test_deactivate_deleted_user_with_stateless_token(
+    client, token, deleted_user
+):
+    response = client.patch(
+        f'/users/deactivate/{deleted_user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.usefixtures('stateless')
+def test_delete_deleted_user_with_stateless_token(client, token, deleted_user):
+    response = client.delete(
+        f'/users/{deleted_user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_deleted_user_token_is_rejected(client, token, deleted_user):
+    response = client.patch(
+        f'/users/{deleted_user.id}',
+        json={'username': 'renamed'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_patch_password_is_hashed(client, session, user, token):
+    response = client.patch(
+        f'/users/{user.id}',
+        json={'password': 'new-password'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    session.expire_all()
+    stored = session.get(User, user.id).password
+    assert stored != 'new-password'
+    assert pwd_context.verify('new-password', stored)
+
+
+def test_patch_password_revokes_tokens_and_allows_login(client, user, token):
+    client.patch(
+        f'/users/{user.id}',
+        json={'password': 'new-password'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    stale = client.get(
+        '/tasks/stats', headers={'Authorization': f'Bearer {token}'}
+    )
+    login = client.post(
+        '/auth/login',
+        data={'username': user.email, 'password': 'new-password'},
+    )
+
+    assert stale.status_code == HTTPStatus.UNAUTHORIZED
+    assert login.status_code == HTTPStatus.OK
+
+
+def test_patch_without_password_keeps_tokens(client, user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    response = client.patch(
+        f'/users/{user.id}', json={'username': 'renamed'}, headers=headers
+    )
+
+    assert response.json()['username'] == 'renamed'
+    assert client.get('/tasks/stats', headers=headers).status_code == (
+        HTTPStatus.OK
+    )